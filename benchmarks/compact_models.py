@@ -0,0 +1,47 @@
+"""Compare the memory used by dictionary and compact models.
+
+Run with ``poetry run python -m benchmarks.compact_models``.
+"""
+
+from __future__ import annotations
+
+import json
+import tracemalloc
+from typing import TYPE_CHECKING, Any
+
+from benchmarks.json_decode import scaled_response
+from pytraccar.models import CompactPosition, CompactReportsEvent
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+ITEMS = 20_000
+
+
+def allocated(decode: Callable[[], Any]) -> int:
+    """Return the bytes still allocated by the result of ``decode``."""
+    tracemalloc.start()
+    result = decode()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main() -> None:
+    """Run the benchmark."""
+    for name, model in (
+        ("positions", CompactPosition),
+        ("reports_events", CompactReportsEvent),
+    ):
+        body = scaled_response(name, ITEMS)
+        plain = allocated(lambda body=body: json.loads(body))
+        compact = allocated(lambda body=body, model=model: model.from_json_array(body))
+        print(  # noqa: T201
+            f"{name:<15} dict {plain / ITEMS:7.1f}B/item "
+            f"compact {compact / ITEMS:7.1f}B/item ({plain / compact:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
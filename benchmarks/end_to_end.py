@@ -0,0 +1,211 @@
+"""Benchmark the client against a local mock Traccar server.
+
+Every scenario goes through HTTP or the WebSocket to
+:class:`~benchmarks.mock_server.MockTraccarServer`, so the numbers include
+the transport, the request policy and decoding, not only the decoders.
+
+Scenarios:
+
+- ``get_positions``: fetch and decode the latest position of every device.
+- ``get_reports_events``: fetch events over a large window, split into
+  daily slices.
+- ``subscribe``: WebSocket frames handled per second.
+- ``callback_latency``: delay from the server sending a frame until the
+  subscription callback is called with it.
+
+Save the results of a known good version with ``--save`` and compare later
+runs with ``--compare``; the run fails when a scenario is slower than the
+saved one by more than ``--tolerance``.
+
+Run with ``poetry run python -m benchmarks.end_to_end --devices 1000``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple
+
+import aiohttp
+
+from benchmarks.mock_server import MockTraccarServer
+from pytraccar import ApiClient
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+    from pytraccar import SubscriptionData
+
+TOKEN = "benchmark"  # noqa: S105
+
+
+class Result(NamedTuple):
+    """Timings of a scenario."""
+
+    name: str
+    unit: str
+    samples: list[float]
+
+    @property
+    def median(self) -> float:
+        """Return the median of the samples."""
+        return statistics.median(self.samples)
+
+    @property
+    def p95(self) -> float:
+        """Return the 95th percentile of the samples."""
+        if len(self.samples) < 2:
+            return self.samples[0]
+        return statistics.quantiles(self.samples, n=20)[-1]
+
+
+async def timed(rounds: int, run: Callable[[], Awaitable[object]]) -> list[float]:
+    """Return the seconds taken by every round of ``run``."""
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        await run()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+async def bench_get_positions(client: ApiClient, rounds: int) -> Result:
+    """Fetch and decode all positions."""
+    return Result("get_positions", "s", await timed(rounds, client.get_positions))
+
+
+async def bench_get_reports_events(
+    client: ApiClient, rounds: int, window: timedelta
+) -> Result:
+    """Fetch all events of the window in daily slices."""
+    end = datetime.now(UTC).replace(minute=0, second=0, microsecond=0, tzinfo=None)
+    return Result(
+        "get_reports_events",
+        "s",
+        await timed(
+            rounds,
+            lambda: client.get_reports_events(
+                start_time=end - window,
+                end_time=end,
+                time_slice=timedelta(days=1),
+            ),
+        ),
+    )
+
+
+async def bench_subscribe(
+    client: ApiClient, rounds: int, messages: int
+) -> tuple[Result, Result]:
+    """Measure the frame throughput and the latency of the callback."""
+    latencies: list[float] = []
+
+    async def _callback(data: SubscriptionData) -> None:
+        received = time.perf_counter()
+        latencies.extend(
+            received - position["attributes"]["sentAt"]
+            for position in data["positions"] or ()
+        )
+
+    samples = await timed(rounds, lambda: client.subscribe(_callback))
+    return (
+        Result("subscribe", "frames/s", [messages / sample for sample in samples]),
+        Result("callback_latency", "s", latencies),
+    )
+
+
+async def run(args: argparse.Namespace) -> list[Result]:
+    """Start the server and run every scenario."""
+    async with (
+        MockTraccarServer(
+            devices=args.devices,
+            payload_size=args.payload_size,
+            events_per_hour=args.events_per_hour,
+            messages=args.messages,
+            positions_per_message=args.positions_per_message,
+            message_rate=args.message_rate,
+        ) as server,
+        aiohttp.ClientSession() as client_session,
+    ):
+        client = ApiClient(
+            host=server.host,
+            port=server.port,
+            token=TOKEN,
+            client_session=client_session,
+            request_timeout=300,
+        )
+        return [
+            await bench_get_positions(client, args.rounds),
+            await bench_get_reports_events(
+                client, args.rounds, timedelta(days=args.window_days)
+            ),
+            *await bench_subscribe(client, args.rounds, args.messages),
+        ]
+
+
+def compare(results: list[Result], baseline: dict[str, float], tolerance: float) -> int:
+    """Print the slowdown against a baseline and count the regressions.
+
+    A negative slowdown is an improvement.
+    """
+    regressions = 0
+    for result in results:
+        if (previous := baseline.get(result.name)) is None:
+            continue
+        # Throughput improves upwards, durations downwards
+        change = (
+            previous / result.median - 1
+            if result.unit.endswith("/s")
+            else result.median / previous - 1
+        )
+        regressed = change > tolerance
+        regressions += regressed
+        print(  # noqa: T201
+            f"{result.name:<20} slowdown {change:+7.1%}"
+            f"{'  REGRESSION' if regressed else ''}"
+        )
+    return regressions
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--devices", type=int, default=1000)
+    parser.add_argument("--payload-size", type=int, default=0)
+    parser.add_argument("--events-per-hour", type=int, default=1)
+    parser.add_argument("--window-days", type=int, default=30)
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--positions-per-message", type=int, default=1)
+    parser.add_argument("--message-rate", type=float, default=None)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--save", type=Path, help="write the medians to this file")
+    parser.add_argument("--compare", type=Path, help="compare with a saved file")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    for result in results:
+        scale = 1e3 if result.unit == "s" else 1
+        unit = "ms" if result.unit == "s" else result.unit
+        print(  # noqa: T201
+            f"{result.name:<20} median {result.median * scale:10.2f}{unit} "
+            f"p95 {result.p95 * scale:10.2f}{unit} ({len(result.samples)} samples)"
+        )
+    medians = {result.name: result.median for result in results}
+    if args.save:
+        args.save.write_text(json.dumps(medians, indent=2), encoding="utf-8")
+    if args.compare and compare(
+        results,
+        json.loads(args.compare.read_text(encoding="utf-8")),
+        args.tolerance,
+    ):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
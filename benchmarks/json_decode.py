@@ -0,0 +1,72 @@
+"""Benchmark JSON decoders on scaled-up Traccar responses.
+
+The ``tests/responses`` fixtures are repeated to build large documents, which
+are then decoded with every installed decoder.
+
+Run with ``poetry run python -m benchmarks.json_decode``.
+"""
+
+from __future__ import annotations
+
+import json
+import timeit
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from pytraccar.decoder import default_loads
+
+if TYPE_CHECKING:
+    from pytraccar.decoder import JsonLoads
+
+RESPONSES = Path(__file__).parent.parent / "tests" / "responses"
+ITEMS = 20_000
+ROUNDS = 5
+
+
+def scaled_response(name: str, items: int) -> bytes:
+    """Return a fixture response repeated to ``items`` items."""
+    template = json.loads((RESPONSES / f"{name}.json").read_text(encoding="utf-8"))
+    return json.dumps(
+        [{**template[index % len(template)], "id": index} for index in range(items)]
+    ).encode()
+
+
+def decoders() -> dict[str, JsonLoads]:
+    """Return the installed decoders by name."""
+    installed: dict[str, JsonLoads] = {"json": json.loads}
+    try:
+        import orjson  # noqa: PLC0415
+    except ImportError:
+        pass
+    else:
+        installed["orjson"] = orjson.loads
+    try:
+        import msgspec  # noqa: PLC0415
+    except ImportError:
+        pass
+    else:
+        installed["msgspec"] = msgspec.json.decode
+    return installed
+
+
+def main() -> None:
+    """Run the benchmark."""
+    print(f"default decoder: {default_loads().__module__}")  # noqa: T201
+    for name in ("positions", "reports_events", "devices"):
+        body = scaled_response(name, ITEMS)
+        baseline = None
+        for decoder_name, loads in decoders().items():
+            elapsed = min(
+                timeit.repeat(
+                    lambda loads=loads, body=body: loads(body), number=1, repeat=ROUNDS
+                )
+            )
+            baseline = baseline or elapsed
+            print(  # noqa: T201
+                f"{name:<15} {len(body) / 1e6:6.1f}MB {decoder_name:<8} "
+                f"{elapsed * 1e3:8.1f}ms ({baseline / elapsed:.1f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""A local stand-in for a Traccar server, used by the benchmarks.
+
+The server answers the REST endpoints used by the client with generated
+data for a fleet of devices, and streams position updates over
+``/api/socket`` at a configurable rate. Every streamed position carries the
+``time.perf_counter()`` of its frame in ``attributes.sentAt``, so the delay
+until a subscription callback sees it can be measured in the same process.
+
+Typical usage::
+
+    async with MockTraccarServer(devices=1000) as server:
+        client = ApiClient(host=server.host, port=server.port, ...)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Self
+
+from aiohttp import web
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+    from types import TracebackType
+
+RESPONSES = Path(__file__).parent.parent / "tests" / "responses"
+EVENT_TYPES = ("deviceOnline", "deviceMoving", "deviceStopped", "ignitionOn")
+
+
+def _template(name: str) -> dict[str, Any]:
+    """Return the first item of a fixture response."""
+    response = json.loads((RESPONSES / f"{name}.json").read_text(encoding="utf-8"))
+    template: dict[str, Any] = response[0] if isinstance(response, list) else response
+    return template
+
+
+def _timestamp(value: datetime) -> str:
+    """Format a time the way Traccar does."""
+    return value.strftime("%Y-%m-%dT%H:%M:%S.000+00:00")
+
+
+def _parse(value: str) -> datetime:
+    """Parse a ``from``/``to`` query parameter."""
+    return datetime.fromisoformat(value)
+
+
+class MockTraccarServer:
+    """Serve generated Traccar data on a local port.
+
+    :param devices: Number of devices in the fleet. Defaults to ``100``.
+    :type devices: int
+    :param payload_size: Bytes of padding added to the attributes of every
+        device, position and event. Defaults to ``0``.
+    :type payload_size: int
+    :param events_per_hour: Events generated per device and hour of a
+        ``reports/events`` window. Defaults to ``1``.
+    :type events_per_hour: int
+    :param messages: Frames sent on every WebSocket connection before it is
+        closed. Defaults to ``1000``.
+    :type messages: int
+    :param positions_per_message: Positions in every frame. Defaults to ``1``.
+    :type positions_per_message: int
+    :param message_rate: Frames sent per second. Frames are sent as fast as
+        possible when ``None`` (the default).
+    :type message_rate: float | None
+    """
+
+    host = "127.0.0.1"
+
+    def __init__(
+        self,
+        *,
+        devices: int = 100,
+        payload_size: int = 0,
+        events_per_hour: int = 1,
+        messages: int = 1000,
+        positions_per_message: int = 1,
+        message_rate: float | None = None,
+    ) -> None:
+        """Initialize the server, without starting it."""
+        self.devices = devices
+        self.events_per_hour = events_per_hour
+        self.messages = messages
+        self.positions_per_message = positions_per_message
+        self.message_rate = message_rate
+        self._attributes = {"payload": "x" * payload_size} if payload_size else {}
+        self._runner: web.AppRunner | None = None
+        self.port = 0
+
+        now = datetime.now(UTC).replace(microsecond=0)
+        device = _template("devices")
+        position = _template("positions")
+        self._position = position
+        self._event = _template("reports_events")
+        self._bodies = {
+            "server": json.dumps(_template("server")).encode(),
+            "session": json.dumps(_template("session")).encode(),
+            "devices": json.dumps(
+                [
+                    {
+                        **device,
+                        "id": device_id,
+                        "uniqueId": str(device_id),
+                        "positionId": device_id,
+                        "lastUpdate": _timestamp(now),
+                        "attributes": self._attributes,
+                    }
+                    for device_id in range(1, devices + 1)
+                ]
+            ).encode(),
+            "positions": json.dumps(
+                [
+                    self._make_position(device_id, device_id, now)
+                    for device_id in range(1, devices + 1)
+                ]
+            ).encode(),
+        }
+
+    async def __aenter__(self) -> Self:
+        """Start the server on a free port."""
+        app = web.Application()
+        app.router.add_get("/api/server", self._body_handler("server"))
+        app.router.add_get("/api/session", self._session)
+        app.router.add_delete("/api/session", self._close_session)
+        app.router.add_get("/api/devices", self._body_handler("devices"))
+        app.router.add_get("/api/positions", self._body_handler("positions"))
+        app.router.add_get("/api/reports/events", self._reports_events)
+        app.router.add_get("/api/socket", self._socket)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, 0)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Stop the server."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def _make_position(
+        self, position_id: int, device_id: int, fix_time: datetime, **attributes: Any
+    ) -> dict[str, Any]:
+        """Return a generated position."""
+        timestamp = _timestamp(fix_time)
+        return {
+            **self._position,
+            "id": position_id,
+            "deviceId": device_id,
+            "deviceTime": timestamp,
+            "fixTime": timestamp,
+            "serverTime": timestamp,
+            "latitude": 59.9 + device_id / 1e4,
+            "longitude": 10.7 + position_id / 1e6,
+            "attributes": {**self._attributes, **attributes},
+        }
+
+    def _body_handler(
+        self, name: str
+    ) -> Callable[[web.Request], Awaitable[web.Response]]:
+        """Return a handler answering with a precomputed body."""
+        body = self._bodies[name]
+
+        async def _handler(_: web.Request) -> web.Response:
+            return web.Response(body=body, content_type="application/json")
+
+        return _handler
+
+    async def _session(self, _: web.Request) -> web.Response:
+        """Open a session, as needed before connecting the WebSocket."""
+        response = web.Response(
+            body=self._bodies["session"], content_type="application/json"
+        )
+        response.set_cookie("JSESSIONID", "benchmark")
+        return response
+
+    async def _close_session(self, _: web.Request) -> web.Response:
+        """Close the session."""
+        return web.Response(status=204)
+
+    async def _reports_events(self, request: web.Request) -> web.Response:
+        """Generate ``events_per_hour`` events per device over the window."""
+        start = _parse(request.query["from"])
+        end = _parse(request.query["to"])
+        devices = [int(value) for value in request.query.getall("deviceId", [])]
+        devices = devices or list(range(1, self.devices + 1))
+        step = timedelta(hours=1) / self.events_per_hour
+        count = int((end - start) / step)
+        events = [
+            {
+                **self._event,
+                "id": index * self.devices + device_id,
+                "type": EVENT_TYPES[index % len(EVENT_TYPES)],
+                "eventTime": _timestamp(start + index * step),
+                "deviceId": device_id,
+                "positionId": index * self.devices + device_id,
+                "attributes": self._attributes,
+            }
+            for index in range(count)
+            for device_id in devices
+        ]
+        return web.Response(body=json.dumps(events), content_type="application/json")
+
+    async def _socket(self, request: web.Request) -> web.WebSocketResponse:
+        """Stream position frames, then close the connection."""
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        started = time.perf_counter()
+        now = datetime.now(UTC)
+        position_id = self.devices
+        for index in range(self.messages):
+            if self.message_rate is not None:
+                delay = started + index / self.message_rate - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            sent_at = time.perf_counter()
+            positions = []
+            for _ in range(self.positions_per_message):
+                position_id += 1
+                positions.append(
+                    self._make_position(
+                        position_id,
+                        position_id % self.devices + 1,
+                        now,
+                        sentAt=sent_at,
+                    )
+                )
+            await ws.send_str(json.dumps({"positions": positions}))
+        await ws.close()
+        return ws
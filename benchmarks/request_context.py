@@ -0,0 +1,65 @@
+"""Benchmark the per-request overhead of building the request context.
+
+Run with ``poetry run python -m benchmarks.request_context``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import timeit
+
+import aiohttp
+from yarl import URL
+
+from pytraccar import ApiClient
+
+ITERATIONS = 100_000
+BASE_URL = "http://127.0.0.1:8082/api"
+TOKEN = "benchmark"  # noqa: S105
+
+
+def legacy_request_context(
+    endpoint: str,
+) -> tuple[URL, dict[str, str], aiohttp.ClientTimeout]:
+    """Build the request context the way it was done before precomputation.
+
+    The URL is parsed here as ``aiohttp`` would otherwise do for every string
+    URL it receives.
+    """
+    return (
+        URL(f"{BASE_URL}/{endpoint}"),
+        {
+            aiohttp.hdrs.ACCEPT: "application/json",
+            aiohttp.hdrs.AUTHORIZATION: f"Bearer {TOKEN}",
+            aiohttp.hdrs.CONTENT_TYPE: "application/json",
+        },
+        aiohttp.ClientTimeout(total=10),
+    )
+
+
+async def main() -> None:
+    """Run the benchmark."""
+    async with aiohttp.ClientSession() as client_session:
+        client = ApiClient(
+            host="127.0.0.1",
+            token=TOKEN,
+            client_session=client_session,
+        )
+        for endpoint in ("positions", "devices"):
+            legacy = timeit.timeit(
+                lambda endpoint=endpoint: legacy_request_context(endpoint),
+                number=ITERATIONS,
+            )
+            precomputed = timeit.timeit(
+                lambda endpoint=endpoint: client._request_context(endpoint),  # noqa: SLF001
+                number=ITERATIONS,
+            )
+            print(  # noqa: T201
+                f"{endpoint:<10} legacy: {legacy / ITERATIONS * 1e6:.2f}µs/call "
+                f"precomputed: {precomputed / ITERATIONS * 1e6:.2f}µs/call "
+                f"({legacy / precomputed:.1f}x)"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
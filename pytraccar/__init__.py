@@ -1,31 +1,90 @@
 """[GitHub repository](https://github.com/ludeeus/pytraccar)."""
 
+from .archive import ArchivedPosition, PositionArchive
+from .backoff import ExponentialBackoff
+from .bulk import BulkFailure, BulkResult
+from .cache import CachedResponse, ResponseCache
 from .client import ApiClient
+from .coalesce import PositionCoalescer
+from .dispatcher import Dispatcher, OverflowPolicy
 from .exceptions import (
     TraccarAuthenticationException,
     TraccarConnectionException,
     TraccarException,
     TraccarResponseException,
 )
+from .fleet import Coordinates, FleetState
+from .geofencing import GeofenceIndex, GeofenceTransition
+from .hub import HubSubscription, SubscriptionHub
+from .instrumentation import Observer, OpenTelemetryObserver, PrometheusObserver
 from .models import (
+    CommandModel,
+    CompactDevice,
+    CompactGeofence,
+    CompactModel,
+    CompactPosition,
+    CompactReportsEvent,
+    CompactServer,
     DeviceModel,
     GeofenceModel,
     PositionModel,
     ReportsEventeModel,
+    ReportsStopModel,
+    ReportsTripModel,
     ServerModel,
     SubscriptionData,
     SubscriptionStatus,
 )
+from .policy import CircuitBreaker, RequestPolicy, TokenBucket
+from .pool import ApiClientPool
+from .raw import RawResponse, RawStream
+from .sync import Delta, DeltaSync
 
 __all__ = [
     "ApiClient",
+    "ApiClientPool",
+    "ArchivedPosition",
+    "BulkFailure",
+    "BulkResult",
+    "CachedResponse",
+    "CircuitBreaker",
+    "CommandModel",
+    "CompactDevice",
+    "CompactGeofence",
+    "CompactModel",
+    "CompactPosition",
+    "CompactReportsEvent",
+    "CompactServer",
+    "Coordinates",
+    "Delta",
+    "DeltaSync",
     "DeviceModel",
+    "Dispatcher",
+    "ExponentialBackoff",
+    "FleetState",
+    "GeofenceIndex",
     "GeofenceModel",
+    "GeofenceTransition",
+    "HubSubscription",
+    "Observer",
+    "OpenTelemetryObserver",
+    "OverflowPolicy",
+    "PositionArchive",
+    "PositionCoalescer",
     "PositionModel",
+    "PrometheusObserver",
+    "RawResponse",
+    "RawStream",
     "ReportsEventeModel",
+    "ReportsStopModel",
+    "ReportsTripModel",
+    "RequestPolicy",
+    "ResponseCache",
     "ServerModel",
     "SubscriptionData",
+    "SubscriptionHub",
     "SubscriptionStatus",
+    "TokenBucket",
     "TraccarAuthenticationException",
     "TraccarConnectionException",
     "TraccarException",
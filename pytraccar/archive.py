@@ -0,0 +1,445 @@
+"""Local archive of positions in memory-mapped files.
+
+Typical usage::
+
+    with PositionArchive("/var/lib/traccar/archive") as archive:
+        async for position in archive.fetch(
+            client, devices=[1, 2], start_time=start, end_time=end
+        ):
+            ...
+        # Keep the archive fed with live positions
+        await client.subscribe(archive.handle)
+
+Every device has a directory holding one file per time partition (a day by
+default). A file is a sequence of fixed-width little-endian records (see
+:data:`RECORD_DTYPE`) ordered by ``fixTime`` and ``id``, so a time range is
+found by binary search and read without copying, e.g. with
+``numpy.frombuffer(view, dtype=RECORD_DTYPE)``. New positions are appended;
+only positions older than the newest one of their partition cause the
+partition to be rewritten.
+
+The archive is not safe for concurrent use by several processes.
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import mmap
+import struct
+from bisect import bisect_left, bisect_right
+from contextlib import suppress
+from datetime import UTC, datetime, timedelta
+from operator import attrgetter
+from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple, Self
+
+from .client import DEFAULT_REPORT_SLICE
+from .timestamps import parse_epoch_ms, to_naive_utc
+
+if TYPE_CHECKING:
+    import os
+    from collections.abc import AsyncIterator, Iterable, Iterator
+    from types import TracebackType
+
+    from .client import ApiClient
+    from .models import PositionModel, SubscriptionData
+
+RECORD = struct.Struct("<qqdddddd")
+RECORD_DTYPE = [
+    ("fixTime", "<i8"),
+    ("id", "<i8"),
+    ("latitude", "<f8"),
+    ("longitude", "<f8"),
+    ("altitude", "<f8"),
+    ("speed", "<f8"),
+    ("course", "<f8"),
+    ("accuracy", "<f8"),
+]
+ADD_BATCH_SIZE = 1000
+
+_FIX_TIME = struct.Struct("<q")
+_KEY = struct.Struct("<qq")
+_COVERAGE = "coverage.json"
+_EPOCH = datetime(1970, 1, 1)  # noqa: DTZ001
+_MILLISECOND = timedelta(milliseconds=1)
+
+
+class ArchivedPosition(NamedTuple):
+    """A position read from the archive."""
+
+    device_id: int
+    fix_time: int
+    """Milliseconds since the epoch."""
+    position_id: int
+    latitude: float
+    longitude: float
+    altitude: float
+    speed: float
+    course: float
+    accuracy: float
+
+
+class PositionArchive:
+    """Append-only archive of positions, partitioned by device and time.
+
+    Besides the positions, the archive remembers which time ranges of every
+    device were fetched completely by :meth:`fetch`, so repeated queries only
+    fetch the ranges that are missing. Positions added with :meth:`add` or
+    :meth:`handle` are stored but do not count as complete ranges.
+
+    :param path: Directory of the archive. Created if missing.
+    :type path: str | os.PathLike[str]
+    :param partition: Time range covered by a single file. Must not change
+        once the archive has data. Defaults to one day.
+    :type partition: timedelta
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        *,
+        partition: timedelta = timedelta(days=1),
+    ) -> None:
+        """Open the archive."""
+        self._path = Path(path)
+        self._path.mkdir(parents=True, exist_ok=True)
+        self._partition = int(partition.total_seconds() * 1000)
+        self._maps: dict[Path, mmap.mmap] = {}
+
+    def __enter__(self) -> Self:
+        """Return the archive."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the memory maps."""
+        self.close()
+
+    def close(self) -> None:
+        """Close the memory maps.
+
+        :raises BufferError: If a view returned by :meth:`records` is still
+            in use.
+        """
+        maps, self._maps = self._maps, {}
+        for mapped in maps.values():
+            mapped.close()
+
+    async def handle(self, data: SubscriptionData) -> None:
+        """Store the positions of a subscription message.
+
+        Usable as the callback of :meth:`ApiClient.subscribe`.
+
+        :param data: A message from :meth:`ApiClient.subscribe`.
+        :type data: SubscriptionData
+        """
+        if positions := data.get("positions"):
+            self.add(positions)
+
+    def add(self, positions: Iterable[PositionModel]) -> int:
+        """Store positions that are not in the archive yet.
+
+        :param positions: The positions to store, in any order.
+        :type positions: Iterable[PositionModel]
+        :return: The number of positions stored.
+        :rtype: int
+        """
+        partitions: dict[tuple[int, int], list[tuple[int | float, ...]]] = {}
+        for position in positions:
+            record = (
+                parse_epoch_ms(position["fixTime"]),
+                position["id"],
+                position["latitude"],
+                position["longitude"],
+                position["altitude"] or 0,
+                position["speed"] or 0,
+                position["course"] or 0,
+                position["accuracy"] or 0,
+            )
+            key = (position["deviceId"], int(record[0]) // self._partition)
+            partitions.setdefault(key, []).append(record)
+        return sum(
+            self._write(self._partition_path(device_id, index), records)
+            for (device_id, index), records in partitions.items()
+        )
+
+    def records(
+        self,
+        device_id: int,
+        start_time: datetime | None = None,
+        end_time: datetime | None = None,
+    ) -> Iterator[memoryview]:
+        """Iterate over the stored records of a device in a time range.
+
+        The views point into the memory maps of the archive; release them
+        before closing the archive.
+
+        :param device_id: The id of the device.
+        :type device_id: int
+        :param start_time: Start time inclusive. If naive, treated as UTC.
+            Unbounded when ``None``.
+        :type start_time: datetime | None
+        :param end_time: End time inclusive. If naive, treated as UTC.
+            Unbounded when ``None``.
+        :type end_time: datetime | None
+        :return: An iterator over views of :data:`RECORD_DTYPE` records, one
+            per partition, oldest first.
+        :rtype: Iterator[memoryview]
+        """
+        start = _to_ms(start_time) if start_time is not None else None
+        end = _to_ms(end_time) if end_time is not None else None
+        directory = self._path / str(device_id)
+        if not directory.is_dir():
+            return
+        indexes = sorted(int(path.stem) for path in directory.glob("*.bin"))
+        for index in indexes:
+            if (start is not None and index < start // self._partition) or (
+                end is not None and index > end // self._partition
+            ):
+                continue
+            if (mapped := self._map(directory / f"{index}.bin")) is None:
+                continue
+            fix_times = _FixTimes(mapped)
+            low = bisect_left(fix_times, start) if start is not None else 0
+            high = bisect_right(fix_times, end) if end is not None else len(fix_times)
+            if low < high:
+                yield memoryview(mapped)[low * RECORD.size : high * RECORD.size]
+
+    def positions(
+        self,
+        device_id: int,
+        start_time: datetime | None = None,
+        end_time: datetime | None = None,
+    ) -> Iterator[ArchivedPosition]:
+        """Iterate over the stored positions of a device in a time range.
+
+        Takes the same arguments as :meth:`records`.
+
+        :return: An iterator over the positions, oldest first.
+        :rtype: Iterator[ArchivedPosition]
+        """
+        for view in self.records(device_id, start_time, end_time):
+            with view:
+                for values in RECORD.iter_unpack(view):
+                    yield ArchivedPosition(device_id, *values)
+
+    def missing(
+        self, device_id: int, start_time: datetime, end_time: datetime
+    ) -> list[tuple[datetime, datetime]]:
+        """Return the parts of a time range that were not fetched completely.
+
+        :param device_id: The id of the device.
+        :type device_id: int
+        :param start_time: Start time inclusive. If naive, treated as UTC.
+        :type start_time: datetime
+        :param end_time: End time inclusive. If naive, treated as UTC.
+        :type end_time: datetime
+        :return: The missing ``(start, end)`` ranges as naive UTC datetimes,
+            oldest first.
+        :rtype: list[tuple[datetime, datetime]]
+        """
+        return [
+            (_to_datetime(start), _to_datetime(end))
+            for start, end in self._gaps(
+                device_id, _to_ms(start_time), _to_ms(end_time)
+            )
+        ]
+
+    async def fetch(
+        self,
+        client: ApiClient,
+        *,
+        devices: list[int],
+        start_time: datetime,
+        end_time: datetime,
+        time_slice: timedelta | None = DEFAULT_REPORT_SLICE,
+        max_concurrency: int = 4,
+    ) -> AsyncIterator[ArchivedPosition]:
+        """Iterate over the positions of devices, fetching only what is missing.
+
+        The ranges returned by :meth:`missing` are fetched with
+        :meth:`ApiClient.iter_position_history` and stored, then the whole
+        range is read from the archive.
+
+        :param client: The client to fetch missing positions with.
+        :type client: ApiClient
+        :param devices: Device IDs to get the positions of.
+        :type devices: list[int]
+        :param start_time: Start time inclusive. If naive, treated as UTC.
+        :type start_time: datetime
+        :param end_time: End time inclusive. If naive, treated as UTC.
+        :type end_time: datetime
+        :param time_slice: Passed on to
+            :meth:`ApiClient.iter_position_history`.
+        :type time_slice: timedelta | None
+        :param max_concurrency: Passed on to
+            :meth:`ApiClient.iter_position_history`.
+        :type max_concurrency: int
+        :return: An async iterator over the positions of all devices, ordered
+            by ``fix_time``.
+        :rtype: AsyncIterator[ArchivedPosition]
+        :raises TraccarException: If fetching missing positions fails. The
+            positions fetched so far are kept, but the range is not marked
+            as complete.
+        """
+        start, end = _to_ms(start_time), _to_ms(end_time)
+        for device_id in devices:
+            for gap_start, gap_end in self._gaps(device_id, start, end):
+                batch: list[PositionModel] = []
+                async for position in client.iter_position_history(
+                    devices=[device_id],
+                    start_time=_to_datetime(gap_start),
+                    end_time=_to_datetime(gap_end),
+                    time_slice=time_slice,
+                    max_concurrency=max_concurrency,
+                ):
+                    batch.append(position)
+                    if len(batch) >= ADD_BATCH_SIZE:
+                        self.add(batch)
+                        batch = []
+                self.add(batch)
+                # Positions may still arrive for a range ending in the future
+                self._cover(device_id, gap_start, min(gap_end, _to_ms(_now())))
+        for archived in heapq.merge(
+            *(self.positions(device_id, start_time, end_time) for device_id in devices),
+            key=attrgetter("fix_time"),
+        ):
+            yield archived
+
+    def _partition_path(self, device_id: int, index: int) -> Path:
+        """Return the file of a partition of a device."""
+        return self._path / str(device_id) / f"{index}.bin"
+
+    def _map(self, path: Path) -> mmap.mmap | None:
+        """Return the memory map of a partition, or ``None`` if it is empty."""
+        if (mapped := self._maps.get(path)) is None:
+            if not path.is_file() or path.stat().st_size == 0:
+                return None
+            with path.open("rb") as file:
+                mapped = self._maps[path] = mmap.mmap(
+                    file.fileno(), 0, access=mmap.ACCESS_READ
+                )
+        return mapped
+
+    def _write(self, path: Path, records: list[tuple[int | float, ...]]) -> int:
+        """Store the records that are not in a partition yet."""
+        records = sorted({record[:2]: record for record in records}.values())
+        existing: list[tuple[int | float, ...]] = []
+        if (mapped := self._map(path)) is not None:
+            keys = _Keys(mapped)
+            records = [record for record in records if not keys.contains(record[:2])]
+            if records and records[0][:2] < keys[len(keys) - 1]:
+                existing = list(RECORD.iter_unpack(mapped))
+        if not records:
+            return 0
+        # The map is replaced after every write; a map that views still use
+        # stays open for them until they are released
+        if (stale := self._maps.pop(path, None)) is not None:
+            with suppress(BufferError):
+                stale.close()
+        path.parent.mkdir(exist_ok=True)
+        if not existing:
+            with path.open("ab") as file:
+                file.write(b"".join(RECORD.pack(*record) for record in records))
+            return len(records)
+        temporary = path.with_suffix(".tmp")
+        with temporary.open("wb") as file:
+            file.write(
+                b"".join(
+                    RECORD.pack(*record)
+                    for record in heapq.merge(existing, records, key=lambda r: r[:2])
+                )
+            )
+        temporary.replace(path)
+        return len(records)
+
+    def _coverage(self, device_id: int) -> list[list[int]]:
+        """Return the completely fetched ranges of a device, oldest first."""
+        path = self._path / str(device_id) / _COVERAGE
+        if not path.is_file():
+            return []
+        ranges: list[list[int]] = json.loads(path.read_text(encoding="utf-8"))
+        return ranges
+
+    def _cover(self, device_id: int, start: int, end: int) -> None:
+        """Mark a range of a device as completely fetched."""
+        if end < start:
+            return
+        merged: list[list[int]] = []
+        for range_start, range_end in sorted(
+            [*self._coverage(device_id), [start, end]]
+        ):
+            if merged and range_start <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], range_end)
+            else:
+                merged.append([range_start, range_end])
+        path = self._path / str(device_id) / _COVERAGE
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(json.dumps(merged), encoding="utf-8")
+
+    def _gaps(self, device_id: int, start: int, end: int) -> list[tuple[int, int]]:
+        """Return the ranges of ``[start, end]`` that are not covered."""
+        gaps: list[tuple[int, int]] = []
+        cursor = start
+        for range_start, range_end in self._coverage(device_id):
+            if range_end < cursor:
+                continue
+            if range_start > end:
+                break
+            if range_start > cursor:
+                gaps.append((cursor, range_start - 1))
+            cursor = range_end + 1
+        if cursor <= end:
+            gaps.append((cursor, end))
+        return gaps
+
+
+class _Partition:
+    """The records of a partition, as a sequence of sort keys."""
+
+    def __init__(self, mapped: mmap.mmap) -> None:
+        self._mapped = mapped
+
+    def __len__(self) -> int:
+        return len(self._mapped) // RECORD.size
+
+
+class _FixTimes(_Partition):
+    """The ``fixTime`` of every record of a partition."""
+
+    def __getitem__(self, index: int) -> int:
+        fix_time: int = _FIX_TIME.unpack_from(self._mapped, index * RECORD.size)[0]
+        return fix_time
+
+
+class _Keys(_Partition):
+    """The ``(fixTime, id)`` of every record of a partition."""
+
+    def __getitem__(self, index: int) -> tuple[int, int]:
+        fix_time, position_id = _KEY.unpack_from(self._mapped, index * RECORD.size)
+        return (fix_time, position_id)
+
+    def contains(self, key: tuple[int | float, ...]) -> bool:
+        """Return whether a record has this key."""
+        index = bisect_left(self, key)
+        return index < len(self) and self[index] == key
+
+
+def _now() -> datetime:
+    """Return the current time."""
+    return datetime.now(tz=UTC)
+
+
+def _to_ms(value: datetime) -> int:
+    """Return milliseconds since the epoch; naive datetimes are UTC."""
+    return (to_naive_utc(value) - _EPOCH) // _MILLISECOND
+
+
+def _to_datetime(value: int) -> datetime:
+    """Return a naive UTC datetime from milliseconds since the epoch."""
+    return _EPOCH + timedelta(milliseconds=value)
@@ -0,0 +1,50 @@
+"""Exponential backoff with jitter."""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class ExponentialBackoff:
+    """Delays between attempts, growing exponentially up to a maximum.
+
+    The delay before retry ``n`` (starting at ``0``) is
+    ``min(maximum, initial * factor ** n)``, reduced by a random fraction of
+    up to ``jitter`` so that many clients do not retry in lockstep.
+
+    :param initial: Delay (seconds) before the first retry. Defaults to ``1``.
+    :type initial: float
+    :param maximum: Upper bound (seconds) of a delay. Defaults to ``60``.
+    :type maximum: float
+    :param factor: Growth factor between retries. Defaults to ``2``.
+    :type factor: float
+    :param jitter: Fraction (``0``-``1``) of the delay that is randomized.
+        Defaults to ``1`` (full jitter).
+    :type jitter: float
+    :param max_attempts: Number of retries before giving up, or ``None`` to
+        retry forever. Defaults to ``None``.
+    :type max_attempts: int | None
+    """
+
+    initial: float = 1
+    maximum: float = 60
+    factor: float = 2
+    jitter: float = 1
+    max_attempts: int | None = None
+
+    def delay(self, attempt: int) -> float:
+        """Return the delay (seconds) before a retry.
+
+        :param attempt: Number of the retry, starting at ``0``.
+        :type attempt: int
+        :return: The delay in seconds.
+        :rtype: float
+        """
+        delay = min(self.maximum, self.initial * self.factor**attempt)
+        return delay * (1 - self.jitter * random.random())  # noqa: S311
+
+    def exhausted(self, attempt: int) -> bool:
+        """Return whether no retry is left after ``attempt`` retries."""
+        return self.max_attempts is not None and attempt >= self.max_attempts
@@ -0,0 +1,83 @@
+"""Run many API calls concurrently, collecting errors per item.
+
+Typical usage::
+
+    result = await client.bulk(geofences, client.create_geofence)
+    for failure in result.failed:
+        print(failure.item, failure.error)
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from .exceptions import TraccarException
+from .utils import gather_limited
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Iterable
+
+DEFAULT_BULK_CONCURRENCY = 8
+
+
+class BulkFailure(NamedTuple):
+    """An item that could not be processed."""
+
+    item: Any
+    """The item passed to the operation."""
+
+    error: TraccarException
+    """The error raised by the operation."""
+
+
+class BulkResult[ResultT](NamedTuple):
+    """Outcome of a bulk operation."""
+
+    succeeded: list[ResultT]
+    """Results of the successful operations, in the order of the items."""
+
+    failed: list[BulkFailure]
+    """The items that failed, in the order of the items."""
+
+
+async def run_bulk[ItemT, ResultT](
+    items: Iterable[ItemT],
+    operation: Callable[[ItemT], Awaitable[ResultT]],
+    *,
+    max_concurrency: int = DEFAULT_BULK_CONCURRENCY,
+) -> BulkResult[ResultT]:
+    """Call ``operation`` for every item with a pool of workers.
+
+    A failing item does not stop the others; its :class:`TraccarException` is
+    collected instead. Other exceptions are raised after cancelling the
+    workers.
+
+    :param items: The items to process.
+    :type items: Iterable[ItemT]
+    :param operation: Coroutine function called with every item.
+    :type operation: Callable[[ItemT], Awaitable[ResultT]]
+    :param max_concurrency: Number of workers, and so the maximum number of
+        operations in flight. Defaults to ``8``.
+    :type max_concurrency: int
+    :return: The results and the failures.
+    :rtype: BulkResult[ResultT]
+    """
+    items = list(items)
+    succeeded: dict[int, ResultT] = {}
+    failed: dict[int, BulkFailure] = {}
+    # Workers share the iterator, so each item is taken by exactly one
+    pending = iter(enumerate(items))
+
+    async def _worker() -> None:
+        for index, item in pending:
+            try:
+                succeeded[index] = await operation(item)
+            except TraccarException as exception:
+                failed[index] = BulkFailure(item, exception)
+
+    workers = min(max(max_concurrency, 1), len(items))
+    await gather_limited(workers, *(_worker() for _ in range(workers)))
+    return BulkResult(
+        [succeeded[index] for index in sorted(succeeded)],
+        [failed[index] for index in sorted(failed)],
+    )
@@ -0,0 +1,178 @@
+"""Response cache for rarely changing Traccar data.
+
+Typical usage::
+
+    client = ApiClient(
+        ...,
+        cache=ResponseCache(ttls={"server": 3600, "devices": 30}),
+    )
+    await client.get_devices()  # Fetched from Traccar
+    await client.get_devices()  # Served from the cache for 30 seconds
+    client.invalidate_cache("devices")
+
+A cache holds the responses of one client and should not be shared between
+clients with different hosts or tokens.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+CacheKey = tuple[str, tuple[tuple[str, str | int], ...]]
+
+DEFAULT_TTL = 60
+DEFAULT_MAX_ENTRIES = 256
+
+
+@dataclass(frozen=True, slots=True)
+class CachedResponse:
+    """A cached response and the validators used to revalidate it.
+
+    :param data: The decoded response.
+    :param etag: Value of the ``ETag`` response header, if any.
+    :param last_modified: Value of the ``Last-Modified`` response header, if any.
+    """
+
+    data: Any
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+class ResponseCache:
+    """LRU cache of API responses with per-endpoint time to live.
+
+    Concurrent requests for the same uncached key share a single request to
+    Traccar. Expired responses are kept until evicted so they can be
+    revalidated with a conditional request.
+
+    Every caller gets its own copy of the response and of the items of a
+    list response, so adding, removing or replacing their fields does not
+    change the cache. Nested values, such as ``attributes``, are shared and
+    must not be modified.
+
+    :param ttls: Time to live (seconds) by endpoint, e.g. ``{"server": 3600}``.
+    :type ttls: dict[str, float] | None
+    :param default_ttl: Time to live (seconds) for endpoints not in ``ttls``.
+        Defaults to ``60``.
+    :type default_ttl: float
+    :param max_entries: Maximum number of cached responses. The least recently
+        used response is evicted first. Defaults to ``256``.
+    :type max_entries: int
+    :param clock: Monotonic clock returning seconds. Defaults to
+        :func:`time.monotonic`.
+    :type clock: Callable[[], float]
+    """
+
+    def __init__(
+        self,
+        *,
+        ttls: dict[str, float] | None = None,
+        default_ttl: float = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the cache."""
+        self._ttls = ttls or {}
+        self._default_ttl = default_ttl
+        self._max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[CacheKey, tuple[float, CachedResponse]] = (
+            OrderedDict()
+        )
+        self._inflight: dict[CacheKey, asyncio.Future[Any]] = {}
+        self._generation = 0
+
+    def __len__(self) -> int:
+        """Return the number of cached responses."""
+        return len(self._entries)
+
+    async def fetch(
+        self,
+        endpoint: str,
+        params: list[tuple[str, str | int]] | None,
+        load: Callable[[CachedResponse | None], Awaitable[CachedResponse]],
+    ) -> Any:
+        """Return the cached data for a request, loading it when needed.
+
+        :param endpoint: The API endpoint.
+        :type endpoint: str
+        :param params: The query parameters of the request.
+        :type params: list[tuple[str, str | int]] | None
+        :param load: Coroutine function fetching the response. It receives the
+            expired response, if any, and returns it again when Traccar reports
+            that it has not been modified.
+        :type load: Callable[[CachedResponse | None], Awaitable[CachedResponse]]
+        :return: A copy of the cached or freshly loaded data.
+        :rtype: Any
+        """
+        key: CacheKey = (endpoint, tuple(params or ()))
+        if (entry := self._entries.get(key)) is not None and entry[0] > self._clock():
+            self._entries.move_to_end(key)
+            return _copy(entry[1].data)
+
+        if (future := self._inflight.get(key)) is None:
+            future = self._inflight[key] = asyncio.ensure_future(
+                self._load(key, entry[1] if entry else None, load)
+            )
+            future.add_done_callback(lambda done: self._forget(key, done))
+        return _copy(await asyncio.shield(future))
+
+    def _forget(self, key: CacheKey, future: asyncio.Future[Any]) -> None:
+        """Stop sharing a finished request."""
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+
+    async def _load(
+        self,
+        key: CacheKey,
+        previous: CachedResponse | None,
+        load: Callable[[CachedResponse | None], Awaitable[CachedResponse]],
+    ) -> Any:
+        """Load a response and store it unless the cache was invalidated."""
+        generation = self._generation
+        response = await load(previous)
+        if generation == self._generation:
+            self._entries[key] = (self._clock() + self._ttl(key[0]), response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return response.data
+
+    def _ttl(self, endpoint: str) -> float:
+        """Return the time to live for an endpoint."""
+        return self._ttls.get(endpoint, self._default_ttl)
+
+    def invalidate(self, endpoint: str | None = None) -> None:
+        """Drop cached responses.
+
+        Requests in flight when this is called are not stored.
+
+        :param endpoint: Only drop responses for this endpoint. Drops all
+            responses when ``None``.
+        :type endpoint: str | None
+        """
+        self._generation += 1
+        if endpoint is None:
+            self._entries.clear()
+            self._inflight.clear()
+            return
+        for key in [key for key in self._entries if key[0] == endpoint]:
+            del self._entries[key]
+        for key in [key for key in self._inflight if key[0] == endpoint]:
+            del self._inflight[key]
+
+
+def _copy(data: Any) -> Any:
+    """Copy a response and the items of a list response."""
+    if isinstance(data, list):
+        return [dict(item) if isinstance(item, dict) else item for item in data]
+    if isinstance(data, dict):
+        return dict(data)
+    return data
@@ -3,13 +3,29 @@
 from __future__ import annotations
 
 import asyncio
-from contextlib import suppress
+import heapq
+import inspect
+import json
+import time
+from contextlib import asynccontextmanager, suppress
 from datetime import UTC, datetime, timedelta
+from functools import partial
 from logging import Logger, getLogger
-from typing import TYPE_CHECKING, Any
+from operator import itemgetter
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Literal, NoReturn, overload
+from urllib.parse import urlencode
 
 import aiohttp
+from yarl import URL
 
+from .backoff import ExponentialBackoff
+from .bulk import DEFAULT_BULK_CONCURRENCY, BulkResult, run_bulk
+from .cache import CachedResponse
+from .coalesce import PositionCoalescer
+from .columnar import DEFAULT_CHUNK_SIZE, events_from_json
+from .decoder import default_loads
+from .dispatcher import Dispatcher
 from .exceptions import (
     TraccarAuthenticationException,
     TraccarConnectionException,
@@ -17,24 +33,70 @@ from .exceptions import (
     TraccarResponseException,
 )
 from .models import (
+    CompactDevice,
+    CompactGeofence,
+    CompactPosition,
+    CompactReportsEvent,
+    CompactServer,
     SubscriptionData,
     SubscriptionStatus,
 )
+from .raw import RawResponse, RawStream
+from .streaming import STREAM_CHUNK_SIZE, iter_json_array
+from .timestamps import format_timestamp, to_naive_utc
+from .utils import (
+    batched,
+    batched_params,
+    gather_limited,
+    route_template,
+    split_time_range,
+    update_latest_position_ids,
+)
 
 if TYPE_CHECKING:
-    from collections.abc import Awaitable, Callable
+    from collections.abc import (
+        AsyncIterator,
+        Awaitable,
+        Callable,
+        Hashable,
+        Iterable,
+        Mapping,
+        Sequence,
+    )
+    from concurrent.futures import Executor
 
+    import numpy as np
+
+    from .cache import ResponseCache
+    from .decoder import JsonLoads
+    from .instrumentation import Observer
     from .models import (
+        CommandModel,
+        CompactModel,
         DeviceModel,
         GeofenceModel,
         PositionModel,
         ReportsEventeModel,
+        ReportsStopModel,
+        ReportsTripModel,
         ServerModel,
     )
+    from .policy import RequestPolicy
 
 
 _LOGGER: Logger = getLogger(__package__)
 
+DEFAULT_REQUEST_TIMEOUT = 10
+DEFAULT_REPORT_SLICE = timedelta(days=1)
+URL_CACHE_SIZE = 128
+DEFAULT_OFFLOAD_THRESHOLD = 1024 * 1024
+# Keeps the request line well below the 8 KiB limit of common servers
+MAX_QUERY_LENGTH = 4000
+# aiohttp 3.14 and later can pass text frames on without decoding them
+WS_DECODE_TEXT_SUPPORTED = (
+    "decode_text" in inspect.signature(aiohttp.ClientSession.ws_connect).parameters
+)
+
 
 class ApiClient:
     """Class for interacting with the Traccar API.
@@ -61,9 +123,47 @@ class ApiClient:
     :param ws_heartbeat: Heartbeat interval (seconds) for the WebSocket used by
         :meth:`subscribe` method. Defaults to ``120``.
     :type ws_heartbeat: int
+    :param request_timeout: Total timeout (seconds) for a single API request.
+        Defaults to ``10``.
+    :type request_timeout: float
+    :param endpoint_timeouts: Per-endpoint overrides of ``request_timeout``,
+        keyed by endpoint path (e.g. ``{"reports/events": 60}``).
+    :type endpoint_timeouts: dict[str, float] | None
+    :param cache: Response cache used by :meth:`get_server`,
+        :meth:`get_devices` and :meth:`get_geofences`. Responses are not cached
+        when ``None`` (the default).
+    :type cache: ResponseCache | None
+    :param json_loads: Function decoding JSON from ``str`` or ``bytes``, used
+        for REST responses, the lazily decoded fields of compact models and
+        WebSocket messages. Defaults to the fastest installed of ``orjson``,
+        ``msgspec`` and :func:`json.loads`. The items of the ``iter_*``
+        methods are decoded with :mod:`json` instead, which also finds where
+        each item ends in the stream.
+    :type json_loads: JsonLoads | None
+    :param request_policy: Rate limiting, retries and circuit breaking applied
+        to every API request. Requests are sent once, as they come, when
+        ``None`` (the default).
+    :type request_policy: RequestPolicy | None
+    :param observer: Hooks called with request latencies, response sizes,
+        decode times, retries and subscription measurements. Nothing is
+        measured when ``None`` (the default).
+    :type observer: Observer | None
+    :param decode_executor: Executor decoding response bodies of at least
+        ``offload_threshold`` bytes, and the bodies of
+        :meth:`get_reports_events_columnar`, so the event loop stays
+        responsive meanwhile. A ``ProcessPoolExecutor`` also runs the decoding
+        in parallel; ``json_loads`` must then be picklable, as the default
+        decoders are. Bodies are decoded in the event loop when ``None`` (the
+        default).
+    :type decode_executor: concurrent.futures.Executor | None
+    :param offload_threshold: Minimum size in bytes of a response body decoded
+        in ``decode_executor``. Defaults to 1 MiB.
+    :type offload_threshold: int
 
     Note:
         Base URL: ``http[s]://{host}:{port or 8082}/api``.
+        Headers, endpoint URLs and timeouts are built once and reused for
+        every request.
         Extra keyword arguments are accepted but ignored for forward
         compatibility.
 
@@ -79,6 +179,14 @@ class ApiClient:
         ssl: bool = False,
         verify_ssl: bool = True,
         ws_heartbeat: int = 120,
+        request_timeout: float = DEFAULT_REQUEST_TIMEOUT,
+        endpoint_timeouts: dict[str, float] | None = None,
+        cache: ResponseCache | None = None,
+        json_loads: JsonLoads | None = None,
+        request_policy: RequestPolicy | None = None,
+        observer: Observer | None = None,
+        decode_executor: Executor | None = None,
+        offload_threshold: int = DEFAULT_OFFLOAD_THRESHOLD,
         **_: Any,
     ) -> None:
         """Initialize the API client."""
@@ -88,13 +196,56 @@ class ApiClient:
         self._verify_ssl = verify_ssl
         self._subscription_status = SubscriptionStatus.DISCONNECTED
         self._ws_heartbeat = ws_heartbeat
+        self._headers: Mapping[str, str] = MappingProxyType(
+            {
+                aiohttp.hdrs.ACCEPT: "application/json",
+                aiohttp.hdrs.AUTHORIZATION: f"Bearer {token}",
+                aiohttp.hdrs.CONTENT_TYPE: "application/json",
+            }
+        )
+        self._timeout = aiohttp.ClientTimeout(total=request_timeout)
+        self._endpoint_timeouts = {
+            endpoint: aiohttp.ClientTimeout(total=timeout)
+            for endpoint, timeout in (endpoint_timeouts or {}).items()
+        }
+        self._urls: dict[str, URL] = {}
+        self._socket_url = URL(f"{self._base_url}/socket")
+        self._cache = cache
+        self._loads = json_loads or default_loads()
+        self._policy = request_policy
+        self._observer = observer
+        self._decode_executor = decode_executor
+        self._offload_threshold = offload_threshold
 
     @property
     def subscription_status(self) -> SubscriptionStatus:
         """Return the current subscription status."""
         return self._subscription_status
 
-    async def _call_api(
+    def _set_subscription_status(self, status: SubscriptionStatus) -> None:
+        """Change the subscription status, passing the transition on."""
+        previous, self._subscription_status = self._subscription_status, status
+        if self._observer is not None and status is not previous:
+            self._observer.on_subscription_status(previous=previous, status=status)
+
+    def _request_context(
+        self,
+        endpoint: str,
+        headers: dict[str, str] | None = None,
+    ) -> tuple[URL, Mapping[str, str], aiohttp.ClientTimeout]:
+        """Return the URL, headers and timeout to use for an endpoint."""
+        if (url := self._urls.get(endpoint)) is None:
+            url = URL(f"{self._base_url}/{endpoint}")
+            if len(self._urls) < URL_CACHE_SIZE:
+                self._urls[endpoint] = url
+        return (
+            url,
+            {**self._headers, **headers} if headers else self._headers,
+            self._endpoint_timeouts.get(endpoint.split("?", 1)[0], self._timeout),
+        )
+
+    @asynccontextmanager
+    async def _request(
         self,
         endpoint: str,
         method: str = "GET",
@@ -102,95 +253,556 @@ class ApiClient:
         params: list[tuple[str, str | int]] | None = None,
         headers: dict[str, str] | None = None,
         data: Any | None = None,
-        **_: Any,
-    ) -> Any:
-        """Call the API endpoint and return the response."""
+        stream: bool = False,
+        conditional: bool = False,
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """Send a request and yield the successful response.
+
+        Errors raised while the response is handled by the caller are mapped
+        to pytraccar exceptions the same way as errors from the request.
+        When ``stream`` is set the timeout applies to the connection and to
+        each read of the body instead of to the request as a whole. When
+        ``conditional`` is set a ``304 Not Modified`` response is also yielded.
+        """
+        url, request_headers, timeout = self._request_context(endpoint, headers)
+        if stream:
+            timeout = aiohttp.ClientTimeout(
+                sock_connect=timeout.total, sock_read=timeout.total
+            )
+        path = route_template(endpoint)
+        started = time.perf_counter()
+        # The duration is measured until the response or the failure
+        unobserved = self._observer is not None
         try:
-            async with self._client_session.request(
+            async with self._send(
                 method=method,
-                url=f"{self._base_url}/{endpoint}",
+                url=url,
+                endpoint=path,
                 ssl=self._verify_ssl,
                 params=params,
                 data=data,
-                headers={
-                    aiohttp.hdrs.ACCEPT: "application/json",
-                    aiohttp.hdrs.AUTHORIZATION: f"Bearer {self._token}",
-                    aiohttp.hdrs.CONTENT_TYPE: "application/json",
-                    **(headers or {}),
-                },
-                timeout=aiohttp.ClientTimeout(total=10),
+                headers=request_headers,
+                timeout=timeout,
             ) as response:
+                if unobserved:
+                    unobserved = False
+                    self._observe_request(method, path, response.status, started)
                 if response.status == 401:
                     raise TraccarAuthenticationException("Unauthorized")
-                if response.status == 200:
-                    return await response.json()
-
-                raise TraccarResponseException(f"{response.status}: {response.reason}")
-        except (TraccarAuthenticationException, TraccarResponseException):
+                if not 200 <= response.status < 300 and not (
+                    conditional and response.status == 304
+                ):
+                    raise TraccarResponseException(
+                        f"{response.status}: {response.reason}"
+                    )
+                yield response
+        except TraccarException:
             raise
         except TimeoutError as exception:
             raise TraccarConnectionException(
                 "Timeouterror connecting to Traccar"
             ) from exception
-        except (aiohttp.ClientError, asyncio.CancelledError) as exception:
+        except aiohttp.ClientError as exception:
             raise TraccarConnectionException(
                 f"Could not communicate with Traccar - {exception}"
             ) from exception
         except Exception as exception:  # pylint: disable=broad-except
             raise TraccarException(f"Unexpected error - {exception}") from exception
+        finally:
+            if unobserved:
+                self._observe_request(method, path, None, started)
+
+    def _observe_request(
+        self, method: str, endpoint: str, status: int | None, started: float
+    ) -> None:
+        """Pass the duration of a request to the observer."""
+        if self._observer is not None:
+            self._observer.on_request(
+                method=method,
+                endpoint=endpoint,
+                status=status,
+                duration=time.perf_counter() - started,
+            )
+
+    @asynccontextmanager
+    async def _send(
+        self, method: str, url: URL, endpoint: str, **kwargs: Any
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """Send a request according to the request policy and yield the response.
+
+        Failed ``GET`` requests are retried before the response is yielded;
+        errors raised while the caller handles the response are not retried.
+        """
+        if (policy := self._policy) is None:
+            async with self._client_session.request(
+                method=method, url=url, **kwargs
+            ) as response:
+                yield response
+            return
+        attempt = 0
+        while True:
+            await policy.before_request()
+            handled = recorded = False
+            try:
+                async with self._client_session.request(
+                    method=method, url=url, **kwargs
+                ) as response:
+                    failed = response.status in policy.retry_statuses
+                    policy.record(failed=failed)
+                    recorded = True
+                    delay = (
+                        policy.retry_delay(
+                            method,
+                            attempt,
+                            response.headers.get(aiohttp.hdrs.RETRY_AFTER),
+                        )
+                        if failed
+                        else None
+                    )
+                    if delay is None:
+                        handled = True
+                        yield response
+                        return
+            except (TimeoutError, aiohttp.ClientError):
+                if handled:
+                    raise
+                if not recorded:
+                    policy.record(failed=True)
+                if (delay := policy.retry_delay(method, attempt)) is None:
+                    raise
+            except BaseException:
+                # A cancelled or otherwise failed request counts as a failure,
+                # so a half-open circuit does not wait for its trial forever
+                if not recorded:
+                    policy.record(failed=True)
+                raise
+            _LOGGER.debug(
+                "Retrying %s %s in %.1f seconds (retry %s)",
+                method,
+                url.path,
+                delay,
+                attempt + 1,
+            )
+            if self._observer is not None:
+                self._observer.on_retry(
+                    method=method, endpoint=endpoint, attempt=attempt + 1, delay=delay
+                )
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _call_api(
+        self,
+        endpoint: str,
+        method: str = "GET",
+        *,
+        params: list[tuple[str, str | int]] | None = None,
+        headers: dict[str, str] | None = None,
+        data: Any | None = None,
+        model: type[CompactModel] | None = None,
+        **_: Any,
+    ) -> Any:
+        """Call the API endpoint and return the response.
+
+        When ``model`` is set the response is decoded into a list of that
+        compact model. Returns ``None`` for an empty response, like the
+        ``204 No Content`` of a deletion.
+        """
+        async with self._request(
+            endpoint,
+            method,
+            params=params,
+            headers=headers,
+            data=data,
+        ) as response:
+            if not (body := await response.read()):
+                return None
+            return await self._decode(endpoint, body, model)
+
+    async def _decode(
+        self, endpoint: str, body: bytes, model: type[CompactModel] | None = None
+    ) -> Any:
+        """Decode a response body, passing its size and decode time on.
+
+        Large bodies are decoded in the decode executor, if there is one.
+        """
+        decode: Callable[[bytes], Any] = (
+            self._loads
+            if model is None
+            else partial(model.from_json_array, loads=self._loads)
+        )
+        offload = (
+            self._decode_executor is not None and len(body) >= self._offload_threshold
+        )
+        if self._observer is None and not offload:
+            return decode(body)
+        started = time.perf_counter()
+        decoded = await self._run_decoder(decode, body) if offload else decode(body)
+        if self._observer is not None:
+            self._observer.on_response(
+                endpoint=route_template(endpoint),
+                size=len(body),
+                decode_duration=time.perf_counter() - started,
+            )
+        return decoded
+
+    async def _run_decoder(self, decode: Callable[..., Any], *args: Any) -> Any:
+        """Run a decoder in the decode executor, or inline without one."""
+        if self._decode_executor is None:
+            return decode(*args)
+        return await asyncio.get_running_loop().run_in_executor(
+            self._decode_executor, decode, *args
+        )
+
+    async def _call_api_cached(
+        self,
+        endpoint: str,
+        *,
+        params: list[tuple[str, str | int]] | None = None,
+    ) -> Any:
+        """Call the API endpoint through the response cache, if enabled."""
+        if self._cache is None:
+            return await self._call_api(endpoint, params=params)
+
+        async def _load(previous: CachedResponse | None) -> CachedResponse:
+            headers: dict[str, str] = {}
+            if previous is not None and previous.etag is not None:
+                headers[aiohttp.hdrs.IF_NONE_MATCH] = previous.etag
+            if previous is not None and previous.last_modified is not None:
+                headers[aiohttp.hdrs.IF_MODIFIED_SINCE] = previous.last_modified
+            async with self._request(
+                endpoint,
+                params=params,
+                headers=headers,
+                conditional=bool(headers),
+            ) as response:
+                if response.status == 304 and previous is not None:
+                    return previous
+                return CachedResponse(
+                    data=await self._decode(endpoint, await response.read()),
+                    etag=response.headers.get(aiohttp.hdrs.ETAG),
+                    last_modified=response.headers.get(aiohttp.hdrs.LAST_MODIFIED),
+                )
+
+        return await self._cache.fetch(endpoint, params, _load)
+
+    def invalidate_cache(self, endpoint: str | None = None) -> None:
+        """Drop cached responses.
+
+        Does nothing when the client has no response cache.
+
+        :param endpoint: Only drop responses for this endpoint, e.g.
+            ``"devices"``. Drops all responses when ``None``.
+        :type endpoint: str | None
+        """
+        if self._cache is not None:
+            self._cache.invalidate(endpoint)
+
+    async def _stream_api(
+        self,
+        endpoint: str,
+        *,
+        params: list[tuple[str, str | int]] | None = None,
+    ) -> AsyncIterator[Any]:
+        """Call the API endpoint and yield the items of the JSON array response."""
+        async with self._request(endpoint, params=params, stream=True) as response:
+            async for item in iter_json_array(
+                response.content.iter_chunked(STREAM_CHUNK_SIZE)
+            ):
+                yield item
+
+    @overload
+    async def get_server(self, *, compact: Literal[False] = ...) -> ServerModel: ...
+
+    @overload
+    async def get_server(self, *, compact: Literal[True]) -> CompactServer: ...
 
-    async def get_server(self) -> ServerModel:
+    async def get_server(self, *, compact: bool = False) -> ServerModel | CompactServer:
         """Get server information.
 
+        :param compact: Return a :class:`CompactServer` instead of a
+            dictionary. The cached response is already decoded, so no field
+            is decoded lazily. Defaults to ``False``.
+        :type compact: bool
         :return: Server information from Traccar.
-        :rtype: ServerModel
+        :rtype: ServerModel | CompactServer
         :raises TraccarAuthenticationException: If authentication fails (401).
         :raises TraccarResponseException: For non-200 HTTP responses.
         :raises TraccarConnectionException: On connectivity/timeouts/client errors.
         :raises TraccarException: For unexpected errors.
         """
-        response: ServerModel = await self._call_api("server")
-        return response
+        response: ServerModel = await self._call_api_cached("server")
+        return CompactServer(response) if compact else response
 
-    async def get_devices(self) -> list[DeviceModel]:
-        """Get all devices from the Traccar API.
+    @overload
+    async def get_devices(
+        self,
+        *,
+        ids: list[int] | None = ...,
+        unique_ids: list[str] | None = ...,
+        user_id: int | None = ...,
+        all_devices: bool = ...,
+        max_concurrency: int = ...,
+        compact: Literal[False] = ...,
+    ) -> list[DeviceModel]: ...
 
+    @overload
+    async def get_devices(
+        self,
+        *,
+        ids: list[int] | None = ...,
+        unique_ids: list[str] | None = ...,
+        user_id: int | None = ...,
+        all_devices: bool = ...,
+        max_concurrency: int = ...,
+        compact: Literal[True],
+    ) -> list[CompactDevice]: ...
+
+    async def get_devices(
+        self,
+        *,
+        ids: list[int] | None = None,
+        unique_ids: list[str] | None = None,
+        user_id: int | None = None,
+        all_devices: bool = False,
+        max_concurrency: int = 4,
+        compact: bool = False,
+    ) -> list[DeviceModel] | list[CompactDevice]:
+        """Get devices from the Traccar API.
+
+        Without ``ids`` and ``unique_ids`` all devices are returned. With
+        either of them, only the matching devices are; long lists are split
+        into several requests to keep the URLs short, which are fetched
+        concurrently and merged.
+
+        :param ids: Device IDs to filter by.
+        :type ids: list[int] | None
+        :param unique_ids: Device ``uniqueId`` values to filter by.
+        :type unique_ids: list[str] | None
+        :param user_id: Only return the devices of this user. Requires
+            administrator or manager rights.
+        :type user_id: int | None
+        :param all_devices: Return the devices of all users, not only those
+            of the authenticated user. Requires administrator rights.
+            Defaults to ``False``.
+        :type all_devices: bool
+        :param max_concurrency: Maximum number of requests in flight when the
+            filters are split. Defaults to ``4``.
+        :type max_concurrency: int
+        :param compact: Return :class:`CompactDevice` instances instead of
+            dictionaries. The cached response is already decoded, so no
+            field is decoded lazily. Defaults to ``False``.
+        :type compact: bool
         :return: A list of devices.
-        :rtype: list[DeviceModel]
+        :rtype: list[DeviceModel] | list[CompactDevice]
         :raises TraccarAuthenticationException: If authentication fails (401).
         :raises TraccarResponseException: For non-200 HTTP responses.
         :raises TraccarConnectionException: On connectivity/timeouts/client errors.
         :raises TraccarException: For unexpected errors.
         """
-        response: list[DeviceModel] = await self._call_api("devices")
+        params: list[tuple[str, str | int]] = []
+        if all_devices:
+            params.append(("all", "true"))
+        if user_id is not None:
+            params.append(("userId", user_id))
+        response: list[DeviceModel]
+        if ids is None and unique_ids is None:
+            response = await self._call_api_cached("devices", params=params or None)
+        else:
+            max_length = MAX_QUERY_LENGTH - len(urlencode(params))
+            response = await self._call_api_batches(
+                "devices",
+                [
+                    [*params, *batch]
+                    for name, values in (("id", ids), ("uniqueId", unique_ids))
+                    for batch in batched_params(name, values or (), max_length)
+                ],
+                max_concurrency=max_concurrency,
+                cached=True,
+            )
+        if compact:
+            return [CompactDevice(item) for item in response]
         return response
 
-    async def get_geofences(self) -> list[GeofenceModel]:
+    @overload
+    async def get_geofences(
+        self, *, compact: Literal[False] = ...
+    ) -> list[GeofenceModel]: ...
+
+    @overload
+    async def get_geofences(
+        self, *, compact: Literal[True]
+    ) -> list[CompactGeofence]: ...
+
+    async def get_geofences(
+        self, *, compact: bool = False
+    ) -> list[GeofenceModel] | list[CompactGeofence]:
         """Get all geofences from the Traccar API.
 
+        :param compact: Return :class:`CompactGeofence` instances instead of
+            dictionaries. The cached response is already decoded, so no
+            field is decoded lazily. Defaults to ``False``.
+        :type compact: bool
         :return: A list of geofences.
-        :rtype: list[GeofenceModel]
+        :rtype: list[GeofenceModel] | list[CompactGeofence]
         :raises TraccarAuthenticationException: If authentication fails (401).
         :raises TraccarResponseException: For non-200 HTTP responses.
         :raises TraccarConnectionException: On connectivity/timeouts/client errors.
         :raises TraccarException: For unexpected errors.
         """
-        response: list[GeofenceModel] = await self._call_api("geofences")
+        response: list[GeofenceModel] = await self._call_api_cached("geofences")
+        if compact:
+            return [CompactGeofence(item) for item in response]
         return response
 
-    async def get_positions(self) -> list[PositionModel]:
-        """Get all positions from the Traccar API.
+    @overload
+    async def get_positions(
+        self,
+        *,
+        devices: list[int] | None = ...,
+        ids: list[int] | None = ...,
+        max_concurrency: int = ...,
+        compact: Literal[False] = ...,
+    ) -> list[PositionModel]: ...
 
+    @overload
+    async def get_positions(
+        self,
+        *,
+        devices: list[int] | None = ...,
+        ids: list[int] | None = ...,
+        max_concurrency: int = ...,
+        compact: Literal[True],
+    ) -> list[CompactPosition]: ...
+
+    async def get_positions(
+        self,
+        *,
+        devices: list[int] | None = None,
+        ids: list[int] | None = None,
+        max_concurrency: int = 4,
+        compact: bool = False,
+    ) -> list[PositionModel] | list[CompactPosition]:
+        """Get positions from the Traccar API.
+
+        Without ``devices`` and ``ids`` the latest position of every device is
+        returned. With either of them, only the matching positions are. As
+        Traccar takes a single ``deviceId`` per request, every device is
+        requested separately, and long ``ids`` lists are split into several
+        requests to keep the URLs short. The requests are fetched
+        concurrently and merged.
+
+        :param devices: Return the latest positions of these device IDs.
+        :type devices: list[int] | None
+        :param ids: Position IDs to return.
+        :type ids: list[int] | None
+        :param max_concurrency: Maximum number of requests in flight when the
+            filters are split. Defaults to ``4``.
+        :type max_concurrency: int
+        :param compact: Return :class:`CompactPosition` instances instead of
+            dictionaries. Defaults to ``False``.
+        :type compact: bool
         :return: A list of positions.
-        :rtype: list[PositionModel]
+        :rtype: list[PositionModel] | list[CompactPosition]
         :raises TraccarAuthenticationException: If authentication fails (401).
         :raises TraccarResponseException: For non-200 HTTP responses.
         :raises TraccarConnectionException: On connectivity/timeouts/client errors.
         :raises TraccarException: For unexpected errors.
         """
-        response: list[PositionModel] = await self._call_api("positions")
+        model = CompactPosition if compact else None
+        response: list[PositionModel] | list[CompactPosition]
+        if devices is None and ids is None:
+            response = await self._call_api("positions", model=model)
+        else:
+            batches: list[list[tuple[str, str | int]]] = [
+                [("deviceId", device)] for device in devices or ()
+            ]
+            batches += batched_params("id", ids or (), MAX_QUERY_LENGTH)
+            response = await self._call_api_batches(
+                "positions",
+                batches,
+                max_concurrency=max_concurrency,
+                model=model,
+            )
         return response
 
+    async def _call_api_batches(
+        self,
+        endpoint: str,
+        batches: list[list[tuple[str, str | int]]],
+        *,
+        max_concurrency: int,
+        cached: bool = False,
+        model: type[CompactModel] | None = None,
+    ) -> list[Any]:
+        """Call the API endpoint once per batch of parameters.
+
+        The responses are merged, keeping the first item of every ``id``.
+        """
+        responses: list[list[Any]] = await gather_limited(
+            max_concurrency,
+            *(
+                self._call_api_cached(endpoint, params=params)
+                if cached
+                else self._call_api(endpoint, params=params, model=model)
+                for params in batches
+            ),
+        )
+        if len(responses) == 1:
+            return responses[0]
+        merged: dict[int, Any] = {}
+        for item in (item for response in responses for item in response):
+            merged.setdefault(item["id"], item)
+        return list(merged.values())
+
+    async def iter_positions(self) -> AsyncIterator[PositionModel]:
+        """Iterate over all positions from the Traccar API.
+
+        The response is decoded incrementally, so only one position is held in
+        memory at a time regardless of the size of the response.
+
+        :return: An async iterator over the positions.
+        :rtype: AsyncIterator[PositionModel]
+        :raises TraccarAuthenticationException: If authentication fails (401).
+        :raises TraccarResponseException: For non-200 HTTP responses.
+        :raises TraccarConnectionException: On connectivity/timeouts/client errors.
+        :raises TraccarException: For unexpected errors, including malformed
+            responses.
+        """
+        async for position in self._stream_api("positions"):
+            yield position
+
+    @overload
+    async def get_reports_events(
+        self,
+        *,
+        devices: list[int] | None = ...,
+        groups: list[int] | None = ...,
+        event_types: list[str] | None = ...,
+        start_time: datetime | None = ...,
+        end_time: datetime | None = ...,
+        time_slice: timedelta | None = ...,
+        device_batch_size: int | None = ...,
+        max_concurrency: int = ...,
+        compact: Literal[False] = ...,
+        **_: Any,
+    ) -> list[ReportsEventeModel]: ...
+
+    @overload
+    async def get_reports_events(
+        self,
+        *,
+        devices: list[int] | None = ...,
+        groups: list[int] | None = ...,
+        event_types: list[str] | None = ...,
+        start_time: datetime | None = ...,
+        end_time: datetime | None = ...,
+        time_slice: timedelta | None = ...,
+        device_batch_size: int | None = ...,
+        max_concurrency: int = ...,
+        compact: Literal[True],
+        **_: Any,
+    ) -> list[CompactReportsEvent]: ...
+
     async def get_reports_events(
         self,
         *,
@@ -199,10 +811,18 @@ class ApiClient:
         event_types: list[str] | None = None,
         start_time: datetime | None = None,
         end_time: datetime | None = None,
+        time_slice: timedelta | None = None,
+        device_batch_size: int | None = None,
+        max_concurrency: int = 4,
+        compact: bool = False,
         **_: Any,
-    ) -> list[ReportsEventeModel]:
+    ) -> list[ReportsEventeModel] | list[CompactReportsEvent]:
         """Get events.
 
+        When ``time_slice`` or ``device_batch_size`` is set, the report is split
+        into smaller requests that are fetched concurrently. The results are
+        merged, de-duplicated by event ``id`` and ordered by ``eventTime``.
+
         :param devices: Device IDs to filter by.
         :type devices: list[int] | None
         :param groups: Group IDs to filter by.
@@ -213,108 +833,896 @@ class ApiClient:
         :type start_time: datetime | None
         :param end_time: End time inclusive. If naive, treated as UTC.
         :type end_time: datetime | None
+        :param time_slice: Maximum time range covered by a single request.
+        :type time_slice: timedelta | None
+        :param device_batch_size: Maximum number of ``devices`` in a single
+            request.
+        :type device_batch_size: int | None
+        :param max_concurrency: Maximum number of requests in flight when the
+            report is split. Defaults to ``4``.
+        :type max_concurrency: int
+        :param compact: Return :class:`CompactReportsEvent` instances instead
+            of dictionaries. Defaults to ``False``.
+        :type compact: bool
         :return: A list of events matching the filters.
-        :rtype: list[ReportsEventeModel]
+        :rtype: list[ReportsEventeModel] | list[CompactReportsEvent]
         :raises TraccarAuthenticationException: If authentication fails (401).
         :raises TraccarResponseException: For non-200 HTTP responses.
         :raises TraccarConnectionException: On connectivity/timeouts/client errors.
         :raises TraccarException: For unexpected errors.
         """
-        datetime_now = datetime.now(tz=UTC).replace(tzinfo=None)
-        start_time = start_time or datetime_now
-        end_time = end_time or datetime_now - timedelta(hours=30)
-        response: list[ReportsEventeModel] = await self._call_api(
+        range_from, range_to = self._reports_events_window(start_time, end_time)
+        model = CompactReportsEvent if compact else None
+        if time_slice is None and device_batch_size is None:
+            response: list[ReportsEventeModel] = await self._call_api(
+                "reports/events",
+                model=model,
+                params=self._reports_events_params(
+                    range_from,
+                    range_to,
+                    devices=devices,
+                    groups=groups,
+                    event_types=event_types,
+                ),
+            )
+            return response
+
+        device_batches: list[list[int] | None] = [devices]
+        if devices and device_batch_size:
+            device_batches = [*batched(devices, device_batch_size)]
+        time_slices = (
+            split_time_range(range_from, range_to, time_slice)
+            if time_slice is not None
+            else [(range_from, range_to)]
+        )
+        responses: list[list[ReportsEventeModel]] = await gather_limited(
+            max_concurrency,
+            *(
+                self._call_api(
+                    "reports/events",
+                    model=model,
+                    params=self._reports_events_params(
+                        slice_from,
+                        slice_to,
+                        devices=device_batch,
+                        groups=groups,
+                        event_types=event_types,
+                    ),
+                )
+                for slice_from, slice_to in time_slices
+                for device_batch in device_batches
+            ),
+        )
+        events = {event["id"]: event for response in responses for event in response}
+        return sorted(
+            events.values(), key=lambda event: (event["eventTime"], event["id"])
+        )
+
+    async def iter_reports_events(
+        self,
+        *,
+        devices: list[int] | None = None,
+        groups: list[int] | None = None,
+        event_types: list[str] | None = None,
+        start_time: datetime | None = None,
+        end_time: datetime | None = None,
+        **_: Any,
+    ) -> AsyncIterator[ReportsEventeModel]:
+        """Iterate over events.
+
+        Takes the same filters as :meth:`get_reports_events`. The response is
+        decoded incrementally, so only one event is held in memory at a time
+        regardless of the size of the report.
+
+        :return: An async iterator over the events matching the filters.
+        :rtype: AsyncIterator[ReportsEventeModel]
+        :raises TraccarAuthenticationException: If authentication fails (401).
+        :raises TraccarResponseException: For non-200 HTTP responses.
+        :raises TraccarConnectionException: On connectivity/timeouts/client errors.
+        :raises TraccarException: For unexpected errors, including malformed
+            responses.
+        """
+        async for event in self._stream_api(
+            "reports/events",
+            params=self._reports_events_params(
+                *self._reports_events_window(start_time, end_time),
+                devices=devices,
+                groups=groups,
+                event_types=event_types,
+            ),
+        ):
+            yield event
+
+    async def get_reports_events_columnar(
+        self,
+        *,
+        devices: list[int] | None = None,
+        groups: list[int] | None = None,
+        event_types: list[str] | None = None,
+        start_time: datetime | None = None,
+        end_time: datetime | None = None,
+        attributes: Sequence[str] = (),
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> list[np.ndarray[Any, Any]]:
+        """Get events as NumPy structured arrays.
+
+        Takes the same filters as :meth:`get_reports_events`. The response is
+        decoded and converted by :func:`~pytraccar.columnar.events_from_json`
+        in the decode executor of the client, if there is one, so the event
+        loop stays responsive while large reports are processed. Requires
+        ``numpy``.
+
+        :param attributes: Keys of ``attributes`` to add as fields.
+        :type attributes: Sequence[str]
+        :param chunk_size: Maximum number of events per array. Defaults to
+            ``100000``.
+        :type chunk_size: int
+        :return: The events in order, split into arrays with the fields of
+            :func:`~pytraccar.columnar.events_to_numpy`.
+        :rtype: list[numpy.ndarray]
+        :raises TraccarAuthenticationException: If authentication fails (401).
+        :raises TraccarResponseException: For non-200 HTTP responses.
+        :raises TraccarConnectionException: On connectivity/timeouts/client errors.
+        :raises TraccarException: For unexpected errors.
+        """
+        async with self._request(
             "reports/events",
-            params=[
-                ("to", start_time.isoformat() + "Z"),
-                ("from", end_time.isoformat() + "Z"),
-                *[("deviceId", device) for device in devices or []],
-                *[("groupId", group) for group in groups or []],
-                *[("type", value) for value in event_types or ""],
-            ],
+            params=self._reports_events_params(
+                *self._reports_events_window(start_time, end_time),
+                devices=devices,
+                groups=groups,
+                event_types=event_types,
+            ),
+        ) as response:
+            chunks: list[np.ndarray[Any, Any]] = await self._run_decoder(
+                partial(
+                    events_from_json,
+                    attributes=tuple(attributes),
+                    chunk_size=chunk_size,
+                    loads=self._loads,
+                ),
+                await response.read(),
+            )
+            return chunks
+
+    @staticmethod
+    def _reports_events_window(
+        start_time: datetime | None,
+        end_time: datetime | None,
+    ) -> tuple[datetime, datetime]:
+        """Return the ``(from, to)`` range of a report in UTC, oldest first."""
+        datetime_now = datetime.now(tz=UTC).replace(tzinfo=None)
+        start_time = to_naive_utc(start_time) if start_time else datetime_now
+        end_time = (
+            to_naive_utc(end_time) if end_time else datetime_now - timedelta(hours=30)
+        )
+        return (min(start_time, end_time), max(start_time, end_time))
+
+    @staticmethod
+    def _reports_events_params(
+        range_from: datetime,
+        range_to: datetime,
+        *,
+        devices: list[int] | None,
+        groups: list[int] | None,
+        event_types: list[str] | None,
+    ) -> list[tuple[str, str | int]]:
+        """Build the query parameters for the reports/events endpoint."""
+        return [
+            ("to", format_timestamp(range_to)),
+            ("from", format_timestamp(range_from)),
+            *[("deviceId", device) for device in devices or []],
+            *[("groupId", group) for group in groups or []],
+            *[("type", value) for value in event_types or ""],
+        ]
+
+    async def iter_reports_route(
+        self,
+        *,
+        devices: list[int] | None = None,
+        groups: list[int] | None = None,
+        start_time: datetime | None = None,
+        end_time: datetime | None = None,
+        time_slice: timedelta | None = DEFAULT_REPORT_SLICE,
+        max_concurrency: int = 4,
+    ) -> AsyncIterator[PositionModel]:
+        """Iterate over the route report, oldest position first.
+
+        The time range is split into slices of ``time_slice``, and every slice
+        is requested for each device and each group concurrently. The
+        responses are merged in time order, and the next slice is fetched
+        while the current one is consumed, so memory stays bounded by the
+        size of two slices however long the range is.
+
+        :param devices: Device IDs to report on.
+        :type devices: list[int] | None
+        :param groups: Group IDs to report on.
+        :type groups: list[int] | None
+        :param start_time: Start time inclusive. If naive, treated as UTC.
+        :type start_time: datetime | None
+        :param end_time: End time inclusive. If naive, treated as UTC.
+        :type end_time: datetime | None
+        :param time_slice: Maximum time range covered by a single request.
+            Defaults to one day; not split when ``None``.
+        :type time_slice: timedelta | None
+        :param max_concurrency: Maximum number of requests in flight. Defaults
+            to ``4``.
+        :type max_concurrency: int
+        :return: An async iterator over the positions, ordered by ``fixTime``.
+        :rtype: AsyncIterator[PositionModel]
+        :raises TraccarAuthenticationException: If authentication fails (401).
+        :raises TraccarResponseException: For non-200 HTTP responses.
+        :raises TraccarConnectionException: On connectivity/timeouts/client errors.
+        :raises TraccarException: If no devices or groups are given, or for
+            unexpected errors.
+        """
+        async for position in self._iter_report(
+            "reports/route",
+            "fixTime",
+            itemgetter("id"),
+            devices=devices,
+            groups=groups,
+            start_time=start_time,
+            end_time=end_time,
+            time_slice=time_slice,
+            max_concurrency=max_concurrency,
+        ):
+            yield position
+
+    async def iter_position_history(
+        self,
+        *,
+        devices: list[int],
+        start_time: datetime | None = None,
+        end_time: datetime | None = None,
+        time_slice: timedelta | None = DEFAULT_REPORT_SLICE,
+        max_concurrency: int = 4,
+    ) -> AsyncIterator[PositionModel]:
+        """Iterate over the positions of devices in a time range, oldest first.
+
+        Takes the same arguments as :meth:`iter_reports_route`, except that
+        the positions endpoint does not filter by group.
+
+        :return: An async iterator over the positions, ordered by ``fixTime``.
+        :rtype: AsyncIterator[PositionModel]
+        :raises TraccarAuthenticationException: If authentication fails (401).
+        :raises TraccarResponseException: For non-200 HTTP responses.
+        :raises TraccarConnectionException: On connectivity/timeouts/client errors.
+        :raises TraccarException: If no devices are given, or for unexpected
+            errors.
+        """
+        async for position in self._iter_report(
+            "positions",
+            "fixTime",
+            itemgetter("id"),
+            devices=devices,
+            groups=None,
+            start_time=start_time,
+            end_time=end_time,
+            time_slice=time_slice,
+            max_concurrency=max_concurrency,
+        ):
+            yield position
+
+    async def iter_reports_trips(
+        self,
+        *,
+        devices: list[int] | None = None,
+        groups: list[int] | None = None,
+        start_time: datetime | None = None,
+        end_time: datetime | None = None,
+        time_slice: timedelta | None = DEFAULT_REPORT_SLICE,
+        max_concurrency: int = 4,
+    ) -> AsyncIterator[ReportsTripModel]:
+        """Iterate over the trips report, oldest trip first.
+
+        Takes the same arguments as :meth:`iter_reports_route`. A trip
+        crossing the boundary of a time slice may be cut in two by Traccar.
+
+        :return: An async iterator over the trips, ordered by ``startTime``.
+        :rtype: AsyncIterator[ReportsTripModel]
+        :raises TraccarAuthenticationException: If authentication fails (401).
+        :raises TraccarResponseException: For non-200 HTTP responses.
+        :raises TraccarConnectionException: On connectivity/timeouts/client errors.
+        :raises TraccarException: If no devices or groups are given, or for
+            unexpected errors.
+        """
+        async for trip in self._iter_report(
+            "reports/trips",
+            "startTime",
+            itemgetter("deviceId", "startTime"),
+            devices=devices,
+            groups=groups,
+            start_time=start_time,
+            end_time=end_time,
+            time_slice=time_slice,
+            max_concurrency=max_concurrency,
+        ):
+            yield trip
+
+    async def iter_reports_stops(
+        self,
+        *,
+        devices: list[int] | None = None,
+        groups: list[int] | None = None,
+        start_time: datetime | None = None,
+        end_time: datetime | None = None,
+        time_slice: timedelta | None = DEFAULT_REPORT_SLICE,
+        max_concurrency: int = 4,
+    ) -> AsyncIterator[ReportsStopModel]:
+        """Iterate over the stops report, oldest stop first.
+
+        Takes the same arguments as :meth:`iter_reports_route`. A stop
+        crossing the boundary of a time slice may be cut in two by Traccar.
+
+        :return: An async iterator over the stops, ordered by ``startTime``.
+        :rtype: AsyncIterator[ReportsStopModel]
+        :raises TraccarAuthenticationException: If authentication fails (401).
+        :raises TraccarResponseException: For non-200 HTTP responses.
+        :raises TraccarConnectionException: On connectivity/timeouts/client errors.
+        :raises TraccarException: If no devices or groups are given, or for
+            unexpected errors.
+        """
+        async for stop in self._iter_report(
+            "reports/stops",
+            "startTime",
+            itemgetter("deviceId", "startTime"),
+            devices=devices,
+            groups=groups,
+            start_time=start_time,
+            end_time=end_time,
+            time_slice=time_slice,
+            max_concurrency=max_concurrency,
+        ):
+            yield stop
+
+    async def _iter_report(
+        self,
+        endpoint: str,
+        time_key: str,
+        identity: Callable[[Any], Hashable],
+        *,
+        devices: list[int] | None,
+        groups: list[int] | None,
+        start_time: datetime | None,
+        end_time: datetime | None,
+        time_slice: timedelta | None,
+        max_concurrency: int,
+    ) -> AsyncIterator[Any]:
+        """Fetch a report in time slices and yield its items in time order.
+
+        Every slice is requested for each device and each group separately,
+        at most ``max_concurrency`` requests at a time, and the responses are
+        merged by ``time_key``. The next slice is fetched while the current
+        one is consumed, so at most two slices are held in memory. Items
+        returned for overlapping targets or for two adjacent slices are
+        yielded once.
+        """
+        if not devices and not groups:
+            raise TraccarException("A report needs at least one device or group")
+        range_from, range_to = self._reports_events_window(start_time, end_time)
+        slices = (
+            split_time_range(range_from, range_to, time_slice)
+            if time_slice is not None
+            else [(range_from, range_to)]
+        )
+        targets: list[tuple[list[int] | None, list[int] | None]] = [
+            *(([device], None) for device in devices or ()),
+            *((None, [group]) for group in groups or ()),
+        ]
+        key = itemgetter(time_key)
+
+        async def _fetch(slice_from: datetime, slice_to: datetime) -> list[Any]:
+            responses: list[list[Any]] = await gather_limited(
+                max_concurrency,
+                *(
+                    self._call_api(
+                        endpoint,
+                        params=self._reports_events_params(
+                            slice_from,
+                            slice_to,
+                            devices=target_devices,
+                            groups=target_groups,
+                            event_types=None,
+                        ),
+                    )
+                    for target_devices, target_groups in targets
+                ),
+            )
+            return list(
+                heapq.merge(
+                    *(sorted(response, key=key) for response in responses), key=key
+                )
+            )
+
+        pending = asyncio.ensure_future(_fetch(*slices[0]))
+        previous: set[Hashable] = set()
+        try:
+            for next_slice in [*slices[1:], None]:
+                items = await pending
+                if next_slice is not None:
+                    pending = asyncio.ensure_future(_fetch(*next_slice))
+                current: set[Hashable] = set()
+                for item in items:
+                    if (item_id := identity(item)) in previous or item_id in current:
+                        continue
+                    current.add(item_id)
+                    yield item
+                previous = current
+        finally:
+            pending.cancel()
+            await asyncio.wait([pending])
+            if not pending.cancelled():
+                # Retrieve the error of a prefetch that failed before the
+                # iteration was left
+                pending.exception()
+
+    async def call_raw(
+        self,
+        endpoint: str,
+        *,
+        method: str = "GET",
+        params: list[tuple[str, str | int]] | None = None,
+        data: bytes | str | None = None,
+    ) -> RawResponse:
+        """Call an API endpoint and return the response without decoding it.
+
+        Useful to relay responses: the body can be passed on as it is,
+        without decoding and encoding it again.
+
+        :param endpoint: The endpoint, relative to ``/api``, e.g.
+            ``"positions"``.
+        :type endpoint: str
+        :param method: The HTTP method. Defaults to ``"GET"``.
+        :type method: str
+        :param params: Query parameters.
+        :type params: list[tuple[str, str | int]] | None
+        :param data: Request body, e.g. encoded JSON.
+        :type data: bytes | str | None
+        :return: The status, headers and undecoded body.
+        :rtype: RawResponse
+        :raises TraccarAuthenticationException: If authentication fails (401).
+        :raises TraccarResponseException: For non-2xx HTTP responses.
+        :raises TraccarConnectionException: On connectivity/timeouts/client errors.
+        :raises TraccarException: For unexpected errors.
+        """
+        async with self._request(
+            endpoint, method, params=params, data=data
+        ) as response:
+            return RawResponse(response.status, response.headers, await response.read())
+
+    @asynccontextmanager
+    async def stream_raw(
+        self,
+        endpoint: str,
+        *,
+        method: str = "GET",
+        params: list[tuple[str, str | int]] | None = None,
+        data: bytes | str | None = None,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+    ) -> AsyncIterator[RawStream]:
+        """Call an API endpoint and read the undecoded body in chunks.
+
+        Unlike :meth:`call_raw`, the body is never held in memory as a whole;
+        iterate over the stream or pass it to a sink with
+        :meth:`RawStream.write_to`. The timeout applies to each read of the
+        body instead of to the request as a whole.
+
+        :param endpoint: The endpoint, relative to ``/api``, e.g.
+            ``"positions"``.
+        :type endpoint: str
+        :param method: The HTTP method. Defaults to ``"GET"``.
+        :type method: str
+        :param params: Query parameters.
+        :type params: list[tuple[str, str | int]] | None
+        :param data: Request body, e.g. encoded JSON.
+        :type data: bytes | str | None
+        :param chunk_size: Maximum size of a chunk, in bytes. Defaults to
+            64 KiB.
+        :type chunk_size: int
+        :return: A context manager yielding the stream.
+        :rtype: AsyncIterator[RawStream]
+        :raises TraccarAuthenticationException: If authentication fails (401).
+        :raises TraccarResponseException: For non-2xx HTTP responses.
+        :raises TraccarConnectionException: On connectivity/timeouts/client errors.
+        :raises TraccarException: For unexpected errors.
+        """
+        async with self._request(
+            endpoint, method, params=params, data=data, stream=True
+        ) as response:
+            yield RawStream(response, chunk_size)
+
+    async def create_device(self, device: Mapping[str, Any]) -> DeviceModel:
+        """Create a device.
+
+        :param device: The device fields; at least ``name`` and ``uniqueId``.
+        :type device: Mapping[str, Any]
+        :return: The created device, with its ``id``.
+        :rtype: DeviceModel
+        :raises TraccarAuthenticationException: If authentication fails (401).
+        :raises TraccarResponseException: For non-2xx HTTP responses.
+        :raises TraccarConnectionException: On connectivity/timeouts/client errors.
+        :raises TraccarException: For unexpected errors.
+        """
+        response: DeviceModel = await self._write(
+            "devices", "POST", device, invalidates=("devices",)
+        )
+        return response
+
+    async def update_device(self, device: Mapping[str, Any]) -> DeviceModel:
+        """Update a device.
+
+        Traccar replaces the device, so pass all of its fields, e.g. a device
+        from :meth:`get_devices` with some of them changed.
+
+        :param device: The device, including its ``id``.
+        :type device: Mapping[str, Any]
+        :return: The updated device.
+        :rtype: DeviceModel
+        :raises TraccarAuthenticationException: If authentication fails (401).
+        :raises TraccarResponseException: For non-2xx HTTP responses.
+        :raises TraccarConnectionException: On connectivity/timeouts/client errors.
+        :raises TraccarException: If the device has no ``id``, or for unexpected
+            errors.
+        """
+        if "id" not in device:
+            raise TraccarException("Device without id")
+        response: DeviceModel = await self._write(
+            f"devices/{device['id']}", "PUT", device, invalidates=("devices",)
+        )
+        return response
+
+    async def delete_device(self, device_id: int) -> None:
+        """Delete a device.
+
+        :param device_id: The ``id`` of the device.
+        :type device_id: int
+        :raises TraccarAuthenticationException: If authentication fails (401).
+        :raises TraccarResponseException: For non-2xx HTTP responses.
+        :raises TraccarConnectionException: On connectivity/timeouts/client errors.
+        :raises TraccarException: For unexpected errors.
+        """
+        await self._write(f"devices/{device_id}", "DELETE", invalidates=("devices",))
+
+    async def create_geofence(self, geofence: Mapping[str, Any]) -> GeofenceModel:
+        """Create a geofence.
+
+        :param geofence: The geofence fields; at least ``name`` and ``area``.
+        :type geofence: Mapping[str, Any]
+        :return: The created geofence, with its ``id``.
+        :rtype: GeofenceModel
+        :raises TraccarAuthenticationException: If authentication fails (401).
+        :raises TraccarResponseException: For non-2xx HTTP responses.
+        :raises TraccarConnectionException: On connectivity/timeouts/client errors.
+        :raises TraccarException: For unexpected errors.
+        """
+        response: GeofenceModel = await self._write(
+            "geofences", "POST", geofence, invalidates=("geofences",)
+        )
+        return response
+
+    async def update_geofence(self, geofence: Mapping[str, Any]) -> GeofenceModel:
+        """Update a geofence.
+
+        Traccar replaces the geofence, so pass all of its fields.
+
+        :param geofence: The geofence, including its ``id``.
+        :type geofence: Mapping[str, Any]
+        :return: The updated geofence.
+        :rtype: GeofenceModel
+        :raises TraccarAuthenticationException: If authentication fails (401).
+        :raises TraccarResponseException: For non-2xx HTTP responses.
+        :raises TraccarConnectionException: On connectivity/timeouts/client errors.
+        :raises TraccarException: If the geofence has no ``id``, or for
+            unexpected errors.
+        """
+        if "id" not in geofence:
+            raise TraccarException("Geofence without id")
+        response: GeofenceModel = await self._write(
+            f"geofences/{geofence['id']}", "PUT", geofence, invalidates=("geofences",)
+        )
+        return response
+
+    async def delete_geofence(self, geofence_id: int) -> None:
+        """Delete a geofence.
+
+        :param geofence_id: The ``id`` of the geofence.
+        :type geofence_id: int
+        :raises TraccarAuthenticationException: If authentication fails (401).
+        :raises TraccarResponseException: For non-2xx HTTP responses.
+        :raises TraccarConnectionException: On connectivity/timeouts/client errors.
+        :raises TraccarException: For unexpected errors.
+        """
+        await self._write(
+            f"geofences/{geofence_id}", "DELETE", invalidates=("geofences",)
+        )
+
+    async def add_permission(self, permission: Mapping[str, int]) -> None:
+        """Link two objects, e.g. a geofence to a device.
+
+        :param permission: The ids of the two objects, e.g.
+            ``{"deviceId": 1, "geofenceId": 2}``.
+        :type permission: Mapping[str, int]
+        :raises TraccarAuthenticationException: If authentication fails (401).
+        :raises TraccarResponseException: For non-2xx HTTP responses.
+        :raises TraccarConnectionException: On connectivity/timeouts/client errors.
+        :raises TraccarException: For unexpected errors.
+        """
+        await self._write(
+            "permissions", "POST", permission, invalidates=("devices", "geofences")
+        )
+
+    async def remove_permission(self, permission: Mapping[str, int]) -> None:
+        """Unlink two objects linked with :meth:`add_permission`.
+
+        :param permission: The ids of the two objects, e.g.
+            ``{"deviceId": 1, "geofenceId": 2}``.
+        :type permission: Mapping[str, int]
+        :raises TraccarAuthenticationException: If authentication fails (401).
+        :raises TraccarResponseException: For non-2xx HTTP responses.
+        :raises TraccarConnectionException: On connectivity/timeouts/client errors.
+        :raises TraccarException: For unexpected errors.
+        """
+        await self._write(
+            "permissions", "DELETE", permission, invalidates=("devices", "geofences")
+        )
+
+    async def send_command(
+        self,
+        device_id: int,
+        command_type: str,
+        *,
+        attributes: Mapping[str, Any] | None = None,
+    ) -> CommandModel:
+        """Send a command to a device.
+
+        Traccar queues the command when the device is offline.
+
+        :param device_id: The ``id`` of the device.
+        :type device_id: int
+        :param command_type: The command, e.g. ``"engineStop"``.
+        :type command_type: str
+        :param attributes: Parameters of the command.
+        :type attributes: Mapping[str, Any] | None
+        :return: The sent or queued command.
+        :rtype: CommandModel
+        :raises TraccarAuthenticationException: If authentication fails (401).
+        :raises TraccarResponseException: For non-2xx HTTP responses.
+        :raises TraccarConnectionException: On connectivity/timeouts/client errors.
+        :raises TraccarException: For unexpected errors.
+        """
+        response: CommandModel = await self._write(
+            "commands/send",
+            "POST",
+            {
+                "deviceId": device_id,
+                "type": command_type,
+                "attributes": dict(attributes or {}),
+            },
+            invalidates=(),
         )
         return response
 
+    async def _write(
+        self,
+        endpoint: str,
+        method: str,
+        body: Mapping[str, Any] | None = None,
+        *,
+        invalidates: tuple[str, ...],
+    ) -> Any:
+        """Send a change and drop the cached responses it affects.
+
+        The responses are dropped even if the request fails, as the change
+        may have been applied before the failure.
+        """
+        try:
+            return await self._call_api(
+                endpoint, method, data=None if body is None else json.dumps(body)
+            )
+        finally:
+            for cached in invalidates:
+                self.invalidate_cache(cached)
+
+    async def bulk[ItemT, ResultT](
+        self,
+        items: Iterable[ItemT],
+        operation: Callable[[ItemT], Awaitable[ResultT]],
+        *,
+        max_concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    ) -> BulkResult[ResultT]:
+        """Call ``operation`` for many items concurrently.
+
+        A failing item does not stop the others; the failures are returned
+        with the results. For example,
+        ``await client.bulk(geofences, client.create_geofence)``.
+
+        :param items: The items to process.
+        :type items: Iterable[ItemT]
+        :param operation: Coroutine function called with every item, e.g. one
+            of the methods of this client.
+        :type operation: Callable[[ItemT], Awaitable[ResultT]]
+        :param max_concurrency: Maximum number of operations in flight.
+            Defaults to ``8``.
+        :type max_concurrency: int
+        :return: The results and the failures, in the order of the items.
+        :rtype: BulkResult[ResultT]
+        """
+        return await run_bulk(items, operation, max_concurrency=max_concurrency)
+
+    async def bulk_upsert_devices(
+        self,
+        devices: Iterable[Mapping[str, Any]],
+        *,
+        max_concurrency: int = DEFAULT_BULK_CONCURRENCY,
+    ) -> BulkResult[DeviceModel]:
+        """Create or update many devices, matched by ``uniqueId``.
+
+        Devices with an unknown ``uniqueId`` are created. Known devices are
+        updated with the given fields, unless they already have these values;
+        then no request is sent. Running the same upsert twice therefore
+        creates no duplicates and sends no changes the second time.
+
+        :param devices: The device fields, each with ``uniqueId``.
+        :type devices: Iterable[Mapping[str, Any]]
+        :param max_concurrency: Maximum number of requests in flight.
+            Defaults to ``8``.
+        :type max_concurrency: int
+        :return: The created, updated and unchanged devices, and the devices
+            that failed, including those repeating a ``uniqueId``.
+        :rtype: BulkResult[DeviceModel]
+        :raises TraccarException: If fetching the existing devices fails.
+        """
+        existing: dict[str, DeviceModel] = {
+            device["uniqueId"]: device for device in await self._call_api("devices")
+        }
+        seen: set[str] = set()
+
+        async def _upsert(device: Mapping[str, Any]) -> DeviceModel:
+            if (unique_id := device.get("uniqueId")) is None:
+                raise TraccarException("Device without uniqueId")
+            if unique_id in seen:
+                raise TraccarException(f"Duplicate uniqueId {unique_id}")
+            seen.add(unique_id)
+            if (current := existing.get(unique_id)) is None:
+                return await self.create_device(device)
+            if all(current.get(key) == value for key, value in device.items()):
+                return current
+            return await self.update_device({**current, **device})
+
+        return await run_bulk(devices, _upsert, max_concurrency=max_concurrency)
+
+    @overload
+    async def subscribe(
+        self,
+        callback: Callable[[SubscriptionData], Awaitable[None]],
+        *,
+        reconnect: bool = ...,
+        backoff: ExponentialBackoff | None = ...,
+        gap_fill: bool = ...,
+        coalesce_interval: float | None = ...,
+        raw: Literal[False] = ...,
+    ) -> None: ...
+
+    @overload
+    async def subscribe(
+        self,
+        callback: Callable[[bytes], Awaitable[None]],
+        *,
+        reconnect: bool = ...,
+        backoff: ExponentialBackoff | None = ...,
+        raw: Literal[True],
+    ) -> None: ...
+
     async def subscribe(
-        self, callback: Callable[[SubscriptionData], Awaitable[None]]
+        self,
+        callback: Callable[[Any], Awaitable[None]],
+        *,
+        reconnect: bool = False,
+        backoff: ExponentialBackoff | None = None,
+        gap_fill: bool = False,
+        coalesce_interval: float | None = None,
+        raw: bool = False,
     ) -> None:
         """Subscribe to events via WebSocket and invoke the callback for each message.
 
+        With ``reconnect`` set, a lost connection is re-established after a
+        jittered exponential backoff while :attr:`subscription_status` is
+        ``RECONNECTING``. The session cookie is reused for the new connection
+        for as long as Traccar accepts it. With ``gap_fill`` also set, the latest
+        positions are fetched when the subscription connects, and positions
+        that changed while disconnected are fetched once the connection is back
+        and passed to the callback as a ``positions`` message.
+
+        With ``coalesce_interval`` set, positions are collected for that many
+        seconds and only the newest position of every device is passed on (see
+        :class:`PositionCoalescer`).
+
+        The callback is awaited before the next message is read. Pass a
+        :class:`Dispatcher` as the callback to handle messages in the background.
+
         :param callback: Coroutine called with incoming payloads. The payload is a
             mapping with optional keys ``devices``, ``events``, and ``positions``.
         :type callback: Callable[[SubscriptionData], Awaitable[None]]
+        :param reconnect: Reconnect when the connection is lost. Defaults to
+            ``False``.
+        :type reconnect: bool
+        :param backoff: Delays between reconnect attempts. Defaults to
+            :class:`ExponentialBackoff` with its default settings.
+        :type backoff: ExponentialBackoff | None
+        :param gap_fill: Deliver positions missed while reconnecting. Defaults
+            to ``False``.
+        :type gap_fill: bool
+        :param coalesce_interval: Seconds to collect positions before passing
+            on the newest one per device. Positions are passed on as they
+            arrive when ``None`` (the default).
+        :type coalesce_interval: float | None
+        :param raw: Pass the callback every message as the UTF-8 ``bytes`` of
+            the frame, to relay it as it is. With aiohttp 3.14 or later the
+            frame is not decoded; older versions decode the text, which is
+            then encoded again. Empty messages are passed on too. Cannot be
+            combined with ``gap_fill`` or ``coalesce_interval``, which need
+            the decoded positions. Defaults to ``False``.
+        :type raw: bool
+        :raises ValueError: If ``raw`` is combined with ``gap_fill`` or
+            ``coalesce_interval``.
         :raises TraccarConnectionException: When the WebSocket closes/errors or on
-            connectivity/timeouts/client errors.
+            connectivity/timeouts/client errors, unless ``reconnect`` is set and
+            the backoff allows another attempt.
         :raises TraccarException: For unexpected errors, including a failed session
             setup prior to opening the WebSocket.
         """
-
-        async def _subscriber() -> None:
-            self._subscription_status = SubscriptionStatus.CONNECTING
-            async with self._client_session.ws_connect(
-                url=f"{self._base_url}/socket",
-                verify_ssl=self._verify_ssl,
-                heartbeat=self._ws_heartbeat,
-            ) as ws:
-                self._subscription_status = SubscriptionStatus.CONNECTED
-                async for msg in ws:
-                    if msg.type == aiohttp.WSMsgType.TEXT:
-                        if not (data := msg.json()):
-                            # Ignore empty messages
-                            continue
-                        try:
-                            await callback(
-                                {
-                                    "devices": None,
-                                    "events": None,
-                                    "positions": None,
-                                    **data,
-                                }
-                            )
-                        except Exception as exception:
-                            _LOGGER.exception(
-                                "Exception while handling message: %s(%s)",
-                                exception.__class__.__name__,
-                                exception,
-                            )
-                    elif msg.type in (
-                        aiohttp.WSMsgType.CLOSE,
-                        aiohttp.WSMsgType.CLOSED,
-                        aiohttp.WSMsgType.CLOSING,
-                        aiohttp.WSMsgType.ERROR,
-                    ):
-                        raise TraccarConnectionException(
-                            f"WebSocket connection closed with {msg.type.name}"
-                        )
-                    else:
-                        _LOGGER.warning("Unexpected message type %s", msg.type.name)
+        if raw and (gap_fill or coalesce_interval is not None):
+            raise ValueError("Raw messages cannot be gap filled or coalesced")
+        backoff = backoff or ExponentialBackoff()
+        coalescer = (
+            PositionCoalescer(callback, interval=coalesce_interval)
+            if coalesce_interval is not None
+            else None
+        )
+        callback = coalescer if coalescer is not None else callback
+        latest_positions: dict[int, int] | None = {} if gap_fill else None
+        session_open = False
+        fill_gap = False
+        attempt = 0
 
         try:
-            # https://www.traccar.org/api-reference/#tag/Session/paths/~1session/post
-            await self._call_api(
-                f"session?token={self._token}",
-                method="GET",
-                headers={
-                    aiohttp.hdrs.CONTENT_TYPE: "application/x-www-form-urlencoded",
-                },
-            )
-            await _subscriber()
+            while True:
+                error: Exception | None = None
+                try:
+                    if not session_open:
+                        await self._open_session()
+                        session_open = True
+                    await self._listen(
+                        callback, latest_positions, fill_gap=fill_gap, raw=raw
+                    )
+                except Exception as exception:  # pylint: disable=broad-except
+                    error = exception
+                else:
+                    if not reconnect:
+                        return
+
+                if self._subscription_status is SubscriptionStatus.CONNECTED:
+                    attempt = 0
+                    fill_gap = gap_fill
+                if error is not None:
+                    if not reconnect or backoff.exhausted(attempt):
+                        self._raise_subscription_error(error)
+                    session_open = self._recover_subscription(error)
+
+                self._set_subscription_status(SubscriptionStatus.RECONNECTING)
+                _LOGGER.debug(
+                    "Subscription lost (%s), reconnecting (attempt %s)",
+                    error or "connection closed",
+                    attempt + 1,
+                )
+                await asyncio.sleep(backoff.delay(attempt))
+                attempt += 1
         except asyncio.CancelledError:
-            self._subscription_status = SubscriptionStatus.DISCONNECTED
-        except Exception as exception:  # pylint: disable=broad-except
-            self._subscription_status = SubscriptionStatus.ERROR
-            if isinstance(exception, TraccarConnectionException):
-                raise
-            if isinstance(exception, asyncio.TimeoutError):
-                raise TraccarConnectionException(
-                    "Timeout error connecting to Traccar"
-                ) from exception
-            if isinstance(exception, aiohttp.ClientError):
-                raise TraccarConnectionException(
-                    "Could not communicate with Traccar"
-                ) from exception
-            raise TraccarException("Unexpected error") from exception
+            self._set_subscription_status(SubscriptionStatus.DISCONNECTED)
         finally:
+            if coalescer is not None:
+                await coalescer.close()
             # Close the session if we can
             # https://www.traccar.org/api-reference/#tag/Session/paths/~1session/delete
             with suppress(TraccarException):
@@ -323,3 +1731,171 @@ class ApiClient:
                     method="DELETE",
                     headers={},
                 )
+
+    async def _open_session(self) -> None:
+        """Open the session used to authenticate the WebSocket."""
+        # https://www.traccar.org/api-reference/#tag/Session/paths/~1session/post
+        await self._call_api(
+            f"session?token={self._token}",
+            method="GET",
+            headers={
+                aiohttp.hdrs.CONTENT_TYPE: "application/x-www-form-urlencoded",
+            },
+        )
+
+    async def _listen(
+        self,
+        callback: Callable[[Any], Awaitable[None]],
+        latest_positions: dict[int, int] | None,
+        *,
+        fill_gap: bool,
+        raw: bool = False,
+    ) -> None:
+        """Connect the WebSocket and pass its messages to the callback.
+
+        With ``raw`` set, the callback gets the bytes of the messages, as
+        received when aiohttp supports it.
+        """
+        self._set_subscription_status(SubscriptionStatus.CONNECTING)
+        options: dict[str, Any] = (
+            {"decode_text": False} if raw and WS_DECODE_TEXT_SUPPORTED else {}
+        )
+        async with self._client_session.ws_connect(
+            url=self._socket_url,
+            verify_ssl=self._verify_ssl,
+            heartbeat=self._ws_heartbeat,
+            **options,
+        ) as ws:
+            self._set_subscription_status(SubscriptionStatus.CONNECTED)
+            if latest_positions is not None:
+                await self._fill_gap(callback, latest_positions, deliver=fill_gap)
+            async for msg in ws:
+                if msg.type == aiohttp.WSMsgType.TEXT:
+                    if self._observer is not None or raw:
+                        payload: bytes = (
+                            msg.data
+                            if isinstance(msg.data, bytes)
+                            else msg.data.encode()
+                        )
+                        if self._observer is not None:
+                            self._observer.on_message(size=len(payload))
+                        if raw:
+                            await self._call_back(callback, payload)
+                            continue
+                    if not (data := msg.json(loads=self._loads)):
+                        # Ignore empty messages
+                        continue
+                    await self._deliver(
+                        callback,
+                        {"devices": None, "events": None, "positions": None, **data},
+                        latest_positions,
+                    )
+                elif msg.type in (
+                    aiohttp.WSMsgType.CLOSE,
+                    aiohttp.WSMsgType.CLOSED,
+                    aiohttp.WSMsgType.CLOSING,
+                    aiohttp.WSMsgType.ERROR,
+                ):
+                    raise TraccarConnectionException(
+                        f"WebSocket connection closed with {msg.type.name}"
+                    )
+                else:
+                    _LOGGER.warning("Unexpected message type %s", msg.type.name)
+
+    async def _fill_gap(
+        self,
+        callback: Callable[[SubscriptionData], Awaitable[None]],
+        latest_positions: dict[int, int],
+        *,
+        deliver: bool,
+    ) -> None:
+        """Pass positions newer than the latest delivered ones to the callback.
+
+        Without ``deliver`` the positions are only recorded, so that the first
+        connection does not pass on the positions of the devices it has not
+        heard from yet once it reconnects.
+        """
+        positions = await self.get_positions()
+        if not deliver:
+            update_latest_position_ids(latest_positions, positions)
+        elif missed := [
+            position
+            for position in positions
+            if position["id"] > latest_positions.get(position["deviceId"], -1)
+        ]:
+            await self._deliver(
+                callback,
+                {"devices": None, "events": None, "positions": missed},
+                latest_positions,
+            )
+
+    async def _deliver(
+        self,
+        callback: Callable[[SubscriptionData], Awaitable[None]],
+        data: SubscriptionData,
+        latest_positions: dict[int, int] | None,
+    ) -> None:
+        """Pass a message to the callback, tracking the delivered positions."""
+        if latest_positions is not None:
+            update_latest_position_ids(latest_positions, data["positions"] or ())
+        await self._call_back(callback, data)
+
+    async def _call_back(
+        self, callback: Callable[[Any], Awaitable[None]], data: Any
+    ) -> None:
+        """Pass a message to the callback, logging errors raised by it."""
+        started = time.perf_counter()
+        try:
+            await callback(data)
+        except Exception as exception:
+            _LOGGER.exception(
+                "Exception while handling message: %s(%s)",
+                exception.__class__.__name__,
+                exception,
+            )
+        if self._observer is not None:
+            self._observer.on_callback(
+                duration=time.perf_counter() - started,
+                queue_size=(
+                    callback.queue_size if isinstance(callback, Dispatcher) else None
+                ),
+            )
+
+    def _recover_subscription(self, exception: Exception) -> bool:
+        """Raise unless reconnecting may recover from a subscription error.
+
+        Returns whether the session can be reused for the next connection.
+        """
+        if (task := asyncio.current_task()) is not None and task.cancelling():
+            # The error was raised while the subscription was being cancelled
+            raise asyncio.CancelledError
+        if not isinstance(
+            exception,
+            (
+                TraccarConnectionException,
+                TraccarResponseException,
+                TimeoutError,
+                aiohttp.ClientError,
+            ),
+        ):
+            self._raise_subscription_error(exception)
+        # Traccar rejects the WebSocket handshake once the session has expired
+        return not (
+            isinstance(exception, aiohttp.WSServerHandshakeError)
+            and exception.status == 401
+        )
+
+    def _raise_subscription_error(self, exception: Exception) -> NoReturn:
+        """Set the error status and raise the exception for a subscription error."""
+        self._set_subscription_status(SubscriptionStatus.ERROR)
+        if isinstance(exception, TraccarConnectionException):
+            raise exception
+        if isinstance(exception, asyncio.TimeoutError):
+            raise TraccarConnectionException(
+                "Timeout error connecting to Traccar"
+            ) from exception
+        if isinstance(exception, aiohttp.ClientError):
+            raise TraccarConnectionException(
+                "Could not communicate with Traccar"
+            ) from exception
+        raise TraccarException("Unexpected error") from exception
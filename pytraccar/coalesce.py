@@ -0,0 +1,115 @@
+"""Per-device coalescing of subscription positions.
+
+Typical usage::
+
+    await client.subscribe(handler, coalesce_interval=1.0)
+
+or, to combine it with other callbacks::
+
+    async with PositionCoalescer(handler, interval=1.0) as coalescer:
+        await client.subscribe(coalescer)
+"""
+
+from __future__ import annotations
+
+import asyncio
+from logging import Logger, getLogger
+from typing import TYPE_CHECKING, Self
+
+from .utils import update_newest_positions
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+    from types import TracebackType
+
+    from .models import PositionModel, SubscriptionData
+
+_LOGGER: Logger = getLogger(__package__)
+
+
+class PositionCoalescer:
+    """Pass on only the newest position of every device per interval.
+
+    An instance is a callback for :meth:`ApiClient.subscribe`. Positions are
+    held back for up to ``interval`` seconds and then passed to ``callback`` in
+    a single ``positions`` message holding the newest position (by
+    ``fixTime``, then ``id``) of every device. Devices and events are passed
+    on immediately.
+
+    :param callback: Coroutine called with the coalesced messages.
+    :type callback: Callable[[SubscriptionData], Awaitable[None]]
+    :param interval: Seconds to collect positions before passing them on.
+    :type interval: float
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[SubscriptionData], Awaitable[None]],
+        *,
+        interval: float,
+    ) -> None:
+        """Initialize the coalescer."""
+        self._callback = callback
+        self._interval = interval
+        self._pending: dict[int, PositionModel] = {}
+        self._flush_task: asyncio.Task[None] | None = None
+
+    @property
+    def pending(self) -> int:
+        """Return the number of positions waiting to be passed on."""
+        return len(self._pending)
+
+    async def __aenter__(self) -> Self:
+        """Enter the context."""
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Pass on the pending positions."""
+        await self.close()
+
+    async def __call__(self, data: SubscriptionData) -> None:
+        """Collect the positions of a message and pass on the rest.
+
+        :param data: A message from :meth:`ApiClient.subscribe`.
+        :type data: SubscriptionData
+        """
+        if positions := data["positions"]:
+            update_newest_positions(self._pending, positions)
+            if self._flush_task is None:
+                self._flush_task = asyncio.create_task(self._flush_later())
+        if data["devices"] or data["events"]:
+            await self._callback({**data, "positions": None})
+
+    async def close(self) -> None:
+        """Pass on the pending positions now."""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self._flush()
+
+    async def _flush_later(self) -> None:
+        """Pass on the pending positions after the interval."""
+        await asyncio.sleep(self._interval)
+        self._flush_task = None
+        await self._flush()
+
+    async def _flush(self) -> None:
+        """Pass on the pending positions."""
+        if not self._pending:
+            return
+        positions, self._pending = self._pending, {}
+        try:
+            await self._callback(
+                {"devices": None, "events": None, "positions": [*positions.values()]}
+            )
+        except Exception as exception:
+            _LOGGER.exception(
+                "Exception while handling message: %s(%s)",
+                exception.__class__.__name__,
+                exception,
+            )
@@ -0,0 +1,284 @@
+"""Columnar export of positions and events.
+
+Converts lists of positions and events, as returned by
+:meth:`ApiClient.get_positions` and :meth:`ApiClient.get_reports_events`, into
+`NumPy <https://numpy.org>`_ structured arrays or
+`Arrow <https://arrow.apache.org>`_ record batches, so that they can be
+processed without a Python loop per row::
+
+    positions = positions_to_numpy(await client.get_positions())
+    moving = positions[positions["speed"] > 0]
+
+:func:`positions_from_json` and :func:`events_from_json` go straight from a
+response body to arrays of at most ``chunk_size`` records. They are meant to
+run in an executor (see :meth:`ApiClient.get_reports_events_columnar`): the
+decoded rows never leave it, only the compact arrays are passed back.
+
+The NumPy functions require ``numpy``, the Arrow functions ``pyarrow``; neither
+is a dependency of pytraccar. Timestamps are parsed in bulk to UTC with
+millisecond precision. Both the dictionary and the compact models are
+accepted.
+"""
+
+from __future__ import annotations
+
+from operator import itemgetter
+from typing import TYPE_CHECKING, Any
+
+from .decoder import default_loads
+from .timestamps import parse_timestamps
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping, Sequence
+
+    import numpy as np
+    import pyarrow as pa
+
+    from .decoder import JsonLoads
+
+POSITION_COLUMNS = (
+    ("id", "int64"),
+    ("deviceId", "int64"),
+    ("fixTime", "datetime64[ms]"),
+    ("latitude", "float64"),
+    ("longitude", "float64"),
+    ("speed", "float64"),
+    ("course", "float64"),
+    ("altitude", "float64"),
+    ("accuracy", "float64"),
+    ("valid", "bool"),
+)
+EVENT_COLUMNS = (
+    ("id", "int64"),
+    ("deviceId", "int64"),
+    ("type", "str"),
+    ("eventTime", "datetime64[ms]"),
+    ("positionId", "int64"),
+    ("geofenceId", "int64"),
+    ("maintenanceId", "int64"),
+)
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def positions_to_numpy(
+    positions: Sequence[Mapping[str, Any]],
+    *,
+    attributes: Sequence[str] = (),
+) -> np.ndarray[Any, Any]:
+    """Convert positions to a NumPy structured array.
+
+    The array has the fields ``id``, ``deviceId``, ``fixTime``, ``latitude``,
+    ``longitude``, ``speed``, ``course``, ``altitude``, ``accuracy`` and
+    ``valid``, followed by one ``float64`` field per requested attribute.
+    Missing and non-numeric values are ``nan``.
+
+    :param positions: The positions to convert.
+    :type positions: Sequence[PositionModel | CompactPosition]
+    :param attributes: Keys of ``attributes`` to add as fields.
+    :type attributes: Sequence[str]
+    :return: One record per position.
+    :rtype: numpy.ndarray
+    """
+    return _to_numpy(positions, POSITION_COLUMNS, attributes)
+
+
+def events_to_numpy(
+    events: Sequence[Mapping[str, Any]],
+    *,
+    attributes: Sequence[str] = (),
+) -> np.ndarray[Any, Any]:
+    """Convert events to a NumPy structured array.
+
+    The array has the fields ``id``, ``deviceId``, ``type``, ``eventTime``,
+    ``positionId``, ``geofenceId`` and ``maintenanceId``, followed by one
+    ``float64`` field per requested attribute. Missing and non-numeric
+    attribute values are ``nan``.
+
+    :param events: The events to convert.
+    :type events: Sequence[ReportsEventeModel | CompactReportsEvent]
+    :param attributes: Keys of ``attributes`` to add as fields.
+    :type attributes: Sequence[str]
+    :return: One record per event.
+    :rtype: numpy.ndarray
+    """
+    return _to_numpy(events, EVENT_COLUMNS, attributes)
+
+
+def positions_from_json(
+    body: bytes,
+    *,
+    attributes: Sequence[str] = (),
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    loads: JsonLoads | None = None,
+) -> list[np.ndarray[Any, Any]]:
+    """Decode a JSON array of positions into NumPy structured arrays.
+
+    The arrays have the fields of :func:`positions_to_numpy`.
+
+    :param body: The JSON document, e.g. a Traccar API response.
+    :type body: bytes
+    :param attributes: Keys of ``attributes`` to add as fields.
+    :type attributes: Sequence[str]
+    :param chunk_size: Maximum number of records per array. Defaults to
+        ``100000``.
+    :type chunk_size: int
+    :param loads: JSON decoder. Defaults to the fastest installed one.
+    :type loads: JsonLoads | None
+    :return: The positions in order, split into arrays.
+    :rtype: list[numpy.ndarray]
+    """
+    return _chunks(
+        (loads or default_loads())(body), POSITION_COLUMNS, attributes, chunk_size
+    )
+
+
+def events_from_json(
+    body: bytes,
+    *,
+    attributes: Sequence[str] = (),
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    loads: JsonLoads | None = None,
+) -> list[np.ndarray[Any, Any]]:
+    """Decode a JSON array of events into NumPy structured arrays.
+
+    The arrays have the fields of :func:`events_to_numpy`.
+
+    :param body: The JSON document, e.g. a Traccar API response.
+    :type body: bytes
+    :param attributes: Keys of ``attributes`` to add as fields.
+    :type attributes: Sequence[str]
+    :param chunk_size: Maximum number of records per array. Defaults to
+        ``100000``.
+    :type chunk_size: int
+    :param loads: JSON decoder. Defaults to the fastest installed one.
+    :type loads: JsonLoads | None
+    :return: The events in order, split into arrays.
+    :rtype: list[numpy.ndarray]
+    """
+    return _chunks(
+        (loads or default_loads())(body), EVENT_COLUMNS, attributes, chunk_size
+    )
+
+
+def positions_to_arrow(
+    positions: Sequence[Mapping[str, Any]],
+    *,
+    attributes: Sequence[str] = (),
+) -> pa.RecordBatch:
+    """Convert positions to an Arrow record batch.
+
+    Has the same columns as :func:`positions_to_numpy`. Timestamps are
+    ``timestamp[ms, tz=UTC]``, missing values are null and the type of an
+    attribute column is inferred from its values.
+
+    :param positions: The positions to convert.
+    :type positions: Sequence[PositionModel | CompactPosition]
+    :param attributes: Keys of ``attributes`` to add as columns.
+    :type attributes: Sequence[str]
+    :return: One row per position.
+    :rtype: pyarrow.RecordBatch
+    """
+    return _to_arrow(positions, POSITION_COLUMNS, attributes)
+
+
+def events_to_arrow(
+    events: Sequence[Mapping[str, Any]],
+    *,
+    attributes: Sequence[str] = (),
+) -> pa.RecordBatch:
+    """Convert events to an Arrow record batch.
+
+    Has the same columns as :func:`events_to_numpy`. Timestamps are
+    ``timestamp[ms, tz=UTC]``, missing values are null and the type of an
+    attribute column is inferred from its values.
+
+    :param events: The events to convert.
+    :type events: Sequence[ReportsEventeModel | CompactReportsEvent]
+    :param attributes: Keys of ``attributes`` to add as columns.
+    :type attributes: Sequence[str]
+    :return: One row per event.
+    :rtype: pyarrow.RecordBatch
+    """
+    return _to_arrow(events, EVENT_COLUMNS, attributes)
+
+
+def _attribute_values(rows: Sequence[Mapping[str, Any]], attribute: str) -> list[Any]:
+    """Return the values of an attribute, ``None`` where it is missing."""
+    return [(row["attributes"] or {}).get(attribute) for row in rows]
+
+
+def _chunks(
+    rows: Sequence[Mapping[str, Any]],
+    columns: tuple[tuple[str, str], ...],
+    attributes: Sequence[str],
+    chunk_size: int,
+) -> list[np.ndarray[Any, Any]]:
+    """Convert rows to structured arrays of at most ``chunk_size`` records."""
+    chunk_size = max(chunk_size, 1)
+    return [
+        _to_numpy(rows[start : start + chunk_size], columns, attributes)
+        for start in range(0, len(rows), chunk_size)
+    ]
+
+
+def _to_numpy(
+    rows: Sequence[Mapping[str, Any]],
+    columns: tuple[tuple[str, str], ...],
+    attributes: Sequence[str],
+) -> np.ndarray[Any, Any]:
+    """Convert rows to a structured array with the given columns."""
+    import numpy as np  # noqa: PLC0415
+
+    values: dict[str, np.ndarray[Any, Any]] = {}
+    for name, dtype in columns:
+        column = [*map(itemgetter(name), rows)]
+        if dtype.startswith("datetime64"):
+            values[name] = parse_timestamps(column)
+        elif dtype == "int64":
+            # Nullable ids (e.g. geofenceId) become -1
+            values[name] = np.array(
+                [-1 if value is None else value for value in column], dtype=dtype
+            )
+        else:
+            values[name] = np.array(column, dtype=dtype)
+    for attribute in attributes:
+        column = _attribute_values(rows, attribute)
+        values[attribute] = np.array(
+            [value if isinstance(value, (int, float)) else None for value in column],
+            dtype="float64",
+        )
+    array = np.empty(
+        len(rows), dtype=[(name, value.dtype) for name, value in values.items()]
+    )
+    for name, value in values.items():
+        array[name] = value
+    return array
+
+
+def _to_arrow(
+    rows: Sequence[Mapping[str, Any]],
+    columns: tuple[tuple[str, str], ...],
+    attributes: Sequence[str],
+) -> pa.RecordBatch:
+    """Convert rows to a record batch with the given columns."""
+    import pyarrow as pa  # noqa: PLC0415
+
+    types = {
+        "int64": pa.int64(),
+        "float64": pa.float64(),
+        "bool": pa.bool_(),
+        "str": pa.string(),
+    }
+    arrays: dict[str, pa.Array] = {}
+    for name, dtype in columns:
+        column = [*map(itemgetter(name), rows)]
+        if dtype.startswith("datetime64"):
+            arrays[name] = pa.array(column, pa.string()).cast(
+                pa.timestamp("ms", tz="UTC")
+            )
+        else:
+            arrays[name] = pa.array(column, types[dtype])
+    for attribute in attributes:
+        arrays[attribute] = pa.array(_attribute_values(rows, attribute))
+    return pa.RecordBatch.from_pydict(arrays)
@@ -0,0 +1,38 @@
+"""JSON decoder selection.
+
+The client decodes REST responses and WebSocket messages with a single
+``loads`` function. By default the fastest installed decoder is used:
+`orjson <https://pypi.org/project/orjson/>`_, then
+`msgspec <https://pypi.org/project/msgspec/>`_, then :func:`json.loads`.
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Callable
+from typing import Any
+
+JsonLoads = Callable[[str | bytes], Any]
+
+
+def default_loads() -> JsonLoads:
+    """Return the fastest installed JSON decoder.
+
+    :return: A function decoding a JSON document from ``str`` or ``bytes``.
+    :rtype: JsonLoads
+    """
+    try:
+        import orjson  # noqa: PLC0415
+    except ImportError:
+        pass
+    else:
+        loads: JsonLoads = orjson.loads
+        return loads
+    try:
+        import msgspec  # noqa: PLC0415
+    except ImportError:
+        pass
+    else:
+        decode: JsonLoads = msgspec.json.decode
+        return decode
+    return json.loads
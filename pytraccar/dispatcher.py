@@ -0,0 +1,194 @@
+"""Queue between the subscription WebSocket and the message handler.
+
+Typical usage::
+
+    async with Dispatcher(handler, workers=4, batch_size=100) as dispatcher:
+        await client.subscribe(dispatcher)
+
+The WebSocket reader only enqueues messages, so a slow handler no longer
+delays reading from the socket or answering heartbeats.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from contextlib import suppress
+from enum import StrEnum
+from logging import Logger, getLogger
+from typing import TYPE_CHECKING, Self
+
+from .utils import merge_subscription_data
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+    from types import TracebackType
+
+    from .models import SubscriptionData
+
+_LOGGER: Logger = getLogger(__package__)
+
+
+class OverflowPolicy(StrEnum):
+    """What to do with a new message when the dispatcher queue is full."""
+
+    BLOCK = "block"
+    """Wait for room in the queue, which pauses reading from the socket."""
+
+    DROP_OLDEST = "drop_oldest"
+    """Discard the oldest queued message."""
+
+    COALESCE = "coalesce"
+    """Merge into the newest queued message, keeping the newest position and
+    state of every device and all events."""
+
+
+class Dispatcher:
+    """Bounded queue and worker pool for subscription messages.
+
+    An instance is a callback for :meth:`ApiClient.subscribe`. Messages are
+    queued and passed to ``callback`` by ``workers`` concurrent tasks. With
+    more than one worker, messages may be handled out of order.
+
+    :param callback: Coroutine called with the queued messages.
+    :type callback: Callable[[SubscriptionData], Awaitable[None]]
+    :param max_queue_size: Maximum number of queued messages. Defaults to
+        ``1000``.
+    :type max_queue_size: int
+    :param overflow: What to do when the queue is full. Defaults to
+        :attr:`OverflowPolicy.BLOCK`.
+    :type overflow: OverflowPolicy
+    :param workers: Number of concurrent callback invocations. Defaults to
+        ``1``.
+    :type workers: int
+    :param batch_size: Merge up to this many queued messages into a single
+        callback invocation. Defaults to ``1`` (no batching).
+    :type batch_size: int
+    :param batch_interval: Seconds to wait for a batch to fill up before
+        passing on a partial batch. Defaults to ``0`` (do not wait).
+    :type batch_interval: float
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[SubscriptionData], Awaitable[None]],
+        *,
+        max_queue_size: int = 1000,
+        overflow: OverflowPolicy = OverflowPolicy.BLOCK,
+        workers: int = 1,
+        batch_size: int = 1,
+        batch_interval: float = 0,
+    ) -> None:
+        """Initialize the dispatcher."""
+        self._callback = callback
+        self._max_queue_size = max(max_queue_size, 1)
+        self._overflow = overflow
+        self._worker_count = max(workers, 1)
+        self._batch_size = max(batch_size, 1)
+        self._batch_interval = batch_interval
+        self._queue: deque[SubscriptionData] = deque()
+        self._changed = asyncio.Condition()
+        self._workers: list[asyncio.Task[None]] = []
+        self._closing = False
+        self._dropped = 0
+
+    @property
+    def queue_size(self) -> int:
+        """Return the number of queued messages."""
+        return len(self._queue)
+
+    @property
+    def dropped(self) -> int:
+        """Return the number of messages discarded or merged on overflow."""
+        return self._dropped
+
+    async def __aenter__(self) -> Self:
+        """Start the workers."""
+        self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Handle the queued messages and stop the workers."""
+        await self.close()
+
+    def start(self) -> None:
+        """Start the workers, if not already running."""
+        self._closing = False
+        while len(self._workers) < self._worker_count:
+            self._workers.append(asyncio.create_task(self._work()))
+
+    async def close(self) -> None:
+        """Handle the queued messages, then stop the workers."""
+        async with self._changed:
+            self._closing = True
+            self._changed.notify_all()
+        workers, self._workers = self._workers, []
+        await asyncio.gather(*workers)
+
+    async def __call__(self, data: SubscriptionData) -> None:
+        """Queue a message, starting the workers if needed.
+
+        :param data: A message from :meth:`ApiClient.subscribe`.
+        :type data: SubscriptionData
+        """
+        if not self._workers:
+            self.start()
+        async with self._changed:
+            if len(self._queue) >= self._max_queue_size:
+                if self._overflow is OverflowPolicy.COALESCE:
+                    self._queue[-1] = merge_subscription_data(
+                        (self._queue[-1], data), coalesce=True
+                    )
+                    self._dropped += 1
+                    return
+                if self._overflow is OverflowPolicy.DROP_OLDEST:
+                    self._queue.popleft()
+                    self._dropped += 1
+                else:
+                    await self._changed.wait_for(
+                        lambda: len(self._queue) < self._max_queue_size
+                    )
+            self._queue.append(data)
+            self._changed.notify_all()
+
+    async def _work(self) -> None:
+        """Pass queued messages to the callback until closed."""
+        while batch := await self._next_batch():
+            try:
+                await self._callback(
+                    batch[0] if len(batch) == 1 else merge_subscription_data(batch)
+                )
+            except Exception as exception:
+                _LOGGER.exception(
+                    "Exception while handling message: %s(%s)",
+                    exception.__class__.__name__,
+                    exception,
+                )
+
+    async def _next_batch(self) -> list[SubscriptionData]:
+        """Wait for and take the next batch; empty when closed and drained."""
+        async with self._changed:
+            await self._changed.wait_for(lambda: self._queue or self._closing)
+            if (
+                self._batch_size > 1
+                and self._batch_interval > 0
+                and len(self._queue) < self._batch_size
+                and not self._closing
+            ):
+                with suppress(TimeoutError):
+                    async with asyncio.timeout(self._batch_interval):
+                        await self._changed.wait_for(
+                            lambda: len(self._queue) >= self._batch_size
+                            or self._closing
+                        )
+            batch = [
+                self._queue.popleft()
+                for _ in range(min(self._batch_size, len(self._queue)))
+            ]
+            self._changed.notify_all()
+            return batch
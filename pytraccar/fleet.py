@@ -0,0 +1,269 @@
+"""Live, in-memory state of a Traccar fleet.
+
+Typical usage::
+
+    fleet = FleetState()
+    await fleet.sync(client)
+    subscription = asyncio.create_task(client.subscribe(fleet.handle))
+    ...
+    fleet.coordinates(device_id)  # No request to Traccar
+"""
+
+from __future__ import annotations
+
+import asyncio
+from array import array
+from typing import TYPE_CHECKING, NamedTuple
+
+from .timestamps import parse_epoch_ms
+
+if TYPE_CHECKING:
+    from .client import ApiClient
+    from .models import (
+        DeviceModel,
+        PositionModel,
+        ReportsEventeModel,
+        SubscriptionData,
+    )
+
+
+_NO_FIX = float("-inf")
+
+
+class Coordinates(NamedTuple):
+    """Latest coordinates of a device."""
+
+    latitude: float
+    longitude: float
+    speed: float
+    course: float
+
+
+class FleetState:
+    """Devices, latest positions and latest events of a fleet.
+
+    The state is seeded with :meth:`sync` and kept up to date by passing
+    :meth:`handle` as the callback of :meth:`ApiClient.subscribe`. Every
+    lookup is a dictionary access; no lookup calls Traccar.
+
+    The latest latitude, longitude, speed and course of every device are kept
+    in flat arrays indexed by a per-device slot (see :meth:`slot`), which can be
+    wrapped without copying, e.g. with ``numpy.frombuffer``.
+
+    :param keep_positions: Keep the latest full position of every device for
+        :meth:`latest_position`. When ``False`` only the compact arrays are kept.
+        Defaults to ``True``.
+    :type keep_positions: bool
+    """
+
+    def __init__(self, *, keep_positions: bool = True) -> None:
+        """Initialize the fleet state."""
+        self._keep_positions = keep_positions
+        self.clear()
+
+    def clear(self) -> None:
+        """Forget all devices, positions and events."""
+        self._devices: dict[int, DeviceModel] = {}
+        self._unique_ids: dict[str, int] = {}
+        self._groups: dict[int, set[int]] = {}
+        self._positions: dict[int, PositionModel] = {}
+        self._events: dict[int, ReportsEventeModel] = {}
+        self._slots: dict[int, int] = {}
+        self._fix_time = array("d")
+        self._latitude = array("d")
+        self._longitude = array("d")
+        self._speed = array("d")
+        self._course = array("d")
+
+    def __len__(self) -> int:
+        """Return the number of known devices."""
+        return len(self._devices)
+
+    def __contains__(self, device_id: object) -> bool:
+        """Return whether the device is known."""
+        return device_id in self._devices
+
+    async def sync(self, client: ApiClient) -> None:
+        """Replace the state with the devices and positions from Traccar.
+
+        :param client: The client to fetch the devices and positions with.
+        :type client: ApiClient
+        :raises TraccarException: If fetching the devices or positions fails.
+        """
+        devices, positions = await asyncio.gather(
+            client.get_devices(), client.get_positions()
+        )
+        self.clear()
+        self.update_devices(devices)
+        self.update_positions(positions)
+
+    async def handle(self, data: SubscriptionData) -> None:
+        """Apply a subscription message; usable as the subscribe callback.
+
+        :param data: A message from :meth:`ApiClient.subscribe`.
+        :type data: SubscriptionData
+        """
+        self.apply(data)
+
+    def apply(self, data: SubscriptionData) -> None:
+        """Apply the devices, positions and events of a subscription message.
+
+        :param data: A message from :meth:`ApiClient.subscribe`.
+        :type data: SubscriptionData
+        """
+        if devices := data.get("devices"):
+            self.update_devices(devices)
+        if positions := data.get("positions"):
+            self.update_positions(positions)
+        if events := data.get("events"):
+            self.update_events(events)
+
+    def update_devices(self, devices: list[DeviceModel]) -> None:
+        """Add or replace devices.
+
+        :param devices: The devices to add or replace.
+        :type devices: list[DeviceModel]
+        """
+        for device in devices:
+            device_id = device["id"]
+            if (previous := self._devices.get(device_id)) is not None:
+                self._unindex_device(previous)
+            self._devices[device_id] = device
+            self._unique_ids[device["uniqueId"]] = device_id
+            self._groups.setdefault(device["groupId"], set()).add(device_id)
+
+    def remove_device(self, device_id: int) -> None:
+        """Forget a device and its latest position and event.
+
+        The slot of the device is kept for reuse if it comes back.
+
+        :param device_id: The id of the device.
+        :type device_id: int
+        """
+        if (device := self._devices.pop(device_id, None)) is not None:
+            self._unindex_device(device)
+        self._positions.pop(device_id, None)
+        self._events.pop(device_id, None)
+        if (slot := self._slots.get(device_id)) is not None:
+            self._fix_time[slot] = _NO_FIX
+            for values in (self._latitude, self._longitude, self._speed, self._course):
+                values[slot] = float("nan")
+
+    def _unindex_device(self, device: DeviceModel) -> None:
+        """Remove a device from the uniqueId and groupId indexes."""
+        if self._unique_ids.get(device["uniqueId"]) == device["id"]:
+            del self._unique_ids[device["uniqueId"]]
+        if (group := self._groups.get(device["groupId"])) is not None:
+            group.discard(device["id"])
+            if not group:
+                del self._groups[device["groupId"]]
+
+    def update_positions(self, positions: list[PositionModel]) -> None:
+        """Record positions, keeping only the newest fix of every device.
+
+        :param positions: The positions to record, in any order.
+        :type positions: list[PositionModel]
+        """
+        for position in positions:
+            slot = self.slot(position["deviceId"])
+            fix_time = parse_epoch_ms(position["fixTime"]) / 1000
+            if fix_time < self._fix_time[slot]:
+                continue
+            self._fix_time[slot] = fix_time
+            self._latitude[slot] = position["latitude"]
+            self._longitude[slot] = position["longitude"]
+            self._speed[slot] = position["speed"]
+            self._course[slot] = position["course"]
+            if self._keep_positions:
+                self._positions[position["deviceId"]] = position
+
+    def update_events(self, events: list[ReportsEventeModel]) -> None:
+        """Record the latest event of every device.
+
+        :param events: The events to record, oldest first.
+        :type events: list[ReportsEventeModel]
+        """
+        for event in events:
+            self._events[event["deviceId"]] = event
+
+    def slot(self, device_id: int) -> int:
+        """Return the index of a device in the coordinate arrays.
+
+        A slot is allocated the first time a device is seen.
+
+        :param device_id: The id of the device.
+        :type device_id: int
+        :return: The index of the device in :attr:`latitudes` and friends.
+        :rtype: int
+        """
+        if (slot := self._slots.get(device_id)) is None:
+            slot = self._slots[device_id] = len(self._fix_time)
+            self._fix_time.append(_NO_FIX)
+            for values in (self._latitude, self._longitude, self._speed, self._course):
+                values.append(float("nan"))
+        return slot
+
+    def device(self, device_id: int) -> DeviceModel | None:
+        """Return a device by id."""
+        return self._devices.get(device_id)
+
+    def device_by_unique_id(self, unique_id: str) -> DeviceModel | None:
+        """Return a device by its ``uniqueId``."""
+        if (device_id := self._unique_ids.get(unique_id)) is None:
+            return None
+        return self._devices[device_id]
+
+    def devices_in_group(self, group_id: int) -> list[DeviceModel]:
+        """Return the devices of a group."""
+        return [
+            self._devices[device_id] for device_id in self._groups.get(group_id, ())
+        ]
+
+    def latest_position(self, device_id: int) -> PositionModel | None:
+        """Return the latest position of a device.
+
+        Always ``None`` when the state was created with ``keep_positions=False``.
+        """
+        return self._positions.get(device_id)
+
+    def latest_event(self, device_id: int) -> ReportsEventeModel | None:
+        """Return the latest event of a device."""
+        return self._events.get(device_id)
+
+    def coordinates(self, device_id: int) -> Coordinates | None:
+        """Return the latest coordinates of a device.
+
+        :param device_id: The id of the device.
+        :type device_id: int
+        :return: The coordinates, or ``None`` if no position has been seen.
+        :rtype: Coordinates | None
+        """
+        slot = self._slots.get(device_id)
+        if slot is None or self._fix_time[slot] == _NO_FIX:
+            return None
+        return Coordinates(
+            self._latitude[slot],
+            self._longitude[slot],
+            self._speed[slot],
+            self._course[slot],
+        )
+
+    @property
+    def latitudes(self) -> array[float]:
+        """Latest latitude by slot, ``nan`` where no position has been seen."""
+        return self._latitude
+
+    @property
+    def longitudes(self) -> array[float]:
+        """Latest longitude by slot, ``nan`` where no position has been seen."""
+        return self._longitude
+
+    @property
+    def speeds(self) -> array[float]:
+        """Latest speed by slot, ``nan`` where no position has been seen."""
+        return self._speed
+
+    @property
+    def courses(self) -> array[float]:
+        """Latest course by slot, ``nan`` where no position has been seen."""
+        return self._course
@@ -0,0 +1,386 @@
+"""Client-side evaluation of positions against geofences.
+
+Typical usage::
+
+    index = GeofenceIndex(await client.get_geofences())
+    positions = positions_to_numpy(await client.get_positions())
+    index.geofence_ids(positions["latitude"], positions["longitude"])
+
+The ``area`` of every geofence is parsed once. Positions are then evaluated in
+batches: a grid over the bounding boxes of the geofences selects the candidate
+geofences of every position, and each geofence tests all of its candidates in a
+single vectorised pass. Requires ``numpy``, which is not a dependency of
+pytraccar.
+
+Coordinates are in degrees, distances in meters. Geofences crossing the
+antimeridian are not supported.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from itertools import pairwise
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from .exceptions import TraccarException
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    import numpy as np
+
+    from .models import GeofenceModel
+
+EARTH_RADIUS = 6378137.0
+DEFAULT_POLYLINE_DISTANCE = 25.0
+_METERS_PER_DEGREE = EARTH_RADIUS * math.pi / 180
+_NUMBER = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+
+
+class Circle(NamedTuple):
+    """A ``CIRCLE`` geofence area."""
+
+    latitude: float
+    longitude: float
+    radius: float
+
+
+class Polygon(NamedTuple):
+    """A ``POLYGON`` geofence area, as ``(latitude, longitude)`` vertices."""
+
+    points: tuple[tuple[float, float], ...]
+
+
+class Polyline(NamedTuple):
+    """A ``LINESTRING`` geofence area and the distance it extends to."""
+
+    points: tuple[tuple[float, float], ...]
+    distance: float = DEFAULT_POLYLINE_DISTANCE
+
+
+Shape = Circle | Polygon | Polyline
+
+
+class GeofenceTransition(NamedTuple):
+    """A device entering or leaving a geofence."""
+
+    position: int
+    """Index of the position at which the transition was detected."""
+    device_id: int
+    geofence_id: int
+    entered: bool
+    """``True`` when the device entered the geofence, ``False`` when it left."""
+
+
+def parse_area(
+    area: str, *, polyline_distance: float = DEFAULT_POLYLINE_DISTANCE
+) -> Shape:
+    """Parse the ``area`` of a geofence.
+
+    Traccar writes coordinates as ``latitude longitude``, e.g.
+    ``CIRCLE (59.91 10.75, 500)`` or ``POLYGON ((59.9 10.7, 59.9 10.8, ...))``.
+
+    :param area: The ``area`` of a :class:`GeofenceModel`.
+    :type area: str
+    :param polyline_distance: Distance (meters) a ``LINESTRING`` extends to on
+        either side. Defaults to ``25``.
+    :type polyline_distance: float
+    :return: The parsed shape.
+    :rtype: Circle | Polygon | Polyline
+    :raises TraccarException: If the area is malformed or of an unsupported
+        type.
+    """
+    kind, _, body = area.strip().partition("(")
+    kind = kind.strip().upper()
+    if kind == "POLYGON":
+        # Only the outer ring is used, like Traccar does
+        body = body.lstrip(" (").split(")", 1)[0]
+    numbers = [float(number) for number in _NUMBER.findall(body)]
+    if kind == "CIRCLE" and len(numbers) == 3:
+        return Circle(*numbers)
+    points = tuple(zip(numbers[::2], numbers[1::2], strict=False))
+    if kind == "POLYGON" and len(points) >= 3 and len(numbers) % 2 == 0:
+        return Polygon(points)
+    if kind == "LINESTRING" and len(points) >= 2 and len(numbers) % 2 == 0:
+        return Polyline(points, polyline_distance)
+    raise TraccarException(f"Unsupported geofence area: {area}")
+
+
+class GeofenceIndex:
+    """Compiled geofences for batch evaluation of positions.
+
+    :param geofences: The geofences to evaluate positions against.
+    :type geofences: Iterable[GeofenceModel]
+    :param cell_size: Size (degrees) of the grid cells used to find candidate
+        geofences. Defaults to ``0.1``.
+    :type cell_size: float
+    :param polyline_distance: Distance (meters) a ``LINESTRING`` geofence
+        extends to, unless set by its ``polylineDistance`` attribute. Defaults
+        to ``25``.
+    :type polyline_distance: float
+    :raises TraccarException: If the area of a geofence cannot be parsed.
+    """
+
+    def __init__(
+        self,
+        geofences: Iterable[GeofenceModel],
+        *,
+        cell_size: float = 0.1,
+        polyline_distance: float = DEFAULT_POLYLINE_DISTANCE,
+    ) -> None:
+        """Parse the geofences and build the grid."""
+        import numpy as np  # noqa: PLC0415
+
+        self._cell_size = cell_size
+        self._ids: list[int] = []
+        self._shapes: list[Shape] = []
+        for geofence in geofences:
+            self._ids.append(geofence["id"])
+            self._shapes.append(
+                parse_area(
+                    geofence["area"],
+                    polyline_distance=(geofence["attributes"] or {}).get(
+                        "polylineDistance", polyline_distance
+                    ),
+                )
+            )
+        cells: list[np.ndarray[Any, Any]] = [np.empty(0, np.int64)]
+        owners: list[np.ndarray[Any, Any]] = [np.empty(0, np.intp)]
+        for index, shape in enumerate(self._shapes):
+            lat_min, lat_max, lon_min, lon_max = _bounds(shape)
+            lat_cells = np.arange(
+                math.floor(lat_min / cell_size), math.floor(lat_max / cell_size) + 1
+            )
+            lon_cells = np.arange(
+                math.floor(lon_min / cell_size), math.floor(lon_max / cell_size) + 1
+            )
+            keys = _cell_keys(lat_cells[:, None], lon_cells[None, :]).ravel()
+            cells.append(keys)
+            owners.append(np.full(keys.size, index, np.intp))
+        keys = np.concatenate(cells)
+        order = np.argsort(keys, kind="stable")
+        self._cell_keys = keys[order]
+        self._cell_owners = np.concatenate(owners)[order]
+
+    def __len__(self) -> int:
+        """Return the number of geofences."""
+        return len(self._shapes)
+
+    def matches(
+        self, latitudes: Any, longitudes: Any
+    ) -> tuple[np.ndarray[Any, Any], np.ndarray[Any, Any]]:
+        """Find the geofences containing each position.
+
+        :param latitudes: Latitudes of the positions.
+        :type latitudes: numpy.typing.ArrayLike
+        :param longitudes: Longitudes of the positions.
+        :type longitudes: numpy.typing.ArrayLike
+        :return: Two arrays of equal length, the index of a position and the
+            id of a geofence containing it, ordered by position index.
+        :rtype: tuple[numpy.ndarray, numpy.ndarray]
+        """
+        import numpy as np  # noqa: PLC0415
+
+        positions, owners = self._matches(
+            np.asarray(latitudes, np.float64), np.asarray(longitudes, np.float64)
+        )
+        return positions, np.asarray(self._ids, np.int64)[owners]
+
+    def geofence_ids(self, latitudes: Any, longitudes: Any) -> list[list[int]]:
+        """Return the ids of the geofences containing each position.
+
+        The result matches ``geofenceIds`` of :class:`PositionModel`, except
+        that a position outside all geofences has an empty list.
+
+        :param latitudes: Latitudes of the positions.
+        :type latitudes: numpy.typing.ArrayLike
+        :param longitudes: Longitudes of the positions.
+        :type longitudes: numpy.typing.ArrayLike
+        :return: The geofence ids of every position.
+        :rtype: list[list[int]]
+        """
+        positions, geofence_ids = self.matches(latitudes, longitudes)
+        result: list[list[int]] = [[] for _ in range(len(latitudes))]
+        for position, geofence_id in zip(
+            positions.tolist(), geofence_ids.tolist(), strict=True
+        ):
+            result[position].append(geofence_id)
+        return result
+
+    def transitions(
+        self, device_ids: Any, latitudes: Any, longitudes: Any
+    ) -> list[GeofenceTransition]:
+        """Detect devices entering and leaving geofences.
+
+        The positions of every device must be in chronological order; the
+        positions of different devices may be interleaved. The first position
+        of a device only establishes its state and is never a transition.
+
+        :param device_ids: Device ids of the positions.
+        :type device_ids: numpy.typing.ArrayLike
+        :param latitudes: Latitudes of the positions.
+        :type latitudes: numpy.typing.ArrayLike
+        :param longitudes: Longitudes of the positions.
+        :type longitudes: numpy.typing.ArrayLike
+        :return: The transitions, ordered by position index, with exits before
+            entries at the same position.
+        :rtype: list[GeofenceTransition]
+        """
+        import numpy as np  # noqa: PLC0415
+
+        devices = np.asarray(device_ids, np.int64)
+        positions, owners = self._matches(
+            np.asarray(latitudes, np.float64), np.asarray(longitudes, np.float64)
+        )
+        # Link every position to the previous and next one of its device
+        order = np.argsort(devices, kind="stable")
+        same_device = devices[order][1:] == devices[order][:-1]
+        previous = np.full(devices.size, -1, np.int64)
+        previous[order[1:][same_device]] = order[:-1][same_device]
+        following = np.full(devices.size, -1, np.int64)
+        following[order[:-1][same_device]] = order[1:][same_device]
+
+        count = len(self._shapes)
+        inside = positions * count + owners
+
+        def _left(neighbours: np.ndarray[Any, Any]) -> np.ndarray[Any, Any]:
+            linked = neighbours >= 0
+            result: np.ndarray[Any, Any] = linked & ~np.isin(
+                neighbours * count + owners, inside
+            )
+            return result
+
+        entered = _left(previous[positions])
+        left = _left(following[positions])
+        transition_positions = np.concatenate(
+            [positions[entered], following[positions][left]]
+        )
+        transition_owners = np.concatenate([owners[entered], owners[left]])
+        transition_entered = np.repeat([True, False], [entered.sum(), left.sum()])
+        sort = np.lexsort((transition_owners, transition_entered, transition_positions))
+        ids = np.asarray(self._ids, np.int64)
+        return [
+            GeofenceTransition(position, device_id, geofence_id, was_entered)
+            for position, device_id, geofence_id, was_entered in zip(
+                transition_positions[sort].tolist(),
+                devices[transition_positions[sort]].tolist(),
+                ids[transition_owners[sort]].tolist(),
+                transition_entered[sort].tolist(),
+                strict=True,
+            )
+        ]
+
+    def _matches(
+        self, latitudes: np.ndarray[Any, Any], longitudes: np.ndarray[Any, Any]
+    ) -> tuple[np.ndarray[Any, Any], np.ndarray[Any, Any]]:
+        """Return ``(position index, geofence index)`` pairs of all matches."""
+        import numpy as np  # noqa: PLC0415
+
+        keys = _cell_keys(
+            np.floor(latitudes / self._cell_size).astype(np.int64),
+            np.floor(longitudes / self._cell_size).astype(np.int64),
+        )
+        start = np.searchsorted(self._cell_keys, keys, "left")
+        counts = np.searchsorted(self._cell_keys, keys, "right") - start
+        # Expand to one candidate per (position, geofence in its cell)
+        candidates = np.repeat(np.arange(keys.size), counts)
+        offsets = np.arange(candidates.size) - np.repeat(
+            np.cumsum(counts) - counts, counts
+        )
+        owners = self._cell_owners[np.repeat(start, counts) + offsets]
+
+        order = np.argsort(owners, kind="stable")
+        candidates, owners = candidates[order], owners[order]
+        found_positions: list[np.ndarray[Any, Any]] = [np.empty(0, np.int64)]
+        found_owners: list[np.ndarray[Any, Any]] = [np.empty(0, np.intp)]
+        bounds = np.flatnonzero(np.diff(owners)) + 1
+        for group in np.split(np.arange(owners.size), bounds):
+            if not group.size:
+                continue
+            owner = int(owners[group[0]])
+            points = candidates[group]
+            inside = _contains(
+                self._shapes[owner], latitudes[points], longitudes[points]
+            )
+            found_positions.append(points[inside])
+            found_owners.append(owners[group][inside])
+        positions = np.concatenate(found_positions)
+        owners = np.concatenate(found_owners)
+        order = np.lexsort((owners, positions))
+        return positions[order], owners[order]
+
+
+def _cell_keys(
+    lat_cells: np.ndarray[Any, Any], lon_cells: np.ndarray[Any, Any]
+) -> np.ndarray[Any, Any]:
+    """Return the grid keys of cells."""
+    keys: np.ndarray[Any, Any] = (lat_cells << 32) + lon_cells
+    return keys
+
+
+def _bounds(shape: Shape) -> tuple[float, float, float, float]:
+    """Return the ``(lat_min, lat_max, lon_min, lon_max)`` box of a shape."""
+    if isinstance(shape, Circle):
+        latitudes, longitudes = [shape.latitude], [shape.longitude]
+        margin = shape.radius
+    else:
+        latitudes = [point[0] for point in shape.points]
+        longitudes = [point[1] for point in shape.points]
+        margin = shape.distance if isinstance(shape, Polyline) else 0
+    lat_margin = margin / _METERS_PER_DEGREE
+    lon_margin = lat_margin / max(
+        math.cos(math.radians(min(max(map(abs, latitudes)) + lat_margin, 89.9))),
+        1e-6,
+    )
+    return (
+        min(latitudes) - lat_margin,
+        max(latitudes) + lat_margin,
+        min(longitudes) - lon_margin,
+        max(longitudes) + lon_margin,
+    )
+
+
+def _contains(
+    shape: Shape, latitudes: np.ndarray[Any, Any], longitudes: np.ndarray[Any, Any]
+) -> np.ndarray[Any, Any]:
+    """Return which of the positions are inside the shape."""
+    import numpy as np  # noqa: PLC0415
+
+    if isinstance(shape, Circle):
+        lat, center_lat = np.radians(latitudes), math.radians(shape.latitude)
+        half_chord = (
+            np.sin((lat - center_lat) / 2) ** 2
+            + np.cos(lat)
+            * math.cos(center_lat)
+            * np.sin(np.radians(longitudes - shape.longitude) / 2) ** 2
+        )
+        distance = 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.minimum(half_chord, 1)))
+        circle: np.ndarray[Any, Any] = distance <= shape.radius
+        return circle
+
+    points = np.asarray(shape.points, np.float64)
+    if isinstance(shape, Polygon):
+        inside = np.zeros(latitudes.size, bool)
+        for (lat1, lon1), (lat2, lon2) in zip(
+            points, np.roll(points, -1, 0), strict=True
+        ):
+            crosses = (lat1 > latitudes) != (lat2 > latitudes)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                edge = lon1 + (lon2 - lon1) * (latitudes - lat1) / (lat2 - lat1)
+            inside ^= crosses & (longitudes < edge)
+        return inside
+
+    # Distance to the nearest segment, on a plane tangent at each position
+    x_scale = _METERS_PER_DEGREE * np.cos(np.radians(latitudes))
+    nearest = np.full(latitudes.size, np.inf)
+    for (lat1, lon1), (lat2, lon2) in pairwise(points):
+        dx, dy = (lon2 - lon1) * x_scale, (lat2 - lat1) * _METERS_PER_DEGREE
+        px = (longitudes - lon1) * x_scale
+        py = (latitudes - lat1) * _METERS_PER_DEGREE
+        length = dx * dx + dy * dy
+        with np.errstate(divide="ignore", invalid="ignore"):
+            along = np.clip(np.where(length > 0, (px * dx + py * dy) / length, 0), 0, 1)
+        nearest = np.minimum(nearest, (px - along * dx) ** 2 + (py - along * dy) ** 2)
+    polyline: np.ndarray[Any, Any] = nearest <= shape.distance**2
+    return polyline
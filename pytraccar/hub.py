@@ -0,0 +1,344 @@
+"""One subscription shared by many consumers.
+
+Typical usage::
+
+    async with SubscriptionHub(client, reconnect=True) as hub:
+        async with hub.subscribe(event_types=["alarm"]) as alarms:
+            async for message in alarms:
+                ...
+
+The hub holds a single WebSocket for the client, decodes every message once
+and passes each subscriber the devices, positions and events matching its
+filters. Subscribers have their own bounded buffer, so a slow subscriber
+loses or merges its own messages instead of delaying the others.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from typing import TYPE_CHECKING, Any, Self, TypeVar
+
+from .dispatcher import OverflowPolicy
+from .utils import merge_subscription_data
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from types import TracebackType
+
+    from .client import ApiClient
+    from .models import SubscriptionData
+
+KeyT = TypeVar("KeyT")
+
+
+class HubSubscription:
+    """The messages of a :class:`SubscriptionHub` matching some filters.
+
+    Created by :meth:`SubscriptionHub.subscribe`. Iterate over it to receive
+    the messages; the iteration ends when the subscription or the hub is
+    closed, after the buffered messages. Messages hold the same device,
+    position and event objects for every subscriber, so do not modify them.
+    """
+
+    def __init__(
+        self,
+        hub: SubscriptionHub,
+        *,
+        devices: frozenset[int] | None,
+        groups: frozenset[int] | None,
+        event_types: frozenset[str] | None,
+        max_buffer_size: int,
+        overflow: OverflowPolicy,
+    ) -> None:
+        """Initialize the subscription; use :meth:`SubscriptionHub.subscribe`."""
+        self._hub = hub
+        self.devices = devices
+        self.groups = groups
+        self.event_types = event_types
+        self._max_buffer_size = max(max_buffer_size, 1)
+        self._overflow = overflow
+        self._buffer: deque[SubscriptionData] = deque()
+        self._ready = asyncio.Event()
+        self._closed = False
+        self._error: BaseException | None = None
+        self._dropped = 0
+
+    @property
+    def buffer_size(self) -> int:
+        """Return the number of buffered messages."""
+        return len(self._buffer)
+
+    @property
+    def dropped(self) -> int:
+        """Return the number of messages discarded or merged on overflow."""
+        return self._dropped
+
+    def __aiter__(self) -> Self:
+        """Return the subscription, an iterator over its messages."""
+        return self
+
+    async def __anext__(self) -> SubscriptionData:
+        """Wait for and return the next message.
+
+        :raises TraccarException: If the subscription of the hub failed.
+        """
+        while not self._buffer:
+            if self._closed:
+                if self._error is not None:
+                    raise self._error
+                raise StopAsyncIteration
+            self._ready.clear()
+            await self._ready.wait()
+        return self._buffer.popleft()
+
+    async def __aenter__(self) -> Self:
+        """Return the subscription."""
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the subscription."""
+        self.close()
+
+    def close(self) -> None:
+        """Stop receiving messages; buffered messages can still be read."""
+        self._hub._remove(self)  # noqa: SLF001
+        self._end(None)
+
+    def _end(self, error: BaseException | None) -> None:
+        """Mark the subscription as ended, waking up a waiting reader."""
+        if not self._closed:
+            self._closed = True
+            self._error = error
+            self._ready.set()
+
+    def _put(self, data: SubscriptionData) -> None:
+        """Buffer a message, applying the overflow policy when full."""
+        if len(self._buffer) >= self._max_buffer_size:
+            self._dropped += 1
+            if self._overflow is OverflowPolicy.COALESCE:
+                self._buffer[-1] = merge_subscription_data(
+                    (self._buffer[-1], data), coalesce=True
+                )
+                return
+            self._buffer.popleft()
+        self._buffer.append(data)
+        self._ready.set()
+
+
+class SubscriptionHub:
+    """Share one :meth:`ApiClient.subscribe` between many subscribers.
+
+    The WebSocket is opened when the hub is entered and closed when it is
+    exited. Before that, the devices are fetched once to know their groups;
+    later group changes are taken from the ``devices`` messages.
+
+    Every item of a message is routed through indexes of the subscribers by
+    device, group and event type, so the cost of a message depends on the
+    number of matching subscribers rather than on all of them.
+
+    :param client: The client to subscribe with.
+    :type client: ApiClient
+    :param kwargs: Keyword arguments of :meth:`ApiClient.subscribe`, e.g.
+        ``reconnect=True``.
+    :type kwargs: Any
+    """
+
+    def __init__(self, client: ApiClient, **kwargs: Any) -> None:
+        """Initialize the hub, without subscribing."""
+        self._client = client
+        self._subscribe_kwargs = kwargs
+        self._task: asyncio.Task[None] | None = None
+        self._device_groups: dict[int, int] = {}
+        self._subscriptions: set[HubSubscription] = set()
+        # Subscribers by the devices, groups and event types they filter on
+        self._by_device: dict[int, set[HubSubscription]] = {}
+        self._by_group: dict[int, set[HubSubscription]] = {}
+        self._by_event_type: dict[str, set[HubSubscription]] = {}
+        # Subscribers without a device/group filter, or without an event filter
+        self._all_devices: set[HubSubscription] = set()
+        self._all_event_types: set[HubSubscription] = set()
+
+    async def __aenter__(self) -> Self:
+        """Fetch the device groups and start the subscription."""
+        await self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Stop the subscription."""
+        await self.close()
+
+    async def start(self) -> None:
+        """Fetch the device groups and start the subscription, if not running.
+
+        :raises TraccarException: If fetching the devices fails.
+        """
+        if self._task is not None:
+            return
+        self._device_groups = {
+            device["id"]: device["groupId"]
+            for device in await self._client.get_devices()
+        }
+        self._task = asyncio.create_task(
+            self._client.subscribe(self._publish, **self._subscribe_kwargs)
+        )
+        self._task.add_done_callback(self._finished)
+
+    async def close(self) -> None:
+        """Stop the subscription and end the iteration of all subscribers.
+
+        An error of the subscription is not raised here; the subscribers
+        raise it instead.
+        """
+        if (task := self._task) is not None:
+            task.cancel()
+            await asyncio.wait([task])
+
+    def subscribe(
+        self,
+        *,
+        devices: Iterable[int] | None = None,
+        groups: Iterable[int] | None = None,
+        event_types: Iterable[str] | None = None,
+        max_buffer_size: int = 1000,
+        overflow: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+    ) -> HubSubscription:
+        """Add a subscriber receiving the items matching the filters.
+
+        A device, position or event matches when it belongs to one of
+        ``devices`` or to a device in one of ``groups``; with neither, all
+        items match. With ``event_types``, only events of these types are
+        passed on, and no devices or positions.
+
+        :param devices: Device IDs to receive the items of.
+        :type devices: Iterable[int] | None
+        :param groups: Group IDs to receive the items of the devices of.
+        :type groups: Iterable[int] | None
+        :param event_types: Only receive events of these types.
+        :type event_types: Iterable[str] | None
+        :param max_buffer_size: Maximum number of messages buffered for the
+            subscriber. Defaults to ``1000``.
+        :type max_buffer_size: int
+        :param overflow: What to do with a new message when the buffer is
+            full: :attr:`OverflowPolicy.DROP_OLDEST` (the default) or
+            :attr:`OverflowPolicy.COALESCE`.
+        :type overflow: OverflowPolicy
+        :return: The subscription, an async iterator over its messages.
+        :rtype: HubSubscription
+        :raises ValueError: If ``overflow`` is :attr:`OverflowPolicy.BLOCK`,
+            which would let the subscriber stall the others.
+        """
+        if overflow is OverflowPolicy.BLOCK:
+            raise ValueError("Hub subscribers cannot block the hub")
+        subscription = HubSubscription(
+            self,
+            devices=None if devices is None else frozenset(devices),
+            groups=None if groups is None else frozenset(groups),
+            event_types=None if event_types is None else frozenset(event_types),
+            max_buffer_size=max_buffer_size,
+            overflow=overflow,
+        )
+        if (task := self._task) is not None and task.done():
+            subscription._end(  # noqa: SLF001
+                None if task.cancelled() else task.exception()
+            )
+            return subscription
+        self._subscriptions.add(subscription)
+        if subscription.devices is None and subscription.groups is None:
+            self._all_devices.add(subscription)
+        for device_id in subscription.devices or ():
+            self._by_device.setdefault(device_id, set()).add(subscription)
+        for group_id in subscription.groups or ():
+            self._by_group.setdefault(group_id, set()).add(subscription)
+        if subscription.event_types is None:
+            self._all_event_types.add(subscription)
+        for event_type in subscription.event_types or ():
+            self._by_event_type.setdefault(event_type, set()).add(subscription)
+        return subscription
+
+    def _remove(self, subscription: HubSubscription) -> None:
+        """Remove a subscriber from the indexes, if it is still in them."""
+        if subscription not in self._subscriptions:
+            return
+        self._subscriptions.discard(subscription)
+        self._all_devices.discard(subscription)
+        self._all_event_types.discard(subscription)
+        _unindex(self._by_device, subscription.devices, subscription)
+        _unindex(self._by_group, subscription.groups, subscription)
+        _unindex(self._by_event_type, subscription.event_types, subscription)
+
+    def _finished(self, task: asyncio.Task[None]) -> None:
+        """End all subscriptions, passing on the error of the hub."""
+        error = None if task.cancelled() else task.exception()
+        for subscription in list(self._subscriptions):
+            self._remove(subscription)
+            subscription._end(error)  # noqa: SLF001
+
+    def _matching(self, device_id: int) -> set[HubSubscription]:
+        """Return the subscribers of the items of a device."""
+        matching = self._all_devices | self._by_device.get(device_id, set())
+        if (group_id := self._device_groups.get(device_id)) in self._by_group:
+            matching |= self._by_group[group_id]
+        return matching
+
+    async def _publish(self, data: SubscriptionData) -> None:
+        """Pass the matching items of a message to every subscriber."""
+        for device in data["devices"] or ():
+            self._device_groups[device["id"]] = device["groupId"]
+        messages: dict[HubSubscription, dict[str, list[Any]]] = {}
+
+        def _route(kind: str, item: Any, subscriptions: set[HubSubscription]) -> None:
+            for subscription in subscriptions:
+                messages.setdefault(subscription, {}).setdefault(kind, []).append(item)
+
+        for device in data["devices"] or ():
+            _route(
+                "devices", device, self._matching(device["id"]) & self._all_event_types
+            )
+        for position in data["positions"] or ():
+            _route(
+                "positions",
+                position,
+                self._matching(position["deviceId"]) & self._all_event_types,
+            )
+        for event in data["events"] or ():
+            _route(
+                "events",
+                event,
+                self._matching(event["deviceId"])
+                & (
+                    self._all_event_types
+                    | self._by_event_type.get(event["type"], set())
+                ),
+            )
+        for subscription, routed in messages.items():
+            subscription._put(  # noqa: SLF001
+                {
+                    "devices": routed.get("devices"),
+                    "positions": routed.get("positions"),
+                    "events": routed.get("events"),
+                }
+            )
+
+
+def _unindex(
+    index: dict[KeyT, set[HubSubscription]],
+    keys: Iterable[KeyT] | None,
+    subscription: HubSubscription,
+) -> None:
+    """Remove a subscriber from an index, dropping keys left without any."""
+    for key in keys or ():
+        subscribers = index.get(key, set())
+        subscribers.discard(subscription)
+        if not subscribers:
+            index.pop(key, None)
@@ -0,0 +1,347 @@
+"""Instrumentation of API requests and subscriptions.
+
+Typical usage::
+
+    metrics = PrometheusObserver()
+    client = ApiClient(..., observer=metrics.labels(server="eu"))
+
+Subclass :class:`Observer` and override the hooks of interest to collect the
+measurements any other way.
+"""
+
+from __future__ import annotations
+
+from copy import copy
+from typing import TYPE_CHECKING, Any, Self
+
+if TYPE_CHECKING:
+    from .models import SubscriptionStatus
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+class Observer:
+    """Hooks called by :class:`ApiClient` with measurements.
+
+    Every hook does nothing by default. Hooks are called synchronously on the
+    event loop, so they should return quickly.
+    """
+
+    def on_request(
+        self, *, method: str, endpoint: str, status: int | None, duration: float
+    ) -> None:
+        """Handle a finished API request, including its retries.
+
+        :param method: The HTTP method.
+        :type method: str
+        :param endpoint: The endpoint path, without query parameters and with
+            IDs in the path replaced by ``{id}``, e.g. ``devices/{id}``.
+        :type endpoint: str
+        :param status: The response status, or ``None`` when no response was
+            received.
+        :type status: int | None
+        :param duration: Seconds until the response headers were received.
+        :type duration: float
+        """
+
+    def on_retry(
+        self, *, method: str, endpoint: str, attempt: int, delay: float
+    ) -> None:
+        """Handle a retry of a failed API request.
+
+        :param method: The HTTP method.
+        :type method: str
+        :param endpoint: The endpoint path, without query parameters and with
+            IDs in the path replaced by ``{id}``, e.g. ``devices/{id}``.
+        :type endpoint: str
+        :param attempt: Number of the retry, starting at ``1``.
+        :type attempt: int
+        :param delay: Seconds waited before the retry.
+        :type delay: float
+        """
+
+    def on_response(self, *, endpoint: str, size: int, decode_duration: float) -> None:
+        """Handle a decoded response body.
+
+        :param endpoint: The endpoint path, without query parameters and with
+            IDs in the path replaced by ``{id}``, e.g. ``devices/{id}``.
+        :type endpoint: str
+        :param size: Size of the body in bytes.
+        :type size: int
+        :param decode_duration: Seconds spent decoding the body.
+        :type decode_duration: float
+        """
+
+    def on_message(self, *, size: int) -> None:
+        """Handle a WebSocket message received by a subscription.
+
+        :param size: Length of the message text, which is its size in bytes
+            for ASCII text.
+        :type size: int
+        """
+
+    def on_callback(self, *, duration: float, queue_size: int | None) -> None:
+        """Handle a message passed to the subscription callback.
+
+        :param duration: Seconds the callback took.
+        :type duration: float
+        :param queue_size: Number of messages queued by the callback when it
+            is a :class:`Dispatcher`, otherwise ``None``.
+        :type queue_size: int | None
+        """
+
+    def on_subscription_status(
+        self, *, previous: SubscriptionStatus, status: SubscriptionStatus
+    ) -> None:
+        """Handle a change of :attr:`ApiClient.subscription_status`.
+
+        :param previous: The status before the change.
+        :type previous: SubscriptionStatus
+        :param status: The new status.
+        :type status: SubscriptionStatus
+        """
+
+
+class PrometheusObserver(Observer):
+    """Record the measurements as Prometheus metrics.
+
+    Requires ``prometheus_client``. The metrics are labelled with a server
+    name; use :meth:`labels` to get an observer for each client sharing the
+    same metrics.
+
+    :param registry: Registry of the metrics. Defaults to the global registry
+        of ``prometheus_client``.
+    :type registry: prometheus_client.CollectorRegistry | None
+    :param namespace: Prefix of the metric names. Defaults to ``"pytraccar"``.
+    :type namespace: str
+    """
+
+    def __init__(self, *, registry: Any = None, namespace: str = "pytraccar") -> None:
+        """Create the metrics."""
+        import prometheus_client  # noqa: PLC0415
+
+        options: dict[str, Any] = {"namespace": namespace}
+        if registry is not None:
+            options["registry"] = registry
+        self._server = ""
+        self._requests = prometheus_client.Histogram(
+            "request_duration_seconds",
+            "Time until the response headers of an API request were received.",
+            ["server", "method", "endpoint", "status"],
+            buckets=LATENCY_BUCKETS,
+            **options,
+        )
+        self._retries = prometheus_client.Counter(
+            "request_retries",
+            "Retries of failed API requests.",
+            ["server", "method", "endpoint"],
+            **options,
+        )
+        self._response_sizes = prometheus_client.Histogram(
+            "response_size_bytes",
+            "Size of API response bodies.",
+            ["server", "endpoint"],
+            buckets=SIZE_BUCKETS,
+            **options,
+        )
+        self._decode_durations = prometheus_client.Histogram(
+            "response_decode_seconds",
+            "Time spent decoding API response bodies.",
+            ["server", "endpoint"],
+            buckets=LATENCY_BUCKETS,
+            **options,
+        )
+        self._messages = prometheus_client.Histogram(
+            "websocket_message_size_bytes",
+            "Size of WebSocket messages received by subscriptions.",
+            ["server"],
+            buckets=SIZE_BUCKETS,
+            **options,
+        )
+        self._callbacks = prometheus_client.Histogram(
+            "callback_duration_seconds",
+            "Time spent in subscription callbacks.",
+            ["server"],
+            buckets=LATENCY_BUCKETS,
+            **options,
+        )
+        self._queue_sizes = prometheus_client.Gauge(
+            "dispatcher_queue_size",
+            "Messages queued by the subscription dispatcher.",
+            ["server"],
+            **options,
+        )
+        self._transitions = prometheus_client.Counter(
+            "subscription_transitions",
+            "Changes of the subscription status.",
+            ["server", "status"],
+            **options,
+        )
+
+    def labels(self, *, server: str) -> Self:
+        """Return an observer sharing these metrics, labelled with a server.
+
+        :param server: Name of the Traccar server of the client.
+        :type server: str
+        :return: The labelled observer.
+        :rtype: PrometheusObserver
+        """
+        observer = copy(self)
+        observer._server = server  # noqa: SLF001
+        return observer
+
+    def on_request(
+        self, *, method: str, endpoint: str, status: int | None, duration: float
+    ) -> None:
+        """Observe the request duration."""
+        self._requests.labels(
+            self._server, method, endpoint, str(status or "error")
+        ).observe(duration)
+
+    def on_retry(
+        self, *, method: str, endpoint: str, attempt: int, delay: float
+    ) -> None:
+        """Count the retry."""
+        del attempt, delay
+        self._retries.labels(self._server, method, endpoint).inc()
+
+    def on_response(self, *, endpoint: str, size: int, decode_duration: float) -> None:
+        """Observe the response size and decode duration."""
+        self._response_sizes.labels(self._server, endpoint).observe(size)
+        self._decode_durations.labels(self._server, endpoint).observe(decode_duration)
+
+    def on_message(self, *, size: int) -> None:
+        """Observe the message size."""
+        self._messages.labels(self._server).observe(size)
+
+    def on_callback(self, *, duration: float, queue_size: int | None) -> None:
+        """Observe the callback duration and queue size."""
+        self._callbacks.labels(self._server).observe(duration)
+        if queue_size is not None:
+            self._queue_sizes.labels(self._server).set(queue_size)
+
+    def on_subscription_status(
+        self, *, previous: SubscriptionStatus, status: SubscriptionStatus
+    ) -> None:
+        """Count the transition."""
+        del previous
+        self._transitions.labels(self._server, status.value).inc()
+
+
+class OpenTelemetryObserver(Observer):
+    """Record the measurements as OpenTelemetry metrics.
+
+    Requires ``opentelemetry-api``. Measurements carry a ``server`` attribute;
+    use :meth:`labels` to get an observer for each client sharing the same
+    instruments.
+
+    :param meter: Meter creating the instruments. Defaults to the meter named
+        ``"pytraccar"`` of the global meter provider.
+    :type meter: opentelemetry.metrics.Meter | None
+    """
+
+    def __init__(self, *, meter: Any = None) -> None:
+        """Create the instruments."""
+        if meter is None:
+            from opentelemetry import metrics  # noqa: PLC0415
+
+            meter = metrics.get_meter("pytraccar")
+        self._attributes: dict[str, str] = {"server": ""}
+        self._requests = meter.create_histogram(
+            "pytraccar.request.duration",
+            unit="s",
+            description="Time until the response headers of an API request were "
+            "received.",
+        )
+        self._retries = meter.create_counter(
+            "pytraccar.request.retries",
+            description="Retries of failed API requests.",
+        )
+        self._response_sizes = meter.create_histogram(
+            "pytraccar.response.size",
+            unit="By",
+            description="Size of API response bodies.",
+        )
+        self._decode_durations = meter.create_histogram(
+            "pytraccar.response.decode_duration",
+            unit="s",
+            description="Time spent decoding API response bodies.",
+        )
+        self._messages = meter.create_histogram(
+            "pytraccar.websocket.message.size",
+            unit="By",
+            description="Size of WebSocket messages received by subscriptions.",
+        )
+        self._callbacks = meter.create_histogram(
+            "pytraccar.callback.duration",
+            unit="s",
+            description="Time spent in subscription callbacks.",
+        )
+        self._queue_sizes = meter.create_histogram(
+            "pytraccar.dispatcher.queue_size",
+            description="Messages queued by the subscription dispatcher.",
+        )
+        self._transitions = meter.create_counter(
+            "pytraccar.subscription.transitions",
+            description="Changes of the subscription status.",
+        )
+
+    def labels(self, *, server: str) -> Self:
+        """Return an observer sharing these instruments, for a server.
+
+        :param server: Name of the Traccar server of the client.
+        :type server: str
+        :return: The labelled observer.
+        :rtype: OpenTelemetryObserver
+        """
+        observer = copy(self)
+        observer._attributes = {"server": server}  # noqa: SLF001
+        return observer
+
+    def on_request(
+        self, *, method: str, endpoint: str, status: int | None, duration: float
+    ) -> None:
+        """Record the request duration."""
+        self._requests.record(
+            duration,
+            {
+                **self._attributes,
+                "http.request.method": method,
+                "endpoint": endpoint,
+                "http.response.status_code": status or 0,
+            },
+        )
+
+    def on_retry(
+        self, *, method: str, endpoint: str, attempt: int, delay: float
+    ) -> None:
+        """Count the retry."""
+        del attempt, delay
+        self._retries.add(
+            1,
+            {**self._attributes, "http.request.method": method, "endpoint": endpoint},
+        )
+
+    def on_response(self, *, endpoint: str, size: int, decode_duration: float) -> None:
+        """Record the response size and decode duration."""
+        attributes = {**self._attributes, "endpoint": endpoint}
+        self._response_sizes.record(size, attributes)
+        self._decode_durations.record(decode_duration, attributes)
+
+    def on_message(self, *, size: int) -> None:
+        """Record the message size."""
+        self._messages.record(size, self._attributes)
+
+    def on_callback(self, *, duration: float, queue_size: int | None) -> None:
+        """Record the callback duration and queue size."""
+        self._callbacks.record(duration, self._attributes)
+        if queue_size is not None:
+            self._queue_sizes.record(queue_size, self._attributes)
+
+    def on_subscription_status(
+        self, *, previous: SubscriptionStatus, status: SubscriptionStatus
+    ) -> None:
+        """Count the transition."""
+        del previous
+        self._transitions.add(1, {**self._attributes, "status": status.value})
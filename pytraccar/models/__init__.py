@@ -1,17 +1,37 @@
 """Initialize the models module."""
 
+from .command import CommandModel
+from .compact import (
+    CompactDevice,
+    CompactGeofence,
+    CompactModel,
+    CompactPosition,
+    CompactReportsEvent,
+    CompactServer,
+)
 from .device import DeviceModel
 from .geofence import GeofenceModel
 from .position import PositionModel
 from .reports_event import ReportsEventeModel
+from .reports_stop import ReportsStopModel
+from .reports_trip import ReportsTripModel
 from .server import ServerModel
 from .subscription import SubscriptionData, SubscriptionStatus
 
 __all__ = [
+    "CommandModel",
+    "CompactDevice",
+    "CompactGeofence",
+    "CompactModel",
+    "CompactPosition",
+    "CompactReportsEvent",
+    "CompactServer",
     "DeviceModel",
     "GeofenceModel",
     "PositionModel",
     "ReportsEventeModel",
+    "ReportsStopModel",
+    "ReportsTripModel",
     "ServerModel",
     "SubscriptionData",
     "SubscriptionStatus",
@@ -0,0 +1,22 @@
+"""Model for the commands response."""
+
+from __future__ import annotations
+
+from typing import Any, TypedDict
+
+
+class CommandModel(TypedDict):
+    """Model for the commands response.
+
+    ref: https://www.traccar.org/api-reference/#tag/Commands/paths/~1commands~1send/post
+
+    WARNING!: The API documentation does not state that null is
+    valid for any keys, but this is not the case.
+    """
+
+    id: int
+    deviceId: int
+    description: str | None
+    type: str
+    textChannel: bool
+    attributes: dict[str, Any]
@@ -0,0 +1,268 @@
+"""Compact, slotted representations of the Traccar models.
+
+The ``TypedDict`` models are plain dictionaries at runtime. The classes in this
+module hold the same keys in ``__slots__`` instead, which takes a fraction of
+the memory when many positions or events are kept around. They are read-only
+mappings, so ``position["latitude"]`` works the same as for the dictionaries,
+and ``position.latitude`` is available as well.
+
+When `msgspec <https://pypi.org/project/msgspec/>`_ is installed, responses are
+decoded straight into the compact classes and the ``attributes`` and
+``network`` blobs are kept as raw JSON until they are first accessed. This
+only applies to :meth:`CompactModel.from_json_array`; models built from
+dictionaries, like those of the cached server, device and geofence
+endpoints, copy the already decoded values. With ``benchmarks.compact_models``
+the compact classes take about 1.4 times less memory than the dictionaries
+for positions and 1.7 times less for events.
+"""
+
+# The fields are named after the camelCase keys of the Traccar API, and the
+# package is imported relatively like the other modules of pytraccar.models
+# ruff: noqa: N815, TID252
+
+from __future__ import annotations
+
+from collections.abc import Iterator, Mapping
+from typing import TYPE_CHECKING, Any, ClassVar, Self
+
+from ..decoder import default_loads
+from .device import DeviceModel
+from .geofence import GeofenceModel
+from .position import PositionModel
+from .reports_event import ReportsEventeModel
+from .server import ServerModel
+
+if TYPE_CHECKING:
+    from ..decoder import JsonLoads
+
+_LAZY_FIELDS = frozenset({"attributes", "network"})
+_loads = default_loads()
+
+
+def _slot(field: str) -> str:
+    """Return the slot holding a field; lazily decoded fields are private."""
+    return f"_{field}" if field in _LAZY_FIELDS else field
+
+
+def _own_slots(fields: tuple[str, ...]) -> tuple[str, ...]:
+    """Return the slots of a model, except those of :class:`CompactModel`."""
+    return tuple(_slot(field) for field in fields if field != "attributes")
+
+
+class CompactModel(Mapping[str, Any]):
+    """Base class of the compact models.
+
+    Keys missing from the source data are ``None``, except ``attributes``,
+    which is an empty dictionary.
+
+    :param data: The model as decoded from the Traccar API.
+    :type data: Mapping[str, Any]
+    """
+
+    __slots__ = ("_attributes", "_lazy_loads")
+
+    _fields: ClassVar[tuple[str, ...]]
+    _field_set: ClassVar[frozenset[str]]
+    _slots: ClassVar[tuple[tuple[str, str], ...]]
+    _decoder: ClassVar[Any] = None
+
+    _attributes: dict[str, Any] | bytes | None
+    _lazy_loads: JsonLoads
+
+    def __init_subclass__(cls) -> None:
+        """Index the fields of the subclass."""
+        super().__init_subclass__()
+        cls._field_set = frozenset(cls._fields)
+        cls._slots = tuple((field, _slot(field)) for field in cls._fields)
+
+    def __init__(self, data: Mapping[str, Any]) -> None:
+        """Initialize the model."""
+        self._lazy_loads = _loads
+        for field, slot in self._slots:
+            setattr(self, slot, data.get(field))
+
+    @classmethod
+    def from_json_array(cls, body: bytes, loads: JsonLoads = _loads) -> list[Self]:
+        """Decode a JSON array of models.
+
+        :param body: The JSON document, e.g. a Traccar API response.
+        :type body: bytes
+        :param loads: Decoder used when ``msgspec`` is not installed, and for
+            the fields decoded on first access.
+        :type loads: JsonLoads
+        :return: The decoded models.
+        :rtype: list[Self]
+        """
+        if (decoder := cls._struct_decoder()) is None:
+            return [cls(item) for item in loads(body)]
+        models = []
+        for struct in decoder.decode(body):
+            model = cls.__new__(cls)
+            model._lazy_loads = loads  # noqa: SLF001
+            for field, slot in cls._slots:
+                value = getattr(struct, field)
+                # Copy the raw JSON, which otherwise keeps the whole body alive
+                setattr(model, slot, value if field == slot else bytes(value))
+            models.append(model)
+        return models
+
+    @classmethod
+    def _struct_decoder(cls) -> Any:
+        """Return a msgspec decoder for a list of models, if available."""
+        if cls._decoder is None:
+            try:
+                import msgspec  # noqa: PLC0415
+            except ImportError:
+                cls._decoder = False
+            else:
+                struct = msgspec.defstruct(
+                    cls.__name__,
+                    [
+                        (field, msgspec.Raw, msgspec.Raw(b"null"))
+                        if field in _LAZY_FIELDS
+                        else (field, Any, None)
+                        for field in cls._fields
+                    ],
+                    gc=False,
+                )
+                cls._decoder = msgspec.json.Decoder(list[struct])  # type: ignore[valid-type]
+        return cls._decoder or None
+
+    def __getitem__(self, key: str) -> Any:
+        """Return the value of a field."""
+        if key not in self._field_set:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the field names."""
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        """Return the number of fields."""
+        return len(self._fields)
+
+    def __repr__(self) -> str:
+        """Return the representation of the model."""
+        return f"{self.__class__.__name__}({dict(self)!r})"
+
+    def _decode_lazy(self, slot: str) -> Any:
+        """Return a lazily decoded field, decoding it on first access."""
+        value = getattr(self, slot)
+        if isinstance(value, bytes):
+            value = self._lazy_loads(value)
+            setattr(self, slot, value)
+        return value
+
+    @property
+    def attributes(self) -> dict[str, Any]:
+        """Return the attributes, decoding them on first access."""
+        attributes: dict[str, Any] | None = self._decode_lazy("_attributes")
+        if attributes is None:
+            attributes = self._attributes = {}
+        return attributes
+
+
+class CompactDevice(CompactModel):
+    """Compact representation of :class:`DeviceModel`."""
+
+    _fields = tuple(DeviceModel.__annotations__)
+    __slots__ = _own_slots(_fields)
+
+    id: int
+    name: str
+    uniqueId: str
+    status: str
+    disabled: bool
+    lastUpdate: str | None
+    positionId: int
+    groupId: int
+    phone: str | None
+    model: str | None
+    contact: str | None
+    category: str | None
+
+
+class CompactGeofence(CompactModel):
+    """Compact representation of :class:`GeofenceModel`."""
+
+    _fields = tuple(GeofenceModel.__annotations__)
+    __slots__ = _own_slots(_fields)
+
+    id: int
+    name: str
+    description: str | None
+    area: str
+    calendarId: str
+
+
+class CompactPosition(CompactModel):
+    """Compact representation of :class:`PositionModel`."""
+
+    _fields = tuple(PositionModel.__annotations__)
+    __slots__ = _own_slots(_fields)
+
+    id: int
+    deviceId: int
+    protocol: str
+    deviceTime: str
+    fixTime: str
+    serverTime: str
+    outdated: bool
+    valid: bool
+    latitude: float
+    geofenceIds: list[int] | None
+    longitude: float
+    altitude: int
+    speed: int
+    course: int
+    address: str | None
+    accuracy: int
+    _network: dict[str, Any] | bytes | None
+
+    @property
+    def network(self) -> dict[str, Any] | None:
+        """Return the network information, decoding it on first access."""
+        network: dict[str, Any] | None = self._decode_lazy("_network")
+        return network
+
+
+class CompactReportsEvent(CompactModel):
+    """Compact representation of :class:`ReportsEventeModel`."""
+
+    _fields = tuple(ReportsEventeModel.__annotations__)
+    __slots__ = _own_slots(_fields)
+
+    id: int
+    type: str
+    eventTime: str
+    deviceId: int
+    positionId: int
+    geofenceId: int
+    maintenanceId: int
+
+
+class CompactServer(CompactModel):
+    """Compact representation of :class:`ServerModel`."""
+
+    _fields = tuple(ServerModel.__annotations__)
+    __slots__ = _own_slots(_fields)
+
+    id: int
+    registration: bool
+    readonly: bool
+    deviceReadonly: bool
+    limitCommands: bool
+    map: str | None
+    bingKey: str | None
+    mapUrl: str | None
+    poiLayer: str | None
+    latitude: float
+    longitude: float
+    zoom: int
+    twelveHourFormat: bool
+    version: str
+    forceSettings: bool
+    coordinateFormat: str | None
+    openIdEnabled: bool
+    openIdForce: bool
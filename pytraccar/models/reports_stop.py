@@ -0,0 +1,27 @@
+"""Model for the reports/stops response."""
+
+from __future__ import annotations
+
+from typing import TypedDict
+
+
+class ReportsStopModel(TypedDict):
+    """Model for the reports/stops response.
+
+    ref: https://www.traccar.org/api-reference/#tag/Reports/paths/~1reports~1stops/get
+
+    WARNING!: The API documentation does not state that null is
+    valid for any keys, but this is not the case.
+    """
+
+    deviceId: int
+    deviceName: str
+    duration: int
+    startTime: str
+    endTime: str
+    address: str | None
+    lat: float
+    lon: float
+    positionId: int
+    spentFuel: float
+    engineHours: int
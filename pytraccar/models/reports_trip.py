@@ -0,0 +1,35 @@
+"""Model for the reports/trips response."""
+
+from __future__ import annotations
+
+from typing import TypedDict
+
+
+class ReportsTripModel(TypedDict):
+    """Model for the reports/trips response.
+
+    ref: https://www.traccar.org/api-reference/#tag/Reports/paths/~1reports~1trips/get
+
+    WARNING!: The API documentation does not state that null is
+    valid for any keys, but this is not the case.
+    """
+
+    deviceId: int
+    deviceName: str
+    maxSpeed: float
+    averageSpeed: float
+    distance: float
+    spentFuel: float
+    duration: int
+    startTime: str
+    startAddress: str | None
+    startLat: float
+    startLon: float
+    startPositionId: int
+    endTime: str
+    endAddress: str | None
+    endLat: float
+    endLon: float
+    endPositionId: int
+    driverUniqueId: str | None
+    driverName: str | None
@@ -18,6 +18,7 @@ class SubscriptionStatus(StrEnum):
     CONNECTING = "connecting"
     DISCONNECTED = "disconnected"
     ERROR = "error"
+    RECONNECTING = "reconnecting"
 
 
 class SubscriptionData(TypedDict):
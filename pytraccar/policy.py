@@ -0,0 +1,232 @@
+"""Rate limiting, retries and circuit breaking for API requests.
+
+Typical usage::
+
+    client = ApiClient(
+        ...,
+        request_policy=RequestPolicy(
+            rate_limiter=TokenBucket(rate=20, burst=40),
+            retry=ExponentialBackoff(initial=0.5, maximum=10, max_attempts=3),
+            circuit_breaker=CircuitBreaker(failure_threshold=5, recovery_time=30),
+        ),
+    )
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING
+
+from .exceptions import TraccarConnectionException
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from .backoff import ExponentialBackoff
+
+RETRY_METHODS = frozenset({"GET", "HEAD"})
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+
+class TokenBucket:
+    """Limit the rate of requests, allowing short bursts.
+
+    :param rate: Requests per second on average.
+    :type rate: float
+    :param burst: Maximum number of requests sent back to back. Defaults to
+        ``rate`` rounded up.
+    :type burst: int | None
+    :param clock: Monotonic clock returning seconds. Defaults to
+        :func:`time.monotonic`.
+    :type clock: Callable[[], float]
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        *,
+        burst: int | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the bucket, full."""
+        self._rate = rate
+        self._capacity = float(burst or max(1, -int(-rate // 1)))
+        self._clock = clock
+        self._tokens = self._capacity
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait for and take a token."""
+        async with self._lock:
+            if (wait := self._refill()) > 0:
+                await asyncio.sleep(wait)
+                self._refill()
+            self._tokens -= 1
+
+    def _refill(self) -> float:
+        """Add the tokens earned since the last call; return the wait for one."""
+        now = self._clock()
+        self._tokens = min(
+            self._capacity, self._tokens + (now - self._updated) * self._rate
+        )
+        self._updated = now
+        return (1 - self._tokens) / self._rate if self._tokens < 1 else 0
+
+
+class CircuitBreaker:
+    """Fail fast while Traccar is unhealthy.
+
+    After ``failure_threshold`` consecutive failures (connection errors,
+    timeouts and responses with one of the ``retry_statuses`` of the
+    :class:`RequestPolicy`) the circuit opens and requests fail immediately.
+    After ``recovery_time`` a single trial request is let through; the circuit
+    closes when it succeeds and opens again when it fails.
+
+    :param failure_threshold: Consecutive failures that open the circuit.
+        Defaults to ``5``.
+    :type failure_threshold: int
+    :param recovery_time: Seconds the circuit stays open. Defaults to ``30``.
+    :type recovery_time: float
+    :param clock: Monotonic clock returning seconds. Defaults to
+        :func:`time.monotonic`.
+    :type clock: Callable[[], float]
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_threshold: int = 5,
+        recovery_time: float = 30,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Initialize the breaker, closed."""
+        self._failure_threshold = failure_threshold
+        self._recovery_time = recovery_time
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial = False
+
+    @property
+    def is_open(self) -> bool:
+        """Return whether requests are currently rejected."""
+        if self._opened_at is None:
+            return False
+        return self._trial or self._clock() - self._opened_at < self._recovery_time
+
+    def before_request(self) -> None:
+        """Check that a request may be sent.
+
+        :raises TraccarConnectionException: If the circuit is open.
+        """
+        if self.is_open:
+            raise TraccarConnectionException("Circuit open, Traccar is unavailable")
+        if self._opened_at is not None:
+            self._trial = True
+
+    def record_success(self) -> None:
+        """Record a successful request, closing the circuit."""
+        self._failures = 0
+        self._opened_at = None
+        self._trial = False
+
+    def record_failure(self) -> None:
+        """Record a failed request, opening the circuit at the threshold."""
+        self._failures += 1
+        if self._trial or self._failures >= self._failure_threshold:
+            self._opened_at = self._clock()
+        self._trial = False
+
+
+@dataclass(frozen=True, slots=True)
+class RequestPolicy:
+    """How :class:`ApiClient` paces, retries and guards its requests.
+
+    :param rate_limiter: Limits the rate of all requests. Not limited when
+        ``None`` (the default).
+    :type rate_limiter: TokenBucket | None
+    :param retry: Delays between retries of ``GET`` requests that failed with a
+        connection error, a timeout or one of ``retry_statuses``. The number of
+        retries is ``max_attempts`` of the backoff. Not retried when ``None``
+        (the default).
+    :type retry: ExponentialBackoff | None
+    :param retry_statuses: Response statuses that are retried. Defaults to
+        ``429``, ``502``, ``503`` and ``504``.
+    :type retry_statuses: frozenset[int]
+    :param max_retry_after: Longest ``Retry-After`` (seconds) that is waited
+        for; a request asked to wait longer is not retried. Defaults to ``60``.
+    :type max_retry_after: float
+    :param circuit_breaker: Fails requests fast while Traccar is unhealthy.
+        Not used when ``None`` (the default).
+    :type circuit_breaker: CircuitBreaker | None
+    """
+
+    rate_limiter: TokenBucket | None = None
+    retry: ExponentialBackoff | None = None
+    retry_statuses: frozenset[int] = field(default=RETRY_STATUSES)
+    max_retry_after: float = 60
+    circuit_breaker: CircuitBreaker | None = None
+
+    async def before_request(self) -> None:
+        """Wait until a request may be sent.
+
+        :raises TraccarConnectionException: If the circuit is open.
+        """
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire()
+        # Checked last, as the breaker expects the outcome of a trial request
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.before_request()
+
+    def record(self, *, failed: bool) -> None:
+        """Record the outcome of a request with the circuit breaker."""
+        if self.circuit_breaker is None:
+            return
+        if failed:
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+
+    def retry_delay(
+        self, method: str, attempt: int, retry_after: str | None = None
+    ) -> float | None:
+        """Return the delay before retrying a failed request, if it is retried.
+
+        :param method: The HTTP method of the request.
+        :type method: str
+        :param attempt: Number of retries so far.
+        :type attempt: int
+        :param retry_after: The ``Retry-After`` header of the response, if any.
+        :type retry_after: str | None
+        :return: Seconds to wait before the retry, or ``None`` to give up.
+        :rtype: float | None
+        """
+        if (
+            self.retry is None
+            or method not in RETRY_METHODS
+            or self.retry.exhausted(attempt)
+        ):
+            return None
+        if retry_after is None or (delay := _parse_retry_after(retry_after)) is None:
+            return self.retry.delay(attempt)
+        return delay if delay <= self.max_retry_after else None
+
+
+def _parse_retry_after(value: str) -> float | None:
+    """Return the seconds to wait from a ``Retry-After`` header."""
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=UTC)
+    return max(0.0, (retry_at - datetime.now(tz=UTC)).total_seconds())
@@ -0,0 +1,242 @@
+"""Clients for many Traccar servers sharing one connection pool.
+
+Typical usage::
+
+    async with ApiClientPool(
+        {
+            "eu": {"host": "eu.example.com", "token": "..."},
+            "us": {"host": "us.example.com", "token": "...", "ssl": True},
+        }
+    ) as pool:
+        for server, device in await pool.get_devices():
+            ...
+        async for server, message in pool.subscribe(reconnect=True):
+            ...
+"""
+
+from __future__ import annotations
+
+import asyncio
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Self
+
+import aiohttp
+
+from .client import ApiClient
+from .exceptions import TraccarException
+from .utils import gather_limited
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Awaitable, Callable, Mapping
+    from types import TracebackType
+
+    from .models import DeviceModel, PositionModel, SubscriptionData
+
+
+class ApiClientPool:
+    """An :class:`ApiClient` per Traccar server, sharing one ``aiohttp`` session.
+
+    Unless ``client_session`` is given, the pool owns a session whose
+    connector limits the connections per server and in total, keeps idle
+    connections alive and caches DNS lookups. The session is created when the
+    pool is entered and closed when it is exited.
+
+    :param servers: Keyword arguments of :class:`ApiClient` (``host``,
+        ``token``, ``port``, ``ssl``, ...) by server name.
+    :type servers: Mapping[str, Mapping[str, Any]]
+    :param client_session: Session to use instead of creating one. The pool
+        does not close it and the connection settings below are ignored.
+    :type client_session: aiohttp.ClientSession | None
+    :param limit: Maximum number of connections in total. Defaults to ``100``.
+    :type limit: int
+    :param limit_per_host: Maximum number of connections to a single server.
+        Defaults to ``8``.
+    :type limit_per_host: int
+    :param keepalive_timeout: Seconds an idle connection is kept open.
+        Defaults to ``30``.
+    :type keepalive_timeout: float
+    :param dns_cache_ttl: Seconds DNS lookups are cached. Defaults to ``300``.
+    :type dns_cache_ttl: int
+    :param max_concurrency: Maximum number of servers called at once by
+        :meth:`fan_out`. Defaults to ``8``.
+    :type max_concurrency: int
+    """
+
+    def __init__(
+        self,
+        servers: Mapping[str, Mapping[str, Any]],
+        *,
+        client_session: aiohttp.ClientSession | None = None,
+        limit: int = 100,
+        limit_per_host: int = 8,
+        keepalive_timeout: float = 30,
+        dns_cache_ttl: int = 300,
+        max_concurrency: int = 8,
+    ) -> None:
+        """Initialize the pool."""
+        self._servers = dict(servers)
+        self._client_session = client_session
+        self._owns_session = client_session is None
+        self._connector_options: dict[str, Any] = {
+            "limit": limit,
+            "limit_per_host": limit_per_host,
+            "keepalive_timeout": keepalive_timeout,
+            "ttl_dns_cache": dns_cache_ttl,
+        }
+        self._max_concurrency = max_concurrency
+        self._clients: dict[str, ApiClient] = {}
+
+    @property
+    def clients(self) -> Mapping[str, ApiClient]:
+        """Return the clients by server name.
+
+        :raises TraccarException: If the pool has not been entered.
+        """
+        if self._client_session is None:
+            raise TraccarException("The client pool is not open")
+        return MappingProxyType(self._clients)
+
+    async def __aenter__(self) -> Self:
+        """Open the session and create the clients."""
+        if self._client_session is None:
+            self._client_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(**self._connector_options)
+            )
+        self._clients = {
+            name: ApiClient(client_session=self._client_session, **options)
+            for name, options in self._servers.items()
+        }
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the session, if owned by the pool."""
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the session, if owned by the pool."""
+        if self._owns_session and self._client_session is not None:
+            await self._client_session.close()
+            self._client_session = None
+        self._clients = {}
+
+    async def fan_out(
+        self,
+        call: Callable[[ApiClient], Awaitable[Any]],
+        *,
+        return_exceptions: bool = False,
+    ) -> dict[str, Any]:
+        """Call every server concurrently.
+
+        :param call: Coroutine function called with the client of every
+            server, e.g. ``lambda client: client.get_server()``.
+        :type call: Callable[[ApiClient], Awaitable[Any]]
+        :param return_exceptions: Return the :class:`TraccarException` of a
+            failed server as its result instead of raising it. Defaults to
+            ``False``.
+        :type return_exceptions: bool
+        :return: The result of every server, by server name.
+        :rtype: dict[str, Any]
+        :raises TraccarException: If a server fails and ``return_exceptions``
+            is not set. The calls to the other servers are cancelled.
+        """
+
+        async def _call(client: ApiClient) -> Any:
+            try:
+                return await call(client)
+            except TraccarException as exception:
+                if not return_exceptions:
+                    raise
+                return exception
+
+        clients = self.clients
+        results = await gather_limited(
+            self._max_concurrency, *(_call(client) for client in clients.values())
+        )
+        return dict(zip(clients, results, strict=True))
+
+    async def get_devices(self) -> list[tuple[str, DeviceModel]]:
+        """Get the devices of all servers.
+
+        :return: ``(server name, device)`` pairs, grouped by server.
+        :rtype: list[tuple[str, DeviceModel]]
+        :raises TraccarException: If a server fails.
+        """
+        results = await self.fan_out(lambda client: client.get_devices())
+        return [
+            (name, device) for name, devices in results.items() for device in devices
+        ]
+
+    async def get_positions(self) -> list[tuple[str, PositionModel]]:
+        """Get the positions of all servers.
+
+        :return: ``(server name, position)`` pairs, grouped by server.
+        :rtype: list[tuple[str, PositionModel]]
+        :raises TraccarException: If a server fails.
+        """
+        results = await self.fan_out(lambda client: client.get_positions())
+        return [
+            (name, position)
+            for name, positions in results.items()
+            for position in positions
+        ]
+
+    async def subscribe(
+        self, *, max_queue_size: int = 1000, **kwargs: Any
+    ) -> AsyncIterator[tuple[str, SubscriptionData]]:
+        """Subscribe to all servers and iterate over their messages.
+
+        Messages are queued until they are consumed; when the queue is full,
+        reading from the WebSockets pauses. The iterator ends when all
+        subscriptions have ended. Leaving the iteration early closes all
+        subscriptions.
+
+        :param max_queue_size: Maximum number of queued messages. Defaults to
+            ``1000``.
+        :type max_queue_size: int
+        :param kwargs: Keyword arguments of :meth:`ApiClient.subscribe`, e.g.
+            ``reconnect=True``.
+        :type kwargs: Any
+        :return: An async iterator over ``(server name, message)`` pairs.
+        :rtype: AsyncIterator[tuple[str, SubscriptionData]]
+        :raises TraccarException: If a subscription fails. The other
+            subscriptions are closed.
+        """
+        queue: asyncio.Queue[tuple[str, SubscriptionData]] = asyncio.Queue(
+            max_queue_size
+        )
+
+        def _enqueue(name: str) -> Callable[[SubscriptionData], Awaitable[None]]:
+            async def _put(data: SubscriptionData) -> None:
+                await queue.put((name, data))
+
+            return _put
+
+        subscriptions = [
+            asyncio.create_task(client.subscribe(_enqueue(name), **kwargs))
+            for name, client in self.clients.items()
+        ]
+        running: set[asyncio.Future[Any]] = set(subscriptions)
+        try:
+            while running or not queue.empty():
+                message = asyncio.ensure_future(queue.get())
+                done, _ = await asyncio.wait(
+                    {message, *running}, return_when=asyncio.FIRST_COMPLETED
+                )
+                for subscription in done & running:
+                    running.discard(subscription)
+                    if subscription.exception() is not None:
+                        message.cancel()
+                        subscription.result()
+                if message in done:
+                    yield message.result()
+                else:
+                    message.cancel()
+        finally:
+            for subscription in subscriptions:
+                subscription.cancel()
+            await asyncio.gather(*subscriptions, return_exceptions=True)
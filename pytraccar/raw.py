@@ -0,0 +1,83 @@
+"""Undecoded responses, for relaying Traccar data without decoding it.
+
+Typical usage::
+
+    async with client.stream_raw("positions") as stream:
+        await relay.prepare(stream.headers)
+        await stream.write_to(relay.write)
+"""
+
+from __future__ import annotations
+
+import inspect
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Awaitable, Callable, Mapping
+
+    import aiohttp
+
+
+class RawResponse(NamedTuple):
+    """A response with its body as received."""
+
+    status: int
+    """The HTTP status."""
+
+    headers: Mapping[str, str]
+    """The response headers, with case-insensitive names."""
+
+    body: bytes
+    """The undecoded body."""
+
+
+class RawStream:
+    """A response whose undecoded body is read in chunks.
+
+    Iterating over the stream yields the chunks of the body as they are
+    received. The body can be read only once.
+
+    :param response: The response to read.
+    :type response: aiohttp.ClientResponse
+    :param chunk_size: Maximum size of a chunk, in bytes.
+    :type chunk_size: int
+    """
+
+    def __init__(self, response: aiohttp.ClientResponse, chunk_size: int) -> None:
+        """Initialize the stream."""
+        self._response = response
+        self._chunk_size = chunk_size
+
+    @property
+    def status(self) -> int:
+        """Return the HTTP status."""
+        return self._response.status
+
+    @property
+    def headers(self) -> Mapping[str, str]:
+        """Return the response headers, with case-insensitive names."""
+        return self._response.headers
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        """Yield the chunks of the body."""
+        async for chunk in self._response.content.iter_chunked(self._chunk_size):
+            yield chunk
+
+    async def write_to(
+        self, sink: Callable[[bytes], Awaitable[object] | object]
+    ) -> int:
+        """Pass every chunk of the body to ``sink`` as it is received.
+
+        :param sink: Called with every chunk, e.g. the ``write`` method of a
+            file or of an ``aiohttp`` streaming response. Awaited when it
+            returns an awaitable.
+        :type sink: Callable[[bytes], Awaitable[object] | object]
+        :return: The size of the body, in bytes.
+        :rtype: int
+        """
+        size = 0
+        async for chunk in self:
+            size += len(chunk)
+            if inspect.isawaitable(result := sink(chunk)):
+                await result
+        return size
@@ -0,0 +1,124 @@
+"""Incremental decoding of JSON array responses.
+
+Large Traccar responses (``positions``, ``reports/events``) are JSON arrays
+of objects. The helpers here decode such arrays one item at a time from a
+stream of byte chunks, so only the item being decoded and the unread part of
+the current chunk are kept in memory. Items are decoded with :mod:`json`,
+whose ``raw_decode`` finds where each item ends. The ``json_loads`` of the
+client is not used here: finding the end of every item in Python before
+decoding it again is several times slower than ``raw_decode``.
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+from enum import Enum
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterable, AsyncIterator
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = frozenset(" \t\n\r")
+_VALUE_TERMINATORS = _WHITESPACE | {",", "]"}
+
+
+class _State(Enum):
+    """Parser state."""
+
+    START = 0
+    FIRST_VALUE = 1
+    VALUE = 2
+    SEPARATOR = 3
+    DONE = 4
+
+
+class JsonArrayParser:
+    """Incrementally parse the items of a top-level JSON array.
+
+    Text is passed in with :meth:`feed`, which returns every item completed
+    by that text. Incomplete trailing data is kept until the next call.
+
+    :raises ValueError: If the data is not a JSON array, or is incomplete
+        when ``final`` is set.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the parser."""
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._state = _State.START
+
+    def feed(self, text: str, *, final: bool = False) -> list[Any]:
+        """Feed text to the parser and return the completed items.
+
+        :param text: The next piece of the document.
+        :type text: str
+        :param final: Set when ``text`` is the end of the document.
+        :type final: bool
+        :return: Items completed by this piece of text, in document order.
+        :rtype: list[Any]
+        """
+        buffer = self._buffer + text if self._buffer else text
+        length = len(buffer)
+        position = 0
+        items: list[Any] = []
+
+        while position < length:
+            character = buffer[position]
+            if character in _WHITESPACE:
+                position += 1
+            elif self._state is _State.START:
+                if character != "[":
+                    raise ValueError("Expected a JSON array")
+                self._state = _State.FIRST_VALUE
+                position += 1
+            elif self._state is _State.FIRST_VALUE and character == "]":
+                self._state = _State.DONE
+                position += 1
+            elif self._state in (_State.FIRST_VALUE, _State.VALUE):
+                try:
+                    item, end = self._decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    if final:
+                        raise
+                    break
+                if not final and (
+                    end == length or buffer[end] not in _VALUE_TERMINATORS
+                ):
+                    # A number at the end of the buffer may continue in the
+                    # next chunk, so wait for more data before accepting it.
+                    break
+                items.append(item)
+                self._state = _State.SEPARATOR
+                position = end
+            elif self._state is _State.SEPARATOR and character in ",]":
+                self._state = _State.VALUE if character == "," else _State.DONE
+                position += 1
+            else:
+                raise ValueError(f"Unexpected character {character!r} at {position}")
+
+        self._buffer = buffer[position:]
+        if final and self._state is not _State.DONE:
+            raise ValueError("Incomplete JSON array")
+        return items
+
+
+async def iter_json_array(chunks: AsyncIterable[bytes]) -> AsyncIterator[Any]:
+    """Yield the items of a UTF-8 encoded JSON array from chunks of bytes.
+
+    :param chunks: The encoded document, in any number of chunks.
+    :type chunks: AsyncIterable[bytes]
+    :return: An async iterator over the items of the array.
+    :rtype: AsyncIterator[Any]
+    :raises ValueError: If the data is not a complete JSON array.
+    """
+    parser = JsonArrayParser()
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    async for chunk in chunks:
+        for item in parser.feed(decoder.decode(chunk)):
+            yield item
+    # A complete array always ends with "]", so this only validates the end.
+    parser.feed(decoder.decode(b"", final=True), final=True)
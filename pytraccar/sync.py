@@ -0,0 +1,212 @@
+"""Incremental synchronisation of devices and positions.
+
+Typical usage::
+
+    sync = DeltaSync(client)
+    while True:
+        devices, positions = await sync.sync()
+        for device in devices.added + devices.changed:
+            ...
+        await asyncio.sleep(60)
+"""
+
+from __future__ import annotations
+
+from operator import itemgetter
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Mapping
+
+    from .client import ApiClient
+    from .models import DeviceModel, PositionModel
+
+DEVICE_FINGERPRINT = (
+    "lastUpdate",
+    "positionId",
+    "status",
+    "disabled",
+    "name",
+    "groupId",
+)
+POSITION_FINGERPRINT = ("id", "serverTime")
+
+
+class Delta[ItemT](NamedTuple):
+    """Changes since the previous synchronisation."""
+
+    added: list[ItemT]
+    """Items that were not known before."""
+
+    changed: list[ItemT]
+    """Known items with a different fingerprint."""
+
+    removed: list[int]
+    """Ids of the items that are gone; device ids for positions."""
+
+
+class DeltaSync:
+    """Fetch devices and positions, reporting only what changed.
+
+    The last snapshot is kept. Items are compared by id and by a fingerprint
+    of a few fields, so changes to other fields are not reported. Once the
+    devices and positions have been synchronised, only the positions of
+    devices whose ``positionId`` moved are fetched.
+
+    :param client: The client to fetch the devices and positions with.
+    :type client: ApiClient
+    :param device_fingerprint: Device fields compared to detect changes.
+        Defaults to ``lastUpdate``, ``positionId``, ``status``, ``disabled``,
+        ``name`` and ``groupId``.
+    :type device_fingerprint: tuple[str, ...]
+    :param position_fingerprint: Position fields compared to detect changes.
+        Defaults to ``id`` and ``serverTime``.
+    :type position_fingerprint: tuple[str, ...]
+    :param max_concurrency: Maximum number of position requests in flight.
+        Defaults to ``4``.
+    :type max_concurrency: int
+    """
+
+    def __init__(
+        self,
+        client: ApiClient,
+        *,
+        device_fingerprint: tuple[str, ...] = DEVICE_FINGERPRINT,
+        position_fingerprint: tuple[str, ...] = POSITION_FINGERPRINT,
+        max_concurrency: int = 4,
+    ) -> None:
+        """Initialize the synchronisation, without a snapshot."""
+        self._client = client
+        self._device_fingerprint: Callable[[DeviceModel], Any] = itemgetter(
+            *device_fingerprint
+        )
+        self._position_fingerprint: Callable[[PositionModel], Any] = itemgetter(
+            *position_fingerprint
+        )
+        self._max_concurrency = max_concurrency
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the snapshot; the next synchronisation reports everything."""
+        self._devices: dict[int, DeviceModel] = {}
+        self._device_fingerprints: dict[int, Any] = {}
+        self._devices_synced = False
+        self._positions: dict[int, PositionModel] = {}
+        self._position_fingerprints: dict[int, Any] = {}
+
+    @property
+    def devices(self) -> Mapping[int, DeviceModel]:
+        """Return the devices of the snapshot by id."""
+        return MappingProxyType(self._devices)
+
+    @property
+    def positions(self) -> Mapping[int, PositionModel]:
+        """Return the latest positions of the snapshot by device id."""
+        return MappingProxyType(self._positions)
+
+    async def sync(self) -> tuple[Delta[DeviceModel], Delta[PositionModel]]:
+        """Synchronise the devices, then their positions.
+
+        :return: The changes of the devices and of the positions.
+        :rtype: tuple[Delta[DeviceModel], Delta[PositionModel]]
+        :raises TraccarException: If fetching the devices or positions fails.
+        """
+        devices = await self.sync_devices()
+        return devices, await self.sync_positions()
+
+    async def sync_devices(self) -> Delta[DeviceModel]:
+        """Fetch all devices and return the changes.
+
+        :return: The added, changed and removed devices.
+        :rtype: Delta[DeviceModel]
+        :raises TraccarException: If fetching the devices fails.
+        """
+        devices = await self._client.get_devices()
+        delta, self._device_fingerprints = _diff(
+            self._device_fingerprints,
+            devices,
+            self._device_fingerprint,
+            itemgetter("id"),
+        )
+        self._devices = {device["id"]: device for device in devices}
+        self._devices_synced = True
+        return delta
+
+    async def sync_positions(self) -> Delta[PositionModel]:
+        """Fetch the positions that moved and return the changes.
+
+        All positions are fetched while the devices have not been synchronised
+        or no positions are known yet. Afterwards, only the positions
+        referenced by a changed ``positionId`` of a device are fetched, and
+        the positions of removed devices are reported as removed. A moved
+        position is reported as changed only if its fingerprint differs.
+
+        :return: The added, changed and removed latest positions.
+        :rtype: Delta[PositionModel]
+        :raises TraccarException: If fetching the positions fails.
+        """
+        if not self._devices_synced or not self._positions:
+            positions = await self._client.get_positions()
+            delta, self._position_fingerprints = _diff(
+                self._position_fingerprints,
+                positions,
+                self._position_fingerprint,
+                itemgetter("deviceId"),
+            )
+            self._positions = {position["deviceId"]: position for position in positions}
+            return delta
+
+        moved = [
+            device["positionId"]
+            for device_id, device in self._devices.items()
+            if device["positionId"]
+            and (
+                (position := self._positions.get(device_id)) is None
+                or position["id"] != device["positionId"]
+            )
+        ]
+        added: list[PositionModel] = []
+        changed: list[PositionModel] = []
+        for position in await self._client.get_positions(
+            ids=moved, max_concurrency=self._max_concurrency
+        ):
+            device_id = position["deviceId"]
+            current = self._position_fingerprint(position)
+            if device_id not in self._positions:
+                added.append(position)
+            elif self._position_fingerprints[device_id] != current:
+                changed.append(position)
+            self._positions[device_id] = position
+            self._position_fingerprints[device_id] = current
+        removed = [
+            device_id for device_id in self._positions if device_id not in self._devices
+        ]
+        for device_id in removed:
+            del self._positions[device_id]
+            del self._position_fingerprints[device_id]
+        return Delta(added, changed, removed)
+
+
+def _diff[ItemT](
+    previous: dict[int, Any],
+    items: Iterable[ItemT],
+    fingerprint: Callable[[ItemT], Any],
+    key: Callable[[ItemT], int],
+) -> tuple[Delta[ItemT], dict[int, Any]]:
+    """Compare items with the fingerprints of a snapshot.
+
+    Returns the changes and the fingerprints of the new snapshot.
+    """
+    added: list[ItemT] = []
+    changed: list[ItemT] = []
+    fingerprints: dict[int, Any] = {}
+    for item in items:
+        item_id = key(item)
+        current = fingerprints[item_id] = fingerprint(item)
+        if item_id not in previous:
+            added.append(item)
+        elif previous[item_id] != current:
+            changed.append(item)
+    removed = [item_id for item_id in previous if item_id not in fingerprints]
+    return Delta(added, changed, removed), fingerprints
@@ -0,0 +1,134 @@
+"""Parse and format the timestamps of the Traccar API.
+
+Traccar sends times such as ``fixTime`` and ``eventTime`` as ISO 8601
+strings, e.g. ``2024-01-01T12:00:00.000+00:00``::
+
+    fix_times = parse_epoch_ms_many(position["fixTime"] for position in positions)
+
+Messages arriving in a burst repeat the same timestamps, e.g. the
+``serverTime`` of positions received together or a position's ``fixTime`` in
+its events, so :func:`parse_epoch_ms` caches the timestamps it parsed last.
+:func:`parse_timestamps` parses a whole column at once into a NumPy
+``datetime64`` array, and :func:`format_timestamp` encodes query parameters
+in UTC.
+"""
+
+from __future__ import annotations
+
+import math
+from datetime import UTC, datetime, timedelta
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    import numpy as np
+
+TIMESTAMP_CACHE_SIZE = 4096
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+@lru_cache(maxsize=TIMESTAMP_CACHE_SIZE)
+def parse_epoch_ms(value: str) -> int:
+    """Parse an ISO 8601 timestamp to milliseconds since the epoch.
+
+    Timestamps without a time zone are UTC. Digits beyond milliseconds are
+    truncated. The most recently parsed timestamps are cached.
+
+    :param value: The timestamp, e.g. ``2024-01-01T12:00:00.000+00:00``.
+    :type value: str
+    :return: The milliseconds since 1970-01-01T00:00:00Z.
+    :rtype: int
+    :raises ValueError: If ``value`` is not an ISO 8601 timestamp.
+    """
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=UTC)
+    return math.floor(parsed.timestamp()) * 1000 + parsed.microsecond // 1000
+
+
+def parse_datetime(value: str) -> datetime:
+    """Parse an ISO 8601 timestamp to a UTC datetime, like :func:`parse_epoch_ms`.
+
+    :param value: The timestamp, e.g. ``2024-01-01T12:00:00.000+00:00``.
+    :type value: str
+    :return: The time, with the UTC time zone.
+    :rtype: datetime
+    :raises ValueError: If ``value`` is not an ISO 8601 timestamp.
+    """
+    return _EPOCH + timedelta(milliseconds=parse_epoch_ms(value))
+
+
+def parse_epoch_ms_many(values: Iterable[str | None]) -> list[int | None]:
+    """Parse timestamps to milliseconds since the epoch, keeping ``None``.
+
+    :param values: The timestamps.
+    :type values: Iterable[str | None]
+    :return: The parsed timestamps, in order.
+    :rtype: list[int | None]
+    :raises ValueError: If a value is not an ISO 8601 timestamp.
+    """
+    return [None if value is None else parse_epoch_ms(value) for value in values]
+
+
+def parse_timestamps(values: Iterable[str | None]) -> np.ndarray[Any, Any]:
+    """Parse ISO 8601 timestamps to a ``datetime64[ms]`` array in UTC.
+
+    Accepts the formats used by Traccar, with a ``Z`` or ``±HH:MM`` suffix or
+    without a time zone (treated as UTC). ``None`` becomes ``NaT``. Requires
+    ``numpy``.
+
+    :param values: The timestamps.
+    :type values: Iterable[str | None]
+    :return: The parsed timestamps.
+    :rtype: numpy.ndarray
+    """
+    import numpy as np  # noqa: PLC0415
+
+    text = np.char.rstrip(
+        np.array(["NaT" if value is None else value for value in values], np.str_),
+        "Z",
+    )
+    if not text.size:
+        return np.empty(0, "datetime64[ms]")
+    # A date without a negative offset has exactly two dashes
+    plus = np.char.rpartition(text, "+")
+    minus = np.char.rpartition(text, "-")
+    has_plus = plus[..., 1] == "+"
+    has_minus = ~has_plus & (np.char.count(text, "-") == 3)
+    local = np.where(has_plus, plus[..., 0], np.where(has_minus, minus[..., 0], text))
+    offset = np.where(has_plus, plus[..., 2], np.where(has_minus, minus[..., 2], "0"))
+    offset = np.char.replace(offset, ":", "").astype(np.int64)
+    minutes = np.where(has_minus, -1, 1) * (offset // 100 * 60 + offset % 100)
+    parsed: np.ndarray[Any, Any] = local.astype("datetime64[ms]") - minutes.astype(
+        "timedelta64[m]"
+    )
+    return parsed
+
+
+def to_naive_utc(value: datetime) -> datetime:
+    """Convert an aware datetime to a naive one in UTC; naive ones are UTC.
+
+    :param value: The time.
+    :type value: datetime
+    :return: The time in UTC, without a time zone.
+    :rtype: datetime
+    """
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(UTC).replace(tzinfo=None)
+
+
+def format_timestamp(value: datetime) -> str:
+    """Format a time as an ISO 8601 query parameter in UTC.
+
+    Aware datetimes are converted to UTC; naive datetimes are taken as UTC.
+
+    :param value: The time.
+    :type value: datetime
+    :return: The time, e.g. ``2024-01-01T12:00:00Z``.
+    :rtype: str
+    """
+    return to_naive_utc(value).isoformat() + "Z"
@@ -0,0 +1,223 @@
+"""Helpers shared by the pytraccar client."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Any
+from urllib.parse import quote
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Iterable, Sequence
+    from datetime import datetime, timedelta
+
+    from .models import (
+        DeviceModel,
+        PositionModel,
+        ReportsEventeModel,
+        SubscriptionData,
+    )
+
+
+def batched(items: Sequence[int], size: int) -> list[list[int]]:
+    """Split a sequence into lists of at most ``size`` items.
+
+    :param items: The items to split.
+    :type items: Sequence[int]
+    :param size: Maximum number of items per batch.
+    :type size: int
+    :return: The batches, in order.
+    :rtype: list[list[int]]
+    :raises ValueError: If ``size`` is less than 1.
+    """
+    if size < 1:
+        raise ValueError("Batch size must be at least 1")
+    return [list(items[start : start + size]) for start in range(0, len(items), size)]
+
+
+def batched_params(
+    name: str, values: Iterable[str | int], max_length: int
+) -> list[list[tuple[str, str | int]]]:
+    """Split a repeated query parameter into batches fitting in a query string.
+
+    Every batch, URL encoded as ``name=value&name=value``, is at most
+    ``max_length`` characters long, unless a single value does not fit.
+
+    :param name: The name of the query parameter.
+    :type name: str
+    :param values: The values of the parameter.
+    :type values: Iterable[str | int]
+    :param max_length: Maximum length of the encoded batch.
+    :type max_length: int
+    :return: The query parameters of every batch, in order.
+    :rtype: list[list[tuple[str, str | int]]]
+    """
+    batches: list[list[tuple[str, str | int]]] = []
+    batch: list[tuple[str, str | int]] = []
+    length = 0
+    for value in values:
+        # The separating "&" and "="
+        size = len(name) + len(quote(str(value), safe="")) + 2
+        if batch and length + size > max_length + 1:
+            batches.append(batch)
+            batch, length = [], 0
+        batch.append((name, value))
+        length += size
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def route_template(endpoint: str) -> str:
+    """Return the route of an endpoint, as used to label metrics.
+
+    The query is dropped and numeric path segments are replaced with
+    ``{id}``, so that requests for different entities share a label.
+
+    :param endpoint: The endpoint, e.g. ``devices/12?all=true``.
+    :type endpoint: str
+    :return: The route, e.g. ``devices/{id}``.
+    :rtype: str
+    """
+    return "/".join(
+        "{id}" if segment.isdigit() else segment
+        for segment in endpoint.split("?", 1)[0].split("/")
+    )
+
+
+def split_time_range(
+    start: datetime,
+    end: datetime,
+    step: timedelta,
+) -> list[tuple[datetime, datetime]]:
+    """Split ``[start, end]`` into consecutive slices no longer than ``step``.
+
+    :param start: Start of the range.
+    :type start: datetime
+    :param end: End of the range.
+    :type end: datetime
+    :param step: Maximum length of a slice.
+    :type step: timedelta
+    :return: The ``(start, end)`` slices, in order. The end of a slice is the
+        start of the next.
+    :rtype: list[tuple[datetime, datetime]]
+    :raises ValueError: If ``step`` is not positive.
+    """
+    if step.total_seconds() <= 0:
+        raise ValueError("Time slice must be positive")
+    slices: list[tuple[datetime, datetime]] = []
+    while start < end:
+        slices.append((start, min(start + step, end)))
+        start += step
+    return slices or [(start, end)]
+
+
+async def gather_limited(limit: int, *aws: Awaitable[Any]) -> list[Any]:
+    """Await all awaitables with at most ``limit`` of them running at once.
+
+    If one of them fails the others are cancelled and the error is raised.
+
+    :param limit: Maximum number of awaitables running concurrently.
+    :type limit: int
+    :param aws: The awaitables to run.
+    :type aws: Awaitable[Any]
+    :return: The results, in the order of ``aws``.
+    :rtype: list[Any]
+    """
+    semaphore = asyncio.Semaphore(max(limit, 1))
+
+    async def _run(awaitable: Awaitable[Any]) -> Any:
+        async with semaphore:
+            return await awaitable
+
+    tasks = [asyncio.ensure_future(_run(awaitable)) for awaitable in aws]
+    try:
+        return list(await asyncio.gather(*tasks))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+
+
+def newest_positions(positions: Iterable[PositionModel]) -> list[PositionModel]:
+    """Return the newest position of every device.
+
+    :param positions: Positions of any number of devices, in any order.
+    :type positions: Iterable[PositionModel]
+    :return: One position per device, in order of first appearance.
+    :rtype: list[PositionModel]
+    """
+    newest: dict[int, PositionModel] = {}
+    update_newest_positions(newest, positions)
+    return list(newest.values())
+
+
+def update_newest_positions(
+    newest: dict[int, PositionModel],
+    positions: Iterable[PositionModel],
+) -> None:
+    """Update a mapping of device id to newest position in place.
+
+    Positions are ordered by ``fixTime`` and then by ``id``. Timestamps are
+    compared as strings, which is correct for the fixed format Traccar uses.
+
+    :param newest: Newest position by device id.
+    :type newest: dict[int, PositionModel]
+    :param positions: Positions of any number of devices, in any order.
+    :type positions: Iterable[PositionModel]
+    """
+    for position in positions:
+        current = newest.get(device_id := position["deviceId"])
+        if current is None or (position["fixTime"], position["id"]) >= (
+            current["fixTime"],
+            current["id"],
+        ):
+            newest[device_id] = position
+
+
+def update_latest_position_ids(
+    latest: dict[int, int],
+    positions: Iterable[PositionModel],
+) -> None:
+    """Update a mapping of device id to highest position id in place.
+
+    :param latest: Highest position id by device id.
+    :type latest: dict[int, int]
+    :param positions: Positions of any number of devices, in any order.
+    :type positions: Iterable[PositionModel]
+    """
+    for position in positions:
+        device_id = position["deviceId"]
+        latest[device_id] = max(position["id"], latest.get(device_id, -1))
+
+
+def merge_subscription_data(
+    messages: Iterable[SubscriptionData],
+    *,
+    coalesce: bool = False,
+) -> SubscriptionData:
+    """Merge subscription messages into one.
+
+    :param messages: The messages to merge, oldest first.
+    :type messages: Iterable[SubscriptionData]
+    :param coalesce: Keep only the newest position and the latest state of
+        every device instead of all of them. Events are always kept.
+    :type coalesce: bool
+    :return: A message with the devices, positions and events of all messages.
+        Keys without any items are ``None``.
+    :rtype: SubscriptionData
+    """
+    devices: list[DeviceModel] = []
+    positions: list[PositionModel] = []
+    events: list[ReportsEventeModel] = []
+    for message in messages:
+        devices.extend(message["devices"] or ())
+        positions.extend(message["positions"] or ())
+        events.extend(message["events"] or ())
+    if coalesce:
+        devices = list({device["id"]: device for device in devices}.values())
+        positions = newest_positions(positions)
+    return {
+        "devices": devices or None,
+        "positions": positions or None,
+        "events": events or None,
+    }
@@ -5,9 +5,13 @@ from __future__ import annotations
 import json
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from aiohttp import WSMsgType
+from multidict import CIMultiDict
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
 
 
 class WSMessage:
@@ -18,10 +22,15 @@ class WSMessage:
         self.type = messagetype
         self._json = json
 
-    def json(self) -> dict | None:
+    def json(self, **_: Any) -> dict | None:
         """json."""
         return self._json
 
+    @property
+    def data(self) -> str:
+        """Return the message text."""
+        return json.dumps(self._json, ensure_ascii=False)
+
 
 def load_response(filename: str) -> dict[str, Any]:
     """Load a response."""
@@ -35,6 +44,22 @@ def load_response(filename: str) -> dict[str, Any]:
         return json.loads(fptr.read())
 
 
+def make_position(
+    position_id: int,
+    device_id: int,
+    fix_time: str = "2024-01-01T00:00:00Z",
+    **fields: Any,
+) -> dict[str, Any]:
+    """Return a position payload, received when it was recorded."""
+    return {
+        "id": position_id,
+        "deviceId": device_id,
+        "fixTime": fix_time,
+        "serverTime": fix_time,
+        **fields,
+    }
+
+
 class WSMessageHandler:
     """WSMessageHandler."""
 
@@ -55,6 +80,19 @@ class WSMessageHandler:
         )
 
 
+class MockStreamReader:
+    """Mock stream reader class."""
+
+    def __init__(self, body: bytes) -> None:
+        """Initialize."""
+        self._body = body
+
+    async def iter_chunked(self, n: int) -> AsyncIterator[bytes]:
+        """iter_chunked."""
+        for start in range(0, len(self._body), n):
+            yield self._body[start : start + n]
+
+
 @dataclass
 class MockResponse:
     """Mock response class."""
@@ -83,6 +121,11 @@ class MockResponse:
         """status."""
         return self.mock_status
 
+    @property
+    def headers(self) -> CIMultiDict[str]:
+        """headers."""
+        return CIMultiDict(self.mock_headers or {})
+
     @property
     def reason(self) -> str:
         """Return the reason."""
@@ -90,6 +133,21 @@ class MockResponse:
 
     async def json(self, **_: Any) -> Any:
         """json."""
+        return self._data()
+
+    async def read(self) -> bytes:
+        """read."""
+        if self.mock_status == 204:
+            return b""
+        return json.dumps(self._data()).encode()
+
+    @property
+    def content(self) -> MockStreamReader:
+        """content."""
+        return MockStreamReader(json.dumps(self._data()).encode())
+
+    def _data(self) -> Any:
+        """Return the mocked data."""
         if self.mock_raises is not None:
             raise self.mock_raises  # pylint: disable=raising-bad-type
         if self.mock_data_list:
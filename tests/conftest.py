@@ -71,11 +71,11 @@ async def client_session(
 
     async def _mocked_request(*args: Any, **kwargs: Any) -> Any:
         if len(args) > 2:
-            mock_response.mock_endpoint = args[2].split("/api/")[-1]
-            mock_requests.add({"method": args[1], "url": args[2], **kwargs})
+            mock_response.mock_endpoint = str(args[2]).split("/api/")[-1]
+            mock_requests.add({"method": args[1], "url": str(args[2]), **kwargs})
         else:
-            mock_response.mock_endpoint = args[1].split("/api/")[-1]
-            mock_requests.add({"method": args[0], "url": args[1], **kwargs})
+            mock_response.mock_endpoint = str(args[1]).split("/api/")[-1]
+            mock_requests.add({"method": args[0], "url": str(args[1]), **kwargs})
         return mock_response
 
     async with aiohttp.ClientSession() as session:
@@ -1,8 +1,11 @@
 """Test API endpoint."""
 
+from datetime import UTC, datetime, timedelta, timezone
+
 import pytest
 
-from pytraccar import ApiClient
+from pytraccar import ApiClient, TraccarResponseException
+from tests.common import MockedRequests, MockResponse
 
 
 @pytest.mark.asyncio
@@ -42,3 +45,135 @@ async def test_reports_events(api_client: ApiClient) -> None:
     response = await api_client.get_reports_events()
     assert isinstance(response, list)
     assert response[0]["id"] == 0
+
+
+@pytest.mark.asyncio
+async def test_reports_events_window(
+    api_client: ApiClient, mock_requests: MockedRequests
+) -> None:
+    """Test the time window sent to /reports/events."""
+    await api_client.get_reports_events(
+        start_time=datetime(2024, 1, 1),  # noqa: DTZ001
+        end_time=datetime(2024, 1, 2),  # noqa: DTZ001
+    )
+    assert mock_requests.last_request["params"][:2] == [
+        ("to", "2024-01-02T00:00:00Z"),
+        ("from", "2024-01-01T00:00:00Z"),
+    ]
+    await api_client.get_reports_events(
+        start_time=datetime(2024, 1, 1, 2, tzinfo=timezone(timedelta(hours=2))),
+        end_time=datetime(2024, 1, 2, tzinfo=UTC),
+    )
+    assert mock_requests.last_request["params"][:2] == [
+        ("to", "2024-01-02T00:00:00Z"),
+        ("from", "2024-01-01T00:00:00Z"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_reports_events_chunked(
+    api_client: ApiClient,
+    mock_requests: MockedRequests,
+    mock_response: MockResponse,
+) -> None:
+    """Test splitting /reports/events into time slices and device batches."""
+    mock_response.mock_data_list = [
+        [
+            {"id": 2, "eventTime": "2024-01-01T10:00:00.000+00:00"},
+            {"id": 1, "eventTime": "2024-01-01T01:00:00.000+00:00"},
+        ],
+        [{"id": 3, "eventTime": "2024-01-01T05:00:00.000+00:00"}],
+        [
+            {"id": 2, "eventTime": "2024-01-01T10:00:00.000+00:00"},
+            {"id": 5, "eventTime": "2024-01-02T00:00:00.000+00:00"},
+        ],
+        [{"id": 4, "eventTime": "2024-01-01T23:00:00.000+00:00"}],
+    ]
+    response = await api_client.get_reports_events(
+        devices=[1, 2, 3],
+        start_time=datetime(2024, 1, 1),  # noqa: DTZ001
+        end_time=datetime(2024, 1, 2),  # noqa: DTZ001
+        time_slice=timedelta(hours=12),
+        device_batch_size=2,
+        max_concurrency=2,
+    )
+    assert [event["id"] for event in response] == [1, 3, 2, 4, 5]
+    assert mock_requests.called == 4
+    assert [
+        (
+            dict(call["params"])["from"],
+            [v for k, v in call["params"] if k == "deviceId"],
+        )
+        for call in mock_requests._calls  # noqa: SLF001
+    ] == [
+        ("2024-01-01T00:00:00Z", [1, 2]),
+        ("2024-01-01T00:00:00Z", [3]),
+        ("2024-01-01T12:00:00Z", [1, 2]),
+        ("2024-01-01T12:00:00Z", [3]),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_reports_events_chunked_error(
+    api_client: ApiClient, mock_response: MockResponse
+) -> None:
+    """Test that a failing slice fails the chunked report."""
+    mock_response.mock_status = 500
+    with pytest.raises(TraccarResponseException):
+        await api_client.get_reports_events(time_slice=timedelta(hours=1))
+
+
+@pytest.mark.asyncio
+async def test_devices_filtered(
+    api_client: ApiClient,
+    mock_requests: MockedRequests,
+    mock_response: MockResponse,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test filtering devices, split into short queries and merged."""
+    await api_client.get_devices(all_devices=True, user_id=5)
+    assert mock_requests.last_request["params"] == [("all", "true"), ("userId", 5)]
+
+    mock_requests.clear()
+    monkeypatch.setattr("pytraccar.client.MAX_QUERY_LENGTH", len("userId=5&id=1&id=2"))
+    mock_response.mock_data_list = [
+        [{"id": 1}, {"id": 2}],
+        [{"id": 3}],
+        [{"id": 2, "uniqueId": "b"}],
+    ]
+    response = await api_client.get_devices(
+        ids=[1, 2, 3], unique_ids=["b"], user_id=5, compact=True
+    )
+    assert [device["id"] for device in response] == [1, 2, 3]
+    assert [request["params"] for request in mock_requests._calls] == [  # noqa: SLF001
+        [("userId", 5), ("id", 1), ("id", 2)],
+        [("userId", 5), ("id", 3)],
+        [("userId", 5), ("uniqueId", "b")],
+    ]
+
+    mock_requests.clear()
+    assert await api_client.get_devices(ids=[]) == []
+    assert mock_requests.called == 0
+
+
+@pytest.mark.asyncio
+async def test_positions_filtered(
+    api_client: ApiClient,
+    mock_requests: MockedRequests,
+    mock_response: MockResponse,
+) -> None:
+    """Test requesting positions by device and by id."""
+    mock_response.mock_data_list = [[{"id": 10}], [{"id": 20}], [{"id": 10}]]
+    response = await api_client.get_positions(devices=[1, 2], ids=[10])
+    assert response == [{"id": 10}, {"id": 20}]
+    assert [request["params"] for request in mock_requests._calls] == [  # noqa: SLF001
+        [("deviceId", 1)],
+        [("deviceId", 2)],
+        [("id", 10)],
+    ]
+
+    mock_requests.clear()
+    mock_response.mock_data_list = None
+    response = await api_client.get_positions(ids=[0], compact=True)
+    assert response[0]["id"] == 0
+    assert mock_requests.last_request["params"] == [("id", 0)]
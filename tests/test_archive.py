@@ -0,0 +1,288 @@
+"""Test the position archive."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING
+
+import pytest
+
+from pytraccar import ApiClient, ArchivedPosition, PositionArchive
+from pytraccar.archive import RECORD, RECORD_DTYPE
+from tests.common import make_position
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from tests.common import MockedRequests, MockResponse
+
+DAY = datetime(2024, 1, 1)  # noqa: DTZ001
+MOTION = {
+    "latitude": 59.9,
+    "longitude": 10.7,
+    "altitude": None,
+    "speed": 5.0,
+    "course": 90.0,
+    "accuracy": 3.0,
+}
+
+
+def _ms(value: str) -> int:
+    return int(datetime.fromisoformat(value).timestamp() * 1000)
+
+
+def test_archive_add_and_read(tmp_path: Path) -> None:
+    """Test storing positions and reading them back in order."""
+    with PositionArchive(tmp_path) as archive:
+        assert (
+            archive.add(
+                [
+                    make_position(2, 1, "2024-01-01T12:00:00.000+00:00", **MOTION),
+                    make_position(1, 1, "2024-01-01T06:00:00.000+00:00", **MOTION),
+                    make_position(3, 1, "2024-01-02T01:00:00.000+01:00", **MOTION),
+                    make_position(4, 2, "2024-01-01T12:00:00.000+00:00", **MOTION),
+                    make_position(1, 1, "2024-01-01T06:00:00.000+00:00", **MOTION),
+                ]
+            )
+            == 4
+        )
+        assert [position.position_id for position in archive.positions(1)] == [
+            1,
+            2,
+            3,
+        ]
+        assert list(archive.positions(2)) == [
+            ArchivedPosition(
+                2, _ms("2024-01-01T12:00:00+00:00"), 4, 59.9, 10.7, 0, 5, 90, 3
+            )
+        ]
+        assert list(archive.positions(3)) == []
+
+        # Duplicates are skipped, late positions are merged in order
+        assert (
+            archive.add(
+                [make_position(2, 1, "2024-01-01T12:00:00.000+00:00", **MOTION)]
+            )
+            == 0
+        )
+        assert (
+            archive.add(
+                [make_position(5, 1, "2024-01-01T09:00:00.000+00:00", **MOTION)]
+            )
+            == 1
+        )
+        assert (
+            archive.add(
+                [make_position(6, 1, "2024-01-01T18:00:00.000+00:00", **MOTION)]
+            )
+            == 1
+        )
+        in_range = archive.positions(
+            1, datetime(2024, 1, 1, 9, tzinfo=UTC), DAY + timedelta(hours=18)
+        )
+        assert [position.position_id for position in in_range] == [5, 2, 6]
+
+        views = list(archive.records(1, DAY, DAY + timedelta(hours=23)))
+        assert [len(view) // RECORD.size for view in views] == [4]
+        assert RECORD.unpack_from(views[0])[:2] == (
+            _ms("2024-01-01T06:00:00+00:00"),
+            1,
+        )
+        for view in views:
+            view.release()
+        assert list(archive.records(1, DAY + timedelta(days=3))) == []
+        assert list(archive.records(1, end_time=DAY - timedelta(days=1))) == []
+
+        # Empty partitions are ignored
+        (tmp_path / "1" / "0.bin").touch()
+        assert len(list(archive.positions(1))) == 5
+
+    with PositionArchive(tmp_path) as archive:
+        assert len(list(archive.positions(1))) == 5
+
+
+def test_archive_millisecond_bounds(tmp_path: Path) -> None:
+    """Test that time bounds are converted to milliseconds exactly."""
+    fix_time = datetime(1978, 8, 31, 21, 42, 17, 923000)  # noqa: DTZ001
+    with PositionArchive(tmp_path) as archive:
+        archive.add([make_position(1, 1, f"{fix_time.isoformat()}Z", **MOTION)])
+        assert [
+            position.position_id
+            for position in archive.positions(1, fix_time, fix_time)
+        ] == [1]
+
+
+def test_archive_closes_replaced_maps(tmp_path: Path) -> None:
+    """Test that rewriting a partition closes its previous memory map."""
+    with PositionArchive(tmp_path) as archive:
+        archive.add([make_position(3, 1, "2024-01-01T12:00:00.000+00:00", **MOTION)])
+        view = next(archive.records(1))
+        exported = list(archive._maps.values())  # noqa: SLF001
+        archive.add([make_position(2, 1, "2024-01-01T09:00:00.000+00:00", **MOTION)])
+        assert RECORD.unpack_from(view)[1] == 3
+        view.release()
+        assert not exported[0].closed
+
+        assert len(list(archive.positions(1))) == 2
+        replaced = list(archive._maps.values())  # noqa: SLF001
+        archive.add([make_position(1, 1, "2024-01-01T06:00:00.000+00:00", **MOTION)])
+        assert replaced[0].closed
+        assert [position.position_id for position in archive.positions(1)] == [1, 2, 3]
+
+
+def test_archive_numpy(tmp_path: Path) -> None:
+    """Test reading the records without copying."""
+    np = pytest.importorskip("numpy")
+    with PositionArchive(tmp_path, partition=timedelta(hours=1)) as archive:
+        archive.add(
+            [
+                make_position(1, 1, "2024-01-01T06:00:00.000+00:00", **MOTION),
+                make_position(2, 1, "2024-01-01T06:30:00.000+00:00", **MOTION),
+            ]
+        )
+        (view,) = archive.records(1)
+        records = np.frombuffer(view, dtype=RECORD_DTYPE)
+        assert records["id"].tolist() == [1, 2]
+        del records
+        view.release()
+
+
+@pytest.mark.asyncio
+async def test_archive_handle(tmp_path: Path) -> None:
+    """Test storing the positions of subscription messages."""
+    with PositionArchive(tmp_path) as archive:
+        await archive.handle({"devices": None, "events": None, "positions": None})
+        await archive.handle(
+            {
+                "devices": None,
+                "events": None,
+                "positions": [
+                    make_position(1, 1, "2024-01-01T06:00:00.000+00:00", **MOTION)
+                ],
+            }
+        )
+        assert len(list(archive.positions(1))) == 1
+
+
+@pytest.mark.asyncio
+async def test_archive_fetch(
+    tmp_path: Path,
+    api_client: ApiClient,
+    mock_requests: MockedRequests,
+    mock_response: MockResponse,
+) -> None:
+    """Test fetching only the ranges missing from the archive."""
+    mock_response.mock_data = [
+        make_position(1, 1, "2024-01-01T06:00:00.000+00:00", **MOTION),
+        make_position(2, 1, "2024-01-01T12:00:00.000+00:00", **MOTION),
+    ]
+    with PositionArchive(tmp_path) as archive:
+        assert archive.missing(1, DAY, DAY + timedelta(days=1)) == [
+            (DAY, DAY + timedelta(days=1))
+        ]
+        positions = [
+            position.position_id
+            async for position in archive.fetch(
+                api_client,
+                devices=[1],
+                start_time=DAY,
+                end_time=DAY + timedelta(days=1),
+                time_slice=None,
+            )
+        ]
+        assert positions == [1, 2]
+        assert mock_requests.called == 1
+        assert archive.missing(1, DAY, DAY + timedelta(days=1)) == []
+
+        positions = [
+            position.position_id
+            async for position in archive.fetch(
+                api_client,
+                devices=[1],
+                start_time=DAY + timedelta(hours=10),
+                end_time=DAY + timedelta(days=1),
+            )
+        ]
+        assert positions == [2]
+        assert mock_requests.called == 1
+
+        mock_response.mock_data = []
+        assert [
+            position
+            async for position in archive.fetch(
+                api_client,
+                devices=[1],
+                start_time=DAY + timedelta(days=4),
+                end_time=DAY + timedelta(days=5),
+                time_slice=None,
+            )
+        ] == []
+        assert mock_requests.called == 2
+        assert archive.missing(1, DAY + timedelta(days=2), DAY + timedelta(days=3)) == [
+            (DAY + timedelta(days=2), DAY + timedelta(days=3))
+        ]
+        assert archive.missing(1, DAY, DAY + timedelta(days=5, hours=1)) == [
+            (
+                DAY + timedelta(days=1, milliseconds=1),
+                DAY + timedelta(days=4, milliseconds=-1),
+            ),
+            (
+                DAY + timedelta(days=5, milliseconds=1),
+                DAY + timedelta(days=5, hours=1),
+            ),
+        ]
+
+
+@pytest.mark.asyncio
+async def test_archive_fetch_in_batches(
+    tmp_path: Path,
+    api_client: ApiClient,
+    mock_response: MockResponse,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test storing large fetches in batches and not covering the future."""
+    monkeypatch.setattr("pytraccar.archive.ADD_BATCH_SIZE", 2)
+    start = datetime.now(tz=UTC) + timedelta(days=1)
+    mock_response.mock_data = [
+        make_position(
+            index, 1, (start + timedelta(minutes=index)).isoformat(), **MOTION
+        )
+        for index in range(5)
+    ]
+    with PositionArchive(tmp_path) as archive:
+        positions = [
+            position
+            async for position in archive.fetch(
+                api_client,
+                devices=[1],
+                start_time=start,
+                end_time=start + timedelta(hours=1),
+                time_slice=None,
+            )
+        ]
+        assert len(positions) == 5
+        assert len(archive.missing(1, start, start + timedelta(hours=1))) == 1
+
+
+@pytest.mark.asyncio
+async def test_archive_fetch_merges_ranges(
+    tmp_path: Path,
+    api_client: ApiClient,
+    mock_requests: MockedRequests,
+    mock_response: MockResponse,
+) -> None:
+    """Test that adjacent fetched ranges are merged."""
+    mock_response.mock_data = []
+    with PositionArchive(tmp_path) as archive:
+        for start, end in ((0, 1), (2, 3), (1, 2)):
+            async for _ in archive.fetch(
+                api_client,
+                devices=[1],
+                start_time=DAY + timedelta(days=start),
+                end_time=DAY + timedelta(days=end),
+                time_slice=None,
+            ):
+                pass
+        assert mock_requests.called == 3
+        assert archive.missing(1, DAY, DAY + timedelta(days=3)) == []
+        assert len((tmp_path / "1" / "coverage.json").read_text().split("],")) == 1
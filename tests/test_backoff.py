@@ -0,0 +1,27 @@
+"""Test the exponential backoff."""
+
+from unittest.mock import patch
+
+from pytraccar import ExponentialBackoff
+
+
+def test_backoff_delay() -> None:
+    """Test the delay grows exponentially up to the maximum."""
+    backoff = ExponentialBackoff(initial=1, maximum=10, factor=2, jitter=0)
+    assert [backoff.delay(attempt) for attempt in range(6)] == [1, 2, 4, 8, 10, 10]
+
+
+def test_backoff_jitter() -> None:
+    """Test the jitter reduces the delay by a random fraction."""
+    backoff = ExponentialBackoff(initial=4, jitter=0.5)
+    with patch("pytraccar.backoff.random.random", return_value=1):
+        assert backoff.delay(0) == 2
+    with patch("pytraccar.backoff.random.random", return_value=0):
+        assert backoff.delay(0) == 4
+
+
+def test_backoff_exhausted() -> None:
+    """Test the attempt limit."""
+    assert not ExponentialBackoff().exhausted(1000)
+    assert not ExponentialBackoff(max_attempts=2).exhausted(1)
+    assert ExponentialBackoff(max_attempts=2).exhausted(2)
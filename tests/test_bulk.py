@@ -0,0 +1,184 @@
+"""Test the write methods and bulk operations."""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+from pytraccar import (
+    ApiClient,
+    BulkFailure,
+    BulkResult,
+    ResponseCache,
+    TraccarException,
+    TraccarResponseException,
+)
+
+if TYPE_CHECKING:
+    import aiohttp
+
+    from tests.common import MockedRequests, MockResponse
+
+
+def _request(mock_requests: MockedRequests) -> tuple[str, str, Any]:
+    """Return the method, endpoint and body of the last request."""
+    request = mock_requests.last_request
+    data = request["data"]
+    return (
+        request["method"],
+        str(request["url"]).split("/api/")[-1],
+        None if data is None else json.loads(data),
+    )
+
+
+@pytest.mark.asyncio
+async def test_write_methods(
+    api_client: ApiClient,
+    mock_requests: MockedRequests,
+    mock_response: MockResponse,
+) -> None:
+    """Test the requests sent by the write methods."""
+    device = {"id": 1, "name": "Car", "uniqueId": "123"}
+    mock_response.mock_data = device
+    assert await api_client.create_device({"name": "Car", "uniqueId": "123"}) == device
+    assert _request(mock_requests) == (
+        "POST",
+        "devices",
+        {"name": "Car", "uniqueId": "123"},
+    )
+    assert await api_client.update_device(device) == device
+    assert _request(mock_requests) == ("PUT", "devices/1", device)
+
+    geofence = {"id": 2, "name": "Home", "area": "CIRCLE (59.9 10.7, 100)"}
+    mock_response.mock_data = geofence
+    assert await api_client.create_geofence({"name": "Home"}) == geofence
+    assert _request(mock_requests) == ("POST", "geofences", {"name": "Home"})
+    assert await api_client.update_geofence(geofence) == geofence
+    assert _request(mock_requests) == ("PUT", "geofences/2", geofence)
+
+    command = {"id": 0, "deviceId": 1, "type": "engineStop", "attributes": {}}
+    mock_response.mock_data = command
+    mock_response.mock_status = 202
+    assert await api_client.send_command(1, "engineStop") == command
+    assert _request(mock_requests) == (
+        "POST",
+        "commands/send",
+        {"deviceId": 1, "type": "engineStop", "attributes": {}},
+    )
+
+    mock_response.mock_status = 204
+    assert await api_client.delete_device(1) is None
+    assert _request(mock_requests) == ("DELETE", "devices/1", None)
+    assert await api_client.delete_geofence(2) is None
+    assert _request(mock_requests) == ("DELETE", "geofences/2", None)
+    permission = {"deviceId": 1, "geofenceId": 2}
+    await api_client.add_permission(permission)
+    assert _request(mock_requests) == ("POST", "permissions", permission)
+    await api_client.remove_permission(permission)
+    assert _request(mock_requests) == ("DELETE", "permissions", permission)
+
+
+@pytest.mark.asyncio
+async def test_writes_invalidate_cache(
+    client_session: aiohttp.ClientSession,
+    mock_requests: MockedRequests,
+    mock_response: MockResponse,
+) -> None:
+    """Test that cached responses are dropped after a write, even a failed one."""
+    client = ApiClient(
+        host="127.0.0.1",
+        token="test",  # noqa: S106
+        client_session=client_session,
+        cache=ResponseCache(),
+    )
+    await client.get_devices()
+    await client.get_geofences()
+    mock_response.mock_status = 500
+    with pytest.raises(TraccarResponseException):
+        await client.add_permission({"deviceId": 1, "geofenceId": 2})
+    mock_response.mock_status = 200
+    await client.get_devices()
+    await client.get_geofences()
+    assert mock_requests.called == 5
+
+
+@pytest.mark.asyncio
+async def test_bulk(api_client: ApiClient) -> None:
+    """Test that failures are collected without stopping the other items."""
+
+    async def _operation(item: int) -> int:
+        if item % 3 == 0:
+            raise TraccarResponseException(f"500: {item}")
+        return item * 10
+
+    result = await api_client.bulk(range(1, 10), _operation, max_concurrency=4)
+    assert result.succeeded == [10, 20, 40, 50, 70, 80]
+    assert [failure.item for failure in result.failed] == [3, 6, 9]
+    assert str(result.failed[0].error) == "500: 3"
+    assert await api_client.bulk([], _operation) == BulkResult([], [])
+
+
+@pytest.mark.asyncio
+async def test_bulk_updates_without_id(
+    api_client: ApiClient, mock_requests: MockedRequests
+) -> None:
+    """Test that items without an id are collected as failures."""
+    devices = await api_client.bulk([{"name": "Car"}], api_client.update_device)
+    geofences = await api_client.bulk([{"name": "Home"}], api_client.update_geofence)
+    assert [str(failure.error) for failure in devices.failed] == ["Device without id"]
+    assert [str(failure.error) for failure in geofences.failed] == [
+        "Geofence without id"
+    ]
+    assert not mock_requests._calls  # noqa: SLF001
+
+
+@pytest.mark.asyncio
+async def test_bulk_unexpected_error(api_client: ApiClient) -> None:
+    """Test that errors other than Traccar errors stop the operation."""
+
+    async def _operation(item: int) -> int:
+        if item == 2:
+            raise ValueError(item)
+        return item
+
+    with pytest.raises(ValueError, match="2"):
+        await api_client.bulk(range(5), _operation, max_concurrency=2)
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_devices(
+    api_client: ApiClient,
+    mock_requests: MockedRequests,
+    mock_response: MockResponse,
+) -> None:
+    """Test that devices are created or updated once, matched by uniqueId."""
+    existing = [
+        {"id": 1, "name": "Car", "uniqueId": "a", "phone": None},
+        {"id": 2, "name": "Van", "uniqueId": "b", "phone": None},
+    ]
+    created = {"id": 3, "name": "Bus", "uniqueId": "c", "phone": None}
+    updated = {"id": 2, "name": "Truck", "uniqueId": "b", "phone": None}
+    mock_response.mock_data_list = [existing, updated, created]
+    result = await api_client.bulk_upsert_devices(
+        [
+            {"name": "Car", "uniqueId": "a"},
+            {"name": "Truck", "uniqueId": "b"},
+            {"name": "Bus", "uniqueId": "c"},
+            {"name": "Bus", "uniqueId": "c"},
+            {"name": "Nameless"},
+        ],
+        max_concurrency=1,
+    )
+    assert result.succeeded == [existing[0], updated, created]
+    assert result.failed == [
+        BulkFailure({"name": "Bus", "uniqueId": "c"}, result.failed[0].error),
+        BulkFailure({"name": "Nameless"}, result.failed[1].error),
+    ]
+    assert all(isinstance(failure.error, TraccarException) for failure in result.failed)
+    assert [
+        (request["method"], str(request["url"]).split("/api/")[-1])
+        for request in mock_requests._calls  # noqa: SLF001
+    ] == [("GET", "devices"), ("PUT", "devices/2"), ("POST", "devices")]
+    assert json.loads(mock_requests._calls[1]["data"]) == updated  # noqa: SLF001
@@ -0,0 +1,209 @@
+"""Test the response cache."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+import pytest
+
+from pytraccar import ApiClient, CachedResponse, ResponseCache
+
+if TYPE_CHECKING:
+    import aiohttp
+
+    from tests.common import MockedRequests, MockResponse
+
+
+class FakeClock:
+    """Clock that only moves when told to."""
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """Return the current time."""
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    """Return a fake clock."""
+    return FakeClock()
+
+
+@pytest.fixture
+def cached_client(client_session: aiohttp.ClientSession, clock: FakeClock) -> ApiClient:
+    """Return a client with a response cache."""
+    return ApiClient(
+        host="127.0.0.1",
+        token="test",  # noqa: S106
+        client_session=client_session,
+        cache=ResponseCache(ttls={"server": 3600}, default_ttl=30, clock=clock),
+    )
+
+
+@pytest.mark.asyncio
+async def test_cached_endpoints(
+    cached_client: ApiClient, mock_requests: MockedRequests
+) -> None:
+    """Test that cached endpoints are only fetched once."""
+    for _ in range(3):
+        assert (await cached_client.get_server())["id"] == 0
+        assert (await cached_client.get_devices())[0]["id"] == 0
+        assert (await cached_client.get_geofences())[0]["id"] == 0
+    assert mock_requests.called == 3
+
+    await cached_client.get_positions()
+    await cached_client.get_positions()
+    assert mock_requests.called == 5
+
+
+@pytest.mark.asyncio
+async def test_cache_expiry_and_revalidation(
+    cached_client: ApiClient,
+    clock: FakeClock,
+    mock_requests: MockedRequests,
+    mock_response: MockResponse,
+) -> None:
+    """Test that expired responses are revalidated with conditional requests."""
+    mock_response.mock_headers = {
+        "ETag": '"v1"',
+        "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT",
+    }
+    devices = await cached_client.get_devices()
+    assert "If-None-Match" not in mock_requests.last_request["headers"]
+
+    clock.now = 31
+    mock_response.mock_status = 304
+    assert await cached_client.get_devices() == devices
+    assert mock_requests.called == 2
+    assert mock_requests.last_request["headers"]["If-None-Match"] == '"v1"'
+    assert (
+        mock_requests.last_request["headers"]["If-Modified-Since"]
+        == "Mon, 01 Jan 2024 00:00:00 GMT"
+    )
+
+    await cached_client.get_devices()
+    assert mock_requests.called == 2
+
+    clock.now = 62
+    mock_response.mock_status = 200
+    mock_response.mock_headers = None
+    mock_response.mock_data = [{"id": 1}]
+    assert await cached_client.get_devices() == [{"id": 1}]
+
+    clock.now = 93
+    await cached_client.get_devices()
+    assert "If-None-Match" not in mock_requests.last_request["headers"]
+
+
+@pytest.mark.asyncio
+async def test_cache_single_flight(
+    cached_client: ApiClient, mock_requests: MockedRequests
+) -> None:
+    """Test that concurrent requests for the same key are coalesced."""
+    responses = await asyncio.gather(*(cached_client.get_server() for _ in range(10)))
+    assert mock_requests.called == 1
+    assert all(response == responses[0] for response in responses)
+
+
+@pytest.mark.asyncio
+async def test_cache_returns_copies(
+    cached_client: ApiClient, mock_requests: MockedRequests
+) -> None:
+    """Test that changing a cached response does not change the cache."""
+    waiting, loading = await asyncio.gather(
+        cached_client.get_devices(), cached_client.get_devices()
+    )
+    waiting.clear()
+    loading[0]["name"] = "changed"
+    devices = await cached_client.get_devices()
+    assert devices[0]["name"] != "changed"
+    devices.append(devices[0])
+    server = await cached_client.get_server()
+    server["id"] = 1
+    assert (await cached_client.get_server())["id"] == 0
+    assert len(await cached_client.get_devices()) == 1
+    assert mock_requests.called == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_invalidation(
+    cached_client: ApiClient, mock_requests: MockedRequests
+) -> None:
+    """Test explicit invalidation."""
+    await cached_client.get_server()
+    await cached_client.get_devices()
+
+    cached_client.invalidate_cache("devices")
+    await cached_client.get_server()
+    await cached_client.get_devices()
+    assert mock_requests.called == 3
+
+    cached_client.invalidate_cache()
+    await cached_client.get_server()
+    await cached_client.get_devices()
+    assert mock_requests.called == 5
+
+
+@pytest.mark.asyncio
+async def test_invalidate_without_cache(api_client: ApiClient) -> None:
+    """Test that invalidation is a no-op without a cache."""
+    api_client.invalidate_cache()
+
+
+@pytest.mark.asyncio
+async def test_cache_lru_bound() -> None:
+    """Test that the least recently used response is evicted."""
+    cache = ResponseCache(max_entries=2)
+
+    async def _load(_: CachedResponse | None) -> CachedResponse:
+        return CachedResponse(data=object())
+
+    first = await cache.fetch("a", None, _load)
+    await cache.fetch("b", None, _load)
+    assert await cache.fetch("a", None, _load) is first
+    await cache.fetch("c", None, _load)
+    assert len(cache) == 2
+    assert await cache.fetch("a", None, _load) is first
+    assert await cache.fetch("b", [("id", 1)], _load) is not None
+    assert len(cache) == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_invalidated_while_loading() -> None:
+    """Test that responses loaded during invalidation are not stored."""
+    cache = ResponseCache()
+    release = asyncio.Event()
+    loads = 0
+
+    async def _load(_: CachedResponse | None) -> CachedResponse:
+        nonlocal loads
+        loads += 1
+        await release.wait()
+        return CachedResponse(data=loads)
+
+    pending = asyncio.ensure_future(cache.fetch("devices", None, _load))
+    await asyncio.sleep(0)
+    cache.invalidate("devices")
+    refetch = asyncio.ensure_future(cache.fetch("devices", None, _load))
+    await asyncio.sleep(0)
+    release.set()
+    assert await pending == 2
+    assert await refetch == 2
+    assert len(cache) == 1
+    assert loads == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_load_error(
+    cached_client: ApiClient, mock_response: MockResponse
+) -> None:
+    """Test that failed loads are not cached."""
+    mock_response.mock_status = 500
+    with pytest.raises(Exception, match="500"):
+        await cached_client.get_server()
+    mock_response.mock_status = 200
+    assert (await cached_client.get_server())["id"] == 0
@@ -25,3 +25,49 @@ async def test_client_init(client_session: ClientSession) -> None:
         ApiClient(**{**client_params, "ssl": True})._base_url  # noqa: SLF001
         == "https://127.0.0.1:8080/api"
     )
+
+
+@pytest.mark.asyncio
+async def test_client_request_context(client_session: ClientSession) -> None:
+    """Test the precomputed request context."""
+    client = ApiClient(
+        host="127.0.0.1",
+        token="test",  # noqa: S106
+        client_session=client_session,
+        request_timeout=5,
+        endpoint_timeouts={"reports/events": 60},
+    )
+
+    url, headers, timeout = client._request_context("devices")  # noqa: SLF001
+    assert str(url) == "http://127.0.0.1:8082/api/devices"
+    assert headers["Authorization"] == "Bearer test"
+    assert timeout.total == 5
+
+    again_url, again_headers, again_timeout = client._request_context("devices")  # noqa: SLF001
+    assert again_url is url
+    assert again_headers is headers
+    assert again_timeout is timeout
+
+    _, merged_headers, events_timeout = client._request_context(  # noqa: SLF001
+        "reports/events",
+        {"Content-Type": "text/plain"},
+    )
+    assert merged_headers["Content-Type"] == "text/plain"
+    assert merged_headers["Authorization"] == "Bearer test"
+    assert headers["Content-Type"] == "application/json"
+    assert events_timeout.total == 60
+
+
+@pytest.mark.asyncio
+async def test_client_url_cache_is_bounded(client_session: ClientSession) -> None:
+    """Test that the endpoint URL cache does not grow without bounds."""
+    client = ApiClient(
+        host="127.0.0.1",
+        token="test",  # noqa: S106
+        client_session=client_session,
+    )
+    for device_id in range(200):
+        client._request_context(f"devices/{device_id}")  # noqa: SLF001
+    assert len(client._urls) == 128  # noqa: SLF001
+    url, _, _ = client._request_context("devices/199")  # noqa: SLF001
+    assert str(url) == "http://127.0.0.1:8082/api/devices/199"
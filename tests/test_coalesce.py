@@ -0,0 +1,95 @@
+"""Test coalescing of subscription positions."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, NoReturn
+
+import pytest
+from aiohttp import WSMsgType
+
+from pytraccar import ApiClient, PositionCoalescer
+from tests.common import WSMessage, WSMessageHandler, make_position
+
+
+@pytest.mark.asyncio
+async def test_subscription_coalescing(
+    api_client: ApiClient, mock_ws_messages: WSMessageHandler
+) -> None:
+    """Test that only the newest position per device is passed on."""
+    for message in (
+        {"positions": [make_position(1, 1, "2024-01-01T00:00:01Z")]},
+        {
+            "positions": [
+                make_position(3, 1, "2024-01-01T00:00:03Z"),
+                make_position(2, 2, "2024-01-01T00:00:02Z"),
+            ]
+        },
+        {
+            "devices": [{"id": 1}],
+            "positions": [make_position(4, 1, "2024-01-01T00:00:00Z")],
+        },
+        {"events": [{"id": 1}]},
+    ):
+        mock_ws_messages.add(WSMessage(messagetype=WSMsgType.TEXT, json=message))
+    handled = []
+
+    async def _handler(data: Any) -> None:
+        handled.append(data)
+
+    await api_client.subscribe(_handler, coalesce_interval=60)
+
+    assert handled == [
+        {"devices": [{"id": 1}], "events": None, "positions": None},
+        {"devices": None, "events": [{"id": 1}], "positions": None},
+        {
+            "devices": None,
+            "events": None,
+            "positions": [
+                make_position(3, 1, "2024-01-01T00:00:03Z"),
+                make_position(2, 2, "2024-01-01T00:00:02Z"),
+            ],
+        },
+    ]
+
+
+@pytest.mark.asyncio
+async def test_coalescer_interval() -> None:
+    """Test that positions are flushed after the interval."""
+    handled = []
+
+    async def _handler(data: Any) -> None:
+        handled.append(data["positions"])
+
+    async with PositionCoalescer(_handler, interval=0.01) as coalescer:
+        await coalescer(
+            {
+                "devices": None,
+                "events": None,
+                "positions": [make_position(1, 1, "1"), make_position(2, 1, "2")],
+            }
+        )
+        assert coalescer.pending == 1
+        await asyncio.sleep(0.05)
+        assert coalescer.pending == 0
+        await coalescer(
+            {"devices": None, "events": None, "positions": [make_position(3, 1, "3")]}
+        )
+
+    assert handled == [[make_position(2, 1, "2")], [make_position(3, 1, "3")]]
+
+
+@pytest.mark.asyncio
+async def test_coalescer_bad_handler(caplog: pytest.LogCaptureFixture) -> None:
+    """Test that handler errors while flushing are logged."""
+
+    async def _handler(_: Any) -> NoReturn:
+        raise ValueError("Bad handler")
+
+    coalescer = PositionCoalescer(_handler, interval=60)
+    await coalescer(
+        {"devices": None, "events": None, "positions": [make_position(1, 1, "1")]}
+    )
+    await coalescer.close()
+    await coalescer.close()
+    assert "Exception while handling message: ValueError(Bad handler)" in caplog.text
@@ -0,0 +1,194 @@
+"""Test the columnar export."""
+
+from __future__ import annotations
+
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING
+
+import pytest
+
+from pytraccar import (
+    ApiClient,
+    CompactPosition,
+    PositionModel,
+    ReportsEventeModel,
+    TraccarResponseException,
+)
+from tests.common import load_response
+
+if TYPE_CHECKING:
+    import aiohttp
+
+    from tests.common import MockResponse
+
+np = pytest.importorskip("numpy")
+
+from pytraccar.columnar import (  # noqa: E402
+    events_from_json,
+    events_to_arrow,
+    events_to_numpy,
+    parse_timestamps,
+    positions_from_json,
+    positions_to_arrow,
+    positions_to_numpy,
+)
+
+POSITIONS: list[PositionModel] = [
+    {
+        **load_response("positions")[0],
+        "id": 1,
+        "deviceId": 10,
+        "fixTime": "2024-01-01T12:00:00.000+00:00",
+        "latitude": 59.9,
+        "speed": 12.5,
+        "attributes": {"batteryLevel": 80, "ignition": True, "io1": "on"},
+    },
+    {
+        **load_response("positions")[0],
+        "id": 2,
+        "deviceId": 11,
+        "fixTime": "2024-01-01T14:30:00.000+02:00",
+        "altitude": None,
+        "attributes": {},
+    },
+]
+EVENTS: list[ReportsEventeModel] = [
+    {**load_response("reports_events")[0], "geofenceId": None},
+]
+
+
+def test_parse_timestamps() -> None:
+    """Test parsing timestamps in bulk."""
+    parsed = parse_timestamps(
+        [
+            "2019-08-24T14:15:22Z",
+            "2024-01-01T02:00:00.000+02:00",
+            "2023-12-31T18:30:00.000-05:30",
+            "2024-01-01T00:00:00",
+            None,
+        ]
+    )
+    assert parsed.dtype == np.dtype("datetime64[ms]")
+    assert parsed[0] == np.datetime64("2019-08-24T14:15:22")
+    assert (parsed[1:4] == np.datetime64("2024-01-01T00:00:00")).all()
+    assert np.isnat(parsed[4])
+    assert parse_timestamps([]).shape == (0,)
+
+
+def test_positions_to_numpy() -> None:
+    """Test converting positions to a structured array."""
+    array = positions_to_numpy(
+        POSITIONS, attributes=["batteryLevel", "ignition", "io1"]
+    )
+    assert array.dtype.names == (
+        "id",
+        "deviceId",
+        "fixTime",
+        "latitude",
+        "longitude",
+        "speed",
+        "course",
+        "altitude",
+        "accuracy",
+        "valid",
+        "batteryLevel",
+        "ignition",
+        "io1",
+    )
+    assert array["deviceId"].tolist() == [10, 11]
+    assert (
+        array["fixTime"] == np.datetime64("2024-01-01T12:30:00", "ms")
+    ).tolist() == [
+        False,
+        True,
+    ]
+    assert array["speed"][0] == 12.5
+    assert np.isnan(array["altitude"][1])
+    assert array["batteryLevel"][0] == 80
+    assert array["ignition"][0] == 1
+    assert np.isnan(array["io1"]).all()
+    assert np.isnan(array["batteryLevel"][1])
+
+
+def test_compact_positions_to_numpy() -> None:
+    """Test converting compact positions."""
+    array = positions_to_numpy([CompactPosition(item) for item in POSITIONS])
+    assert array["id"].tolist() == [1, 2]
+
+
+def test_events_to_numpy() -> None:
+    """Test converting events to a structured array."""
+    array = events_to_numpy(EVENTS, attributes=["speed"])
+    assert array["type"][0] == "string"
+    assert array["geofenceId"][0] == -1
+    assert array["eventTime"][0] == np.datetime64("2019-08-24T14:15:22")
+    assert np.isnan(array["speed"][0])
+    assert len(events_to_numpy([])) == 0
+
+
+def test_to_arrow() -> None:
+    """Test converting positions and events to record batches."""
+    pa = pytest.importorskip("pyarrow")
+    positions = positions_to_arrow(POSITIONS, attributes=["batteryLevel"])
+    assert positions.num_rows == 2
+    assert positions.schema.field("fixTime").type == pa.timestamp("ms", tz="UTC")
+    assert positions.column("altitude").to_pylist() == [0, None]
+    assert positions.column("batteryLevel").to_pylist() == [80, None]
+    assert positions.column("fixTime").cast(pa.int64()).to_pylist() == [
+        1704110400000,
+        1704112200000,
+    ]
+    events = events_to_arrow(EVENTS)
+    assert events.schema.field("type").type == pa.string()
+    assert events.column("geofenceId").to_pylist() == [None]
+
+
+def test_from_json() -> None:
+    """Test decoding positions and events into chunks of arrays."""
+    chunks = positions_from_json(
+        json.dumps(POSITIONS * 3).encode(), attributes=["batteryLevel"], chunk_size=4
+    )
+    assert [len(chunk) for chunk in chunks] == [4, 2]
+    assert chunks[1]["id"].tolist() == [1, 2]
+    assert chunks[0]["batteryLevel"][0] == 80
+    assert positions_from_json(b"[]") == []
+    (events,) = events_from_json(json.dumps(EVENTS).encode(), loads=json.loads)
+    assert events["type"].tolist() == ["string"]
+
+
+@pytest.mark.asyncio
+async def test_get_reports_events_columnar(
+    client_session: aiohttp.ClientSession, mock_response: MockResponse
+) -> None:
+    """Test fetching events as arrays, decoded in a process pool."""
+    mock_response.mock_data = EVENTS * 3
+    # Forking the multi-threaded test process may deadlock the worker
+    with ProcessPoolExecutor(
+        1, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        client = ApiClient(
+            host="127.0.0.1",
+            token="test",  # noqa: S106
+            client_session=client_session,
+            decode_executor=executor,
+        )
+        chunks = await client.get_reports_events_columnar(
+            devices=[1], attributes=["speed"], chunk_size=2
+        )
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    assert chunks[0]["eventTime"][0] == np.datetime64("2019-08-24T14:15:22")
+
+
+@pytest.mark.asyncio
+async def test_get_reports_events_columnar_inline(
+    api_client: ApiClient, mock_response: MockResponse
+) -> None:
+    """Test fetching events as arrays without a decode executor."""
+    mock_response.mock_data = EVENTS
+    (chunk,) = await api_client.get_reports_events_columnar()
+    assert chunk["id"].tolist() == [EVENTS[0]["id"]]
+    mock_response.mock_status = 500
+    with pytest.raises(TraccarResponseException):
+        await api_client.get_reports_events_columnar()
@@ -0,0 +1,148 @@
+"""Test the compact models."""
+
+from __future__ import annotations
+
+import json
+import sys
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+from pytraccar import (
+    ApiClient,
+    CompactDevice,
+    CompactGeofence,
+    CompactModel,
+    CompactPosition,
+    CompactReportsEvent,
+    CompactServer,
+    DeviceModel,
+    PositionModel,
+)
+from tests.common import load_response
+
+if TYPE_CHECKING:
+    from tests.common import MockedRequests
+
+POSITION: PositionModel = {
+    **load_response("positions")[0],
+    "network": {"radioType": "gsm"},
+    "attributes": {"batteryLevel": 80, "motion": True},
+}
+
+
+def test_compact_position_mapping() -> None:
+    """Test that a compact position reads like the dictionary."""
+    position = CompactPosition(POSITION)
+    assert position == POSITION
+    assert dict(position) == POSITION
+    assert len(position) == len(POSITION)
+    assert position["latitude"] == position.latitude == POSITION["latitude"]
+    assert position["attributes"] == {"batteryLevel": 80, "motion": True}
+    assert position.get("unknown") is None
+    with pytest.raises(KeyError):
+        position["unknown"]
+    assert repr(position).startswith("CompactPosition({'id': 0")
+
+
+def test_compact_model_missing_keys() -> None:
+    """Test that keys missing from the source are None."""
+    device = CompactDevice({"id": 1})
+    assert device.id == 1
+    assert device.name is None
+    assert device.attributes == {}
+    assert device["attributes"] is device.attributes
+
+
+def test_compact_model_slots() -> None:
+    """Test that the compact models have no instance dictionary."""
+    for model in (
+        CompactDevice,
+        CompactGeofence,
+        CompactPosition,
+        CompactReportsEvent,
+        CompactServer,
+    ):
+        assert not hasattr(model({}), "__dict__")
+        assert issubclass(model, CompactModel)
+
+
+def test_from_json_array_lazy() -> None:
+    """Test that attributes and network are decoded on first access."""
+    pytest.importorskip("msgspec")
+    (position,) = CompactPosition.from_json_array(json.dumps([POSITION]).encode())
+    assert isinstance(position._attributes, bytes)  # noqa: SLF001
+    assert isinstance(position._network, bytes)  # noqa: SLF001
+    assert position.attributes == POSITION["attributes"]
+    assert position.network == POSITION["network"]
+    assert isinstance(position._attributes, dict)  # noqa: SLF001
+    assert position == POSITION
+
+
+def test_from_json_array_lazy_loads() -> None:
+    """Test that lazy fields are decoded with the given decoder."""
+    pytest.importorskip("msgspec")
+    decoded: list[str | bytes] = []
+
+    def _loads(data: str | bytes) -> Any:
+        decoded.append(data)
+        return json.loads(data)
+
+    (position,) = CompactPosition.from_json_array(
+        json.dumps([POSITION]).encode(), _loads
+    )
+    assert position.attributes == POSITION["attributes"]
+    assert decoded == [json.dumps(POSITION["attributes"]).encode()]
+
+
+def test_from_json_array_missing_lazy_field() -> None:
+    """Test a missing lazily decoded field."""
+    device: DeviceModel = load_response("devices")[0]
+    body = json.dumps([{k: v for k, v in device.items() if k != "attributes"}])
+    (compact,) = CompactDevice.from_json_array(body.encode())
+    assert compact.attributes == {}
+
+
+def test_from_json_array_without_msgspec(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test decoding with the fallback decoder when msgspec is missing."""
+    monkeypatch.setitem(sys.modules, "msgspec", None)
+    monkeypatch.setattr(CompactGeofence, "_decoder", None)
+    geofences = CompactGeofence.from_json_array(
+        json.dumps(load_response("geofences")).encode(), json.loads
+    )
+    assert CompactGeofence._decoder is False  # noqa: SLF001
+    assert isinstance(geofences[0]._attributes, dict)  # noqa: SLF001
+    assert geofences == load_response("geofences")
+
+
+@pytest.mark.asyncio
+async def test_compact_api_calls(api_client: ApiClient) -> None:
+    """Test requesting compact models from the API."""
+    server = await api_client.get_server(compact=True)
+    assert isinstance(server, CompactServer)
+    assert server == load_response("server")
+
+    for compact, response, name in (
+        (await api_client.get_devices(compact=True), CompactDevice, "devices"),
+        (await api_client.get_geofences(compact=True), CompactGeofence, "geofences"),
+        (await api_client.get_positions(compact=True), CompactPosition, "positions"),
+        (
+            await api_client.get_reports_events(compact=True),
+            CompactReportsEvent,
+            "reports_events",
+        ),
+    ):
+        assert all(isinstance(item, response) for item in compact)
+        assert compact == load_response(name)
+
+
+@pytest.mark.asyncio
+async def test_compact_reports_events_split(
+    api_client: ApiClient, mock_requests: MockedRequests
+) -> None:
+    """Test compact events from a split report."""
+    events = await api_client.get_reports_events(
+        devices=[1, 2], device_batch_size=1, compact=True
+    )
+    assert mock_requests.called == 2
+    assert all(isinstance(event, CompactReportsEvent) for event in events)
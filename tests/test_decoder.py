@@ -0,0 +1,123 @@
+"""Test JSON decoder selection."""
+
+from __future__ import annotations
+
+import json
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any
+from unittest.mock import MagicMock
+
+import aiohttp
+import pytest
+from aiohttp import WSMsgType
+
+from pytraccar import ApiClient, Observer
+from pytraccar.decoder import default_loads
+
+if TYPE_CHECKING:
+    from tests.common import WSMessageHandler
+
+
+def _fake_orjson_loads(_: Any) -> Any:
+    return "orjson"
+
+
+def _fake_msgspec_decode(_: Any) -> Any:
+    return "msgspec"
+
+
+def test_default_loads_prefers_orjson(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that orjson is preferred when installed."""
+    monkeypatch.setitem(
+        sys.modules, "orjson", SimpleNamespace(loads=_fake_orjson_loads)
+    )
+    assert default_loads() is _fake_orjson_loads
+
+
+def test_default_loads_msgspec(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that msgspec is used when orjson is not installed."""
+    monkeypatch.setitem(sys.modules, "orjson", None)
+    monkeypatch.setitem(
+        sys.modules,
+        "msgspec",
+        SimpleNamespace(json=SimpleNamespace(decode=_fake_msgspec_decode)),
+    )
+    assert default_loads() is _fake_msgspec_decode
+
+
+def test_default_loads_stdlib(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test falling back to the standard library."""
+    monkeypatch.setitem(sys.modules, "orjson", None)
+    monkeypatch.setitem(sys.modules, "msgspec", None)
+    assert default_loads() is json.loads
+
+
+@pytest.mark.asyncio
+async def test_client_json_loads(
+    client_session: aiohttp.ClientSession, mock_ws_messages: WSMessageHandler
+) -> None:
+    """Test that the client decodes REST and WebSocket payloads with json_loads."""
+    decoded = []
+
+    def _loads(data: str | bytes) -> Any:
+        decoded.append(type(data))
+        return json.loads(data)
+
+    client = ApiClient(
+        host="127.0.0.1",
+        token="test",  # noqa: S106
+        client_session=client_session,
+        json_loads=_loads,
+    )
+    assert (await client.get_server())["id"] == 0
+    assert decoded == [bytes]
+
+    class _TextMessage:
+        type = WSMsgType.TEXT
+
+        def json(self, *, loads: Any) -> Any:
+            return loads('{"devices": []}')
+
+    mock_ws_messages.add(_TextMessage())
+    handled = []
+
+    async def _handler(data: Any) -> None:
+        handled.append(data)
+
+    await client.subscribe(_handler)
+    assert handled == [{"devices": [], "events": None, "positions": None}]
+    assert str in decoded
+
+
+@pytest.mark.asyncio
+async def test_client_decode_executor(client_session: aiohttp.ClientSession) -> None:
+    """Test decoding large bodies in the decode executor."""
+    observer = MagicMock(spec=Observer)
+    threads = []
+
+    def _loads(data: str | bytes) -> Any:
+        threads.append(threading.current_thread())
+        return json.loads(data)
+
+    with ThreadPoolExecutor(1) as executor:
+        client = ApiClient(
+            host="127.0.0.1",
+            token="test",  # noqa: S106
+            client_session=client_session,
+            json_loads=_loads,
+            decode_executor=executor,
+            offload_threshold=0,
+        )
+        assert (await client.get_server())["id"] == 0
+        assert (await client.get_positions(compact=True))[0].id == 0
+        client._observer = observer  # noqa: SLF001
+        assert (await client.get_devices())[0]["id"] == 0
+        client._offload_threshold = 10**9  # noqa: SLF001
+        await client.get_devices()
+    # Compact positions are decoded by msgspec when installed, not json_loads
+    assert threads[-1] is threading.main_thread()
+    assert threading.main_thread() not in threads[:-1]
+    assert observer.on_response.call_count == 2
@@ -0,0 +1,200 @@
+"""Test the subscription dispatcher."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, NoReturn
+
+import pytest
+from aiohttp import WSMsgType
+
+from pytraccar import ApiClient, Dispatcher, OverflowPolicy
+from tests.common import WSMessage, WSMessageHandler, make_position
+
+
+def _message(**data: Any) -> dict[str, Any]:
+    return {"devices": None, "events": None, "positions": None, **data}
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_with_subscription(
+    api_client: ApiClient, mock_ws_messages: WSMessageHandler
+) -> None:
+    """Test handling subscription messages through the dispatcher."""
+    handled = []
+
+    async def _handler(data: Any) -> None:
+        handled.append(data)
+
+    for event_id in range(5):
+        mock_ws_messages.add(
+            WSMessage(messagetype=WSMsgType.TEXT, json={"events": [{"id": event_id}]})
+        )
+
+    async with Dispatcher(_handler) as dispatcher:
+        await api_client.subscribe(dispatcher)
+
+    assert handled == [_message(events=[{"id": event_id}]) for event_id in range(5)]
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_starts_lazily() -> None:
+    """Test that calling the dispatcher starts the workers."""
+    handled = []
+
+    async def _handler(data: Any) -> None:
+        handled.append(data)
+
+    dispatcher = Dispatcher(_handler, workers=2)
+    await dispatcher(_message())
+    await dispatcher.close()
+    assert handled == [_message()]
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_block() -> None:
+    """Test that a full queue blocks the producer."""
+    release = asyncio.Event()
+    handled = []
+
+    async def _handler(data: Any) -> None:
+        await release.wait()
+        handled.append(data)
+
+    async with Dispatcher(_handler, max_queue_size=1) as dispatcher:
+        await dispatcher(_message(events=[1]))
+        await asyncio.sleep(0)
+        await dispatcher(_message(events=[2]))
+        blocked = asyncio.create_task(dispatcher(_message(events=[3])))
+        await asyncio.sleep(0)
+        assert not blocked.done()
+        assert dispatcher.queue_size == 1
+        release.set()
+        await blocked
+
+    assert [data["events"] for data in handled] == [[1], [2], [3]]
+    assert dispatcher.dropped == 0
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_drop_oldest() -> None:
+    """Test dropping the oldest message on overflow."""
+    release = asyncio.Event()
+    handled = []
+
+    async def _handler(data: Any) -> None:
+        await release.wait()
+        handled.append(data)
+
+    async with Dispatcher(
+        _handler, max_queue_size=2, overflow=OverflowPolicy.DROP_OLDEST
+    ) as dispatcher:
+        await dispatcher(_message(events=[0]))
+        await asyncio.sleep(0)
+        for event in range(1, 5):
+            await dispatcher(_message(events=[event]))
+        release.set()
+
+    assert [data["events"] for data in handled] == [[0], [3], [4]]
+    assert dispatcher.dropped == 2
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_coalesce() -> None:
+    """Test coalescing into the newest message on overflow."""
+    release = asyncio.Event()
+    handled = []
+
+    async def _handler(data: Any) -> None:
+        await release.wait()
+        handled.append(data)
+
+    async with Dispatcher(
+        _handler, max_queue_size=1, overflow=OverflowPolicy.COALESCE
+    ) as dispatcher:
+        await dispatcher(_message())
+        await asyncio.sleep(0)
+        await dispatcher(
+            _message(positions=[make_position(1, 1, "2024-01-01T00:00:01Z")])
+        )
+        await dispatcher(
+            _message(
+                positions=[
+                    make_position(2, 1, "2024-01-01T00:00:02Z"),
+                    make_position(3, 2, "2024-01-01T00:00:03Z"),
+                ]
+            )
+        )
+        await dispatcher(
+            _message(
+                devices=[{"id": 1}],
+                events=[{"id": 9}],
+                positions=[make_position(4, 1, "2024-01-01T00:00:04Z")],
+            )
+        )
+        release.set()
+
+    assert handled[1] == _message(
+        devices=[{"id": 1}],
+        events=[{"id": 9}],
+        positions=[
+            make_position(4, 1, "2024-01-01T00:00:04Z"),
+            make_position(3, 2, "2024-01-01T00:00:03Z"),
+        ],
+    )
+    assert dispatcher.dropped == 2
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_batching() -> None:
+    """Test merging queued messages into batches."""
+    handled = []
+
+    async def _handler(data: Any) -> None:
+        handled.append(data)
+
+    async with Dispatcher(_handler, batch_size=3, batch_interval=0.01) as dispatcher:
+        await dispatcher(_message(events=[1]))
+        await dispatcher(_message(events=[2]))
+        await asyncio.sleep(0.05)
+        for event in range(3, 7):
+            await dispatcher(_message(events=[event]))
+
+    assert [data["events"] for data in handled] == [[1, 2], [3, 4, 5], [6]]
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_workers() -> None:
+    """Test that workers run the callback concurrently."""
+    running = 0
+    peak = 0
+
+    async def _handler(_: Any) -> None:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    async with Dispatcher(_handler, workers=3) as dispatcher:
+        for _ in range(6):
+            await dispatcher(_message())
+
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_bad_handler(caplog: pytest.LogCaptureFixture) -> None:
+    """Test that handler errors are logged and do not stop the worker."""
+    handled = []
+
+    async def _handler(data: Any) -> NoReturn:
+        handled.append(data)
+        raise ValueError("Bad handler")
+
+    async with Dispatcher(_handler) as dispatcher:
+        await dispatcher(_message())
+        await dispatcher(_message())
+
+    assert len(handled) == 2
+    assert "Exception while handling message: ValueError(Bad handler)" in caplog.text
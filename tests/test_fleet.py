@@ -0,0 +1,127 @@
+"""Test the fleet state."""
+
+from __future__ import annotations
+
+import math
+from typing import Any
+
+import pytest
+from aiohttp import WSMsgType
+
+from pytraccar import ApiClient, Coordinates, FleetState
+from tests.common import WSMessage, WSMessageHandler, load_response, make_position
+
+MOTION = {"longitude": 10.0, "speed": 5.0, "course": 90.0}
+
+
+def _device(device_id: int, unique_id: str, group_id: int) -> dict[str, Any]:
+    return {"id": device_id, "uniqueId": unique_id, "groupId": group_id}
+
+
+@pytest.mark.asyncio
+async def test_fleet_sync(api_client: ApiClient) -> None:
+    """Test seeding the fleet state from the API."""
+    fleet = FleetState()
+    fleet.update_devices([_device(99, "stale", 1)])
+    await fleet.sync(api_client)
+
+    device = load_response("devices")[0]
+    assert len(fleet) == 1
+    assert 0 in fleet
+    assert 99 not in fleet
+    assert fleet.device(0) == device
+    assert fleet.device_by_unique_id(device["uniqueId"]) == device
+    assert fleet.devices_in_group(device["groupId"]) == [device]
+    assert fleet.latest_position(0) == load_response("positions")[0]
+    assert fleet.coordinates(0) == Coordinates(0, 0, 0, 0)
+
+
+@pytest.mark.asyncio
+async def test_fleet_subscription_updates(
+    api_client: ApiClient, mock_ws_messages: WSMessageHandler
+) -> None:
+    """Test updating the fleet state from subscription messages."""
+    fleet = FleetState()
+    mock_ws_messages.add(
+        WSMessage(
+            messagetype=WSMsgType.TEXT,
+            json={
+                "devices": [_device(1, "a", 10), _device(2, "b", 10)],
+                "positions": [
+                    make_position(
+                        0, 1, "2024-01-01T00:00:00.000+00:00", latitude=1.0, **MOTION
+                    )
+                ],
+            },
+        )
+    )
+    mock_ws_messages.add(
+        WSMessage(
+            messagetype=WSMsgType.TEXT,
+            json={
+                "devices": [_device(2, "c", 20)],
+                "events": [{"id": 5, "deviceId": 2, "type": "deviceOnline"}],
+                "positions": [
+                    make_position(
+                        0, 1, "2024-01-01T00:01:00.000+00:00", latitude=2.0, **MOTION
+                    ),
+                    make_position(
+                        0, 1, "2023-12-31T23:59:00.000+00:00", latitude=3.0, **MOTION
+                    ),
+                ],
+            },
+        )
+    )
+    await api_client.subscribe(fleet.handle)
+
+    assert fleet.devices_in_group(10) == [_device(1, "a", 10)]
+    assert fleet.devices_in_group(20) == [_device(2, "c", 20)]
+    assert fleet.device_by_unique_id("b") is None
+    assert fleet.device_by_unique_id("c") == _device(2, "c", 20)
+    assert fleet.coordinates(1) == Coordinates(2.0, 10.0, 5.0, 90.0)
+    assert fleet.latest_position(1)["latitude"] == 2.0
+    assert fleet.latest_event(2)["id"] == 5
+    assert fleet.coordinates(2) is None
+    assert fleet.coordinates(3) is None
+
+
+def test_fleet_remove_device() -> None:
+    """Test removing a device."""
+    fleet = FleetState()
+    fleet.update_devices([_device(1, "a", 10)])
+    fleet.update_positions(
+        [make_position(0, 1, "2024-01-01T00:00:00Z", latitude=1.0, **MOTION)]
+    )
+    slot = fleet.slot(1)
+
+    fleet.remove_device(1)
+    fleet.remove_device(1)
+    assert fleet.device(1) is None
+    assert fleet.device_by_unique_id("a") is None
+    assert fleet.devices_in_group(10) == []
+    assert fleet.latest_position(1) is None
+    assert fleet.coordinates(1) is None
+    assert math.isnan(fleet.latitudes[slot])
+
+    fleet.update_positions(
+        [make_position(0, 1, "2023-01-01T00:00:00Z", latitude=4.0, **MOTION)]
+    )
+    assert fleet.slot(1) == slot
+    assert fleet.coordinates(1) == Coordinates(4.0, 10.0, 5.0, 90.0)
+
+
+def test_fleet_compact_store() -> None:
+    """Test the array backed coordinate store."""
+    fleet = FleetState(keep_positions=False)
+    fleet.update_positions(
+        [
+            make_position(0, 7, "2024-01-01T00:00:00Z", latitude=1.0, **MOTION),
+            make_position(0, 8, "2024-01-01T00:00:00Z", latitude=2.0, **MOTION),
+        ]
+    )
+    assert fleet.latest_position(7) is None
+    assert list(fleet.latitudes) == [1.0, 2.0]
+    assert list(fleet.longitudes) == [10.0, 10.0]
+    assert list(fleet.speeds) == [5.0, 5.0]
+    assert list(fleet.courses) == [90.0, 90.0]
+    assert fleet.latitudes[fleet.slot(8)] == 2.0
@@ -0,0 +1,107 @@
+"""Test the geofence engine."""
+
+from __future__ import annotations
+
+import pytest
+
+from pytraccar import GeofenceIndex, GeofenceModel, GeofenceTransition
+from pytraccar.exceptions import TraccarException
+from pytraccar.geofencing import Circle, Polygon, Polyline, parse_area
+
+GEOFENCES: list[GeofenceModel] = [
+    {
+        "id": 1,
+        "name": "Office",
+        "description": None,
+        "area": "CIRCLE (59.91 10.75, 1000)",
+        "calendarId": "0",
+        "attributes": {},
+    },
+    {
+        "id": 2,
+        "name": "Region",
+        "description": None,
+        "area": "POLYGON ((59 10, 59 11, 60 11, 60 10, 59 10))",
+        "calendarId": "0",
+        "attributes": {},
+    },
+    {
+        "id": 3,
+        "name": "Road",
+        "description": None,
+        "area": "LINESTRING (59.5 10.5, 59.5 10.6, 59.5 10.6)",
+        "calendarId": "0",
+        "attributes": {"polylineDistance": 100},
+    },
+]
+
+
+@pytest.mark.parametrize(
+    ("area", "shape"),
+    [
+        ("CIRCLE (59.91 10.75, 500)", Circle(59.91, 10.75, 500)),
+        (
+            "POLYGON((1 2, 3 4, 5 -6.5, 1 2), (0 0, 1 1, 1 0))",
+            Polygon(((1, 2), (3, 4), (5, -6.5), (1, 2))),
+        ),
+        ("linestring (1 2, 3 4)", Polyline(((1, 2), (3, 4)), 25)),
+    ],
+)
+def test_parse_area(area: str, shape: Circle | Polygon | Polyline) -> None:
+    """Test parsing geofence areas."""
+    assert parse_area(area) == shape
+
+
+@pytest.mark.parametrize(
+    "area",
+    ["CIRCLE (1 2)", "POLYGON ((1 2, 3 4))", "LINESTRING (1 2, 3)", "POINT (1 2)"],
+)
+def test_parse_area_invalid(area: str) -> None:
+    """Test parsing malformed and unsupported areas."""
+    with pytest.raises(TraccarException, match="Unsupported geofence area"):
+        parse_area(area)
+
+
+def test_geofence_ids() -> None:
+    """Test finding the geofences of positions."""
+    pytest.importorskip("numpy")
+    index = GeofenceIndex(GEOFENCES)
+    assert len(index) == 3
+    assert index.geofence_ids(
+        [59.91, 59.5005, 59.5015, 58, 59.91, 59.2],
+        [10.75, 10.55, 10.55, 10, 10.9, 10.2],
+    ) == [[1, 2], [2, 3], [2], [], [2], [2]]
+    assert index.geofence_ids([], []) == []
+
+
+def test_matches_arrays() -> None:
+    """Test the raw matches."""
+    np = pytest.importorskip("numpy")
+    index = GeofenceIndex(GEOFENCES, cell_size=0.01)
+    positions, geofence_ids = index.matches(np.array([58.0, 59.91]), [10.0, 10.75])
+    assert positions.tolist() == [1, 1]
+    assert geofence_ids.tolist() == [1, 2]
+
+
+def test_transitions() -> None:
+    """Test detecting geofence entries and exits."""
+    pytest.importorskip("numpy")
+    index = GeofenceIndex(GEOFENCES)
+    assert index.transitions(
+        [1, 1, 2, 1, 2, 1],
+        [59.91, 59.2, 59.91, 58, 59.91, 59.91],
+        [10.75, 10.2, 10.75, 10, 10.75, 10.75],
+    ) == [
+        GeofenceTransition(1, 1, 1, entered=False),
+        GeofenceTransition(3, 1, 2, entered=False),
+        GeofenceTransition(5, 1, 1, entered=True),
+        GeofenceTransition(5, 1, 2, entered=True),
+    ]
+
+
+def test_empty_index() -> None:
+    """Test an index without geofences."""
+    pytest.importorskip("numpy")
+    index = GeofenceIndex([])
+    assert index.geofence_ids([1.0], [2.0]) == [[]]
+    assert index.transitions([1, 1], [1.0, 2.0], [1.0, 2.0]) == []
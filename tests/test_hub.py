@@ -0,0 +1,159 @@
+"""Test the subscription hub."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, NoReturn
+
+import pytest
+from aiohttp import WSMsgType
+
+from pytraccar import (
+    ApiClient,
+    OverflowPolicy,
+    SubscriptionHub,
+    TraccarConnectionException,
+)
+from tests.common import WSMessage, make_position
+
+if TYPE_CHECKING:
+    from pytraccar import HubSubscription, SubscriptionData
+    from tests.common import MockResponse, WSMessageHandler
+
+
+def _event(device_id: int, event_type: str) -> dict[str, Any]:
+    return {"id": 0, "deviceId": device_id, "type": event_type}
+
+
+async def _messages(subscription: HubSubscription) -> list[SubscriptionData]:
+    return [message async for message in subscription]
+
+
+@pytest.mark.asyncio
+async def test_hub_routes_messages(
+    api_client: ApiClient,
+    mock_response: MockResponse,
+    mock_ws_messages: WSMessageHandler,
+) -> None:
+    """Test that every subscriber gets the items matching its filters."""
+    mock_response.mock_data = [{"id": 1, "groupId": 0}, {"id": 2, "groupId": 7}]
+    frames = [
+        {
+            "positions": [
+                make_position(10, 1),
+                make_position(20, 2),
+                make_position(30, 3),
+            ]
+        },
+        {
+            "events": [
+                _event(1, "alarm"),
+                _event(1, "deviceOnline"),
+                _event(2, "alarm"),
+            ]
+        },
+        {"devices": [{"id": 3, "groupId": 7}]},
+        {"positions": [make_position(31, 3)]},
+    ]
+    for frame in frames:
+        mock_ws_messages.add(WSMessage(WSMsgType.TEXT, frame))
+
+    hub = SubscriptionHub(api_client)
+    everything = hub.subscribe()
+    device = hub.subscribe(devices=[1])
+    group = hub.subscribe(groups=[7])
+    alarms = hub.subscribe(devices=[1], event_types=["alarm", "sos"])
+    latest = hub.subscribe(max_buffer_size=1)
+    coalesced = hub.subscribe(max_buffer_size=1, overflow=OverflowPolicy.COALESCE)
+    closed = hub.subscribe(devices=[1])
+    closed.close()
+    async with hub:
+        await hub.start()
+        assert len(await _messages(everything)) == 4
+
+    assert await _messages(device) == [
+        {"devices": None, "positions": [make_position(10, 1)], "events": None},
+        {
+            "devices": None,
+            "positions": None,
+            "events": [_event(1, "alarm"), _event(1, "deviceOnline")],
+        },
+    ]
+    assert await _messages(group) == [
+        {"devices": None, "positions": [make_position(20, 2)], "events": None},
+        {"devices": None, "positions": None, "events": [_event(2, "alarm")]},
+        {"devices": [{"id": 3, "groupId": 7}], "positions": None, "events": None},
+        {"devices": None, "positions": [make_position(31, 3)], "events": None},
+    ]
+    assert await _messages(alarms) == [
+        {"devices": None, "positions": None, "events": [_event(1, "alarm")]}
+    ]
+    assert latest.buffer_size == 1
+    assert await _messages(latest) == [
+        {"devices": None, "positions": [make_position(31, 3)], "events": None}
+    ]
+    assert latest.dropped == 3
+    (merged,) = await _messages(coalesced)
+    assert merged["devices"] == [{"id": 3, "groupId": 7}]
+    assert merged["positions"] == [
+        make_position(10, 1),
+        make_position(20, 2),
+        make_position(31, 3),
+    ]
+    assert len(merged["events"] or ()) == 3
+    assert coalesced.dropped == 3
+    assert await _messages(closed) == []
+
+    # Subscribing to a finished hub ends at once
+    async with hub.subscribe() as late:
+        assert await _messages(late) == []
+
+
+@pytest.mark.asyncio
+async def test_hub_error(
+    api_client: ApiClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that subscribers get the error of the subscription."""
+
+    async def _fail() -> NoReturn:
+        raise TraccarConnectionException("Session failed")
+
+    monkeypatch.setattr(api_client, "_open_session", _fail)
+    async with SubscriptionHub(api_client) as hub:
+        subscription = hub.subscribe()
+        with pytest.raises(TraccarConnectionException, match="Session failed"):
+            await _messages(subscription)
+        # Leaving a filtered subscription after the hub ended keeps its error
+        with pytest.raises(TraccarConnectionException, match="Session failed"):
+            async with hub.subscribe(
+                devices=[1], groups=[2], event_types=["alarm"]
+            ) as late:
+                await _messages(late)
+        subscription.close()
+
+
+@pytest.mark.asyncio
+async def test_hub_close_after_error(
+    api_client: ApiClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test closing subscribers that the failed hub already removed."""
+
+    async def _fail() -> NoReturn:
+        raise TraccarConnectionException("Session failed")
+
+    monkeypatch.setattr(api_client, "_open_session", _fail)
+    hub = SubscriptionHub(api_client)
+    subscription = hub.subscribe(devices=[1], groups=[2], event_types=["alarm"])
+    await hub.start()
+    with pytest.raises(TraccarConnectionException, match="Session failed"):
+        async with subscription:
+            await _messages(subscription)
+    await hub.close()
+
+
+@pytest.mark.asyncio
+async def test_hub_options(api_client: ApiClient) -> None:
+    """Test that subscribers cannot block the hub and closing an idle hub."""
+    hub = SubscriptionHub(api_client)
+    with pytest.raises(ValueError, match="cannot block"):
+        hub.subscribe(overflow=OverflowPolicy.BLOCK)
+    await hub.close()
@@ -0,0 +1,268 @@
+"""Test the instrumentation hooks."""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import aiohttp
+import pytest
+from aiohttp import WSMsgType
+
+from pytraccar import (
+    ApiClient,
+    Dispatcher,
+    ExponentialBackoff,
+    Observer,
+    OpenTelemetryObserver,
+    PrometheusObserver,
+    RequestPolicy,
+    ResponseCache,
+    SubscriptionStatus,
+    TraccarConnectionException,
+    TraccarException,
+)
+from tests.common import WSMessage
+
+if TYPE_CHECKING:
+    from pytraccar.models import SubscriptionData
+    from tests.common import MockResponse, WSMessageHandler
+
+
+class RecordingObserver(Observer):
+    """Observer recording the calls of some hooks."""
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.calls: list[tuple[str, dict[str, Any]]] = []
+
+    def on_request(self, **kwargs: Any) -> None:
+        """Record."""
+        self.calls.append(("request", kwargs))
+
+    def on_retry(self, **kwargs: Any) -> None:
+        """Record."""
+        self.calls.append(("retry", kwargs))
+
+    def on_response(self, **kwargs: Any) -> None:
+        """Record."""
+        self.calls.append(("response", kwargs))
+
+    def on_message(self, **kwargs: Any) -> None:
+        """Record."""
+        self.calls.append(("message", kwargs))
+
+    def on_callback(self, **kwargs: Any) -> None:
+        """Record."""
+        self.calls.append(("callback", kwargs))
+
+    def on_subscription_status(self, **kwargs: Any) -> None:
+        """Record."""
+        self.calls.append(("status", kwargs))
+
+    def hooks(self) -> list[str]:
+        """Return the names of the called hooks."""
+        return [hook for hook, _ in self.calls]
+
+
+def _client(
+    client_session: aiohttp.ClientSession, observer: Observer, **kwargs: Any
+) -> ApiClient:
+    return ApiClient(
+        host="127.0.0.1",
+        token="test",  # noqa: S106
+        client_session=client_session,
+        observer=observer,
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_observe_requests(
+    client_session: aiohttp.ClientSession, mock_response: MockResponse
+) -> None:
+    """Test measuring requests and responses."""
+    observer = RecordingObserver()
+    client = _client(client_session, observer, cache=ResponseCache())
+    await client.get_devices()
+    await client.get_positions(compact=True)
+    assert observer.hooks() == ["request", "response"] * 2
+    request, response = observer.calls[0][1], observer.calls[1][1]
+    assert request["method"] == "GET"
+    assert request["endpoint"] == "devices"
+    assert request["status"] == 200
+    assert request["duration"] >= 0
+    assert response["endpoint"] == "devices"
+    assert response["size"] > 0
+    assert response["decode_duration"] >= 0
+    assert observer.calls[3][1]["endpoint"] == "positions"
+    # Requests for single entities share the label of their route
+    mock_response.mock_status = 204
+    await client.delete_device(12)
+    assert observer.calls[-1][1]["endpoint"] == "devices/{id}"
+
+
+@pytest.mark.asyncio
+async def test_observe_failures(
+    client_session: aiohttp.ClientSession, mock_response: MockResponse
+) -> None:
+    """Test measuring failed requests and retries."""
+    observer = RecordingObserver()
+    client = _client(
+        client_session,
+        observer,
+        request_policy=RequestPolicy(
+            retry=ExponentialBackoff(initial=1, jitter=0, max_attempts=1)
+        ),
+    )
+    mock_response.mock_status = 503
+
+    async def _recover(_: float) -> None:
+        mock_response.mock_status = 200
+
+    with patch("pytraccar.client.asyncio.sleep", side_effect=_recover):
+        await client.get_server()
+    assert observer.hooks() == ["retry", "request", "response"]
+    assert observer.calls[0][1] == {
+        "method": "GET",
+        "endpoint": "server",
+        "attempt": 1,
+        "delay": 1,
+    }
+
+    observer.calls.clear()
+    mock_response.mock_status = 500
+    with pytest.raises(TraccarException):
+        await client.get_server()
+    client_session._request = AsyncMock(side_effect=aiohttp.ClientError)  # noqa: SLF001
+    with pytest.raises(TraccarConnectionException):
+        await client._call_api("session?token=test", "POST")  # noqa: SLF001
+    assert [call["status"] for _, call in observer.calls] == [500, None]
+    assert observer.calls[1][1]["endpoint"] == "session"
+
+
+@pytest.mark.asyncio
+async def test_observe_subscription_message_bytes(
+    client_session: aiohttp.ClientSession,
+    mock_ws_messages: WSMessageHandler,
+) -> None:
+    """Test that message sizes are measured in bytes."""
+    observer = RecordingObserver()
+    client = _client(client_session, observer)
+    message = {"devices": [{"id": 1, "name": "Bïl 🚗"}]}
+    mock_ws_messages.add(WSMessage(messagetype=WSMsgType.TEXT, json=message))
+
+    async def _handler(_: SubscriptionData) -> None:
+        pass
+
+    await client.subscribe(_handler)
+    messages = [call for hook, call in observer.calls if hook == "message"]
+    size = len(json.dumps(message, ensure_ascii=False).encode())
+    assert messages == [{"size": size}]
+    assert size > len(json.dumps(message, ensure_ascii=False))
+
+
+@pytest.mark.asyncio
+async def test_observe_subscription(
+    client_session: aiohttp.ClientSession,
+    mock_ws_messages: WSMessageHandler,
+) -> None:
+    """Test measuring messages, callbacks and status changes."""
+    observer = RecordingObserver()
+    client = _client(client_session, observer)
+    handled: list[SubscriptionData] = []
+
+    async def _handler(data: SubscriptionData) -> None:
+        handled.append(data)
+
+    for callback in (_handler, Dispatcher(_handler)):
+        mock_ws_messages.add(
+            WSMessage(messagetype=WSMsgType.TEXT, json={"positions": []})
+        )
+        await client.subscribe(callback)
+        if isinstance(callback, Dispatcher):
+            await callback.close()
+
+    messages = [call for hook, call in observer.calls if hook == "message"]
+    assert messages == [{"size": len('{"positions": []}')}] * 2
+    callbacks = [call for hook, call in observer.calls if hook == "callback"]
+    assert [call["queue_size"] for call in callbacks] == [None, 1]
+    statuses = [call["status"] for hook, call in observer.calls if hook == "status"]
+    assert statuses == [SubscriptionStatus.CONNECTING, SubscriptionStatus.CONNECTED] * 2
+    assert len(handled) == 2
+
+
+def test_observer_defaults() -> None:
+    """Test that the default hooks do nothing."""
+    observer = Observer()
+    observer.on_request(method="GET", endpoint="server", status=200, duration=0)
+    observer.on_retry(method="GET", endpoint="server", attempt=1, delay=0)
+    observer.on_response(endpoint="server", size=0, decode_duration=0)
+    observer.on_message(size=0)
+    observer.on_callback(duration=0, queue_size=None)
+    observer.on_subscription_status(
+        previous=SubscriptionStatus.DISCONNECTED, status=SubscriptionStatus.CONNECTING
+    )
+
+
+def _observe_all(observer: Observer) -> None:
+    observer.on_request(method="GET", endpoint="devices", status=200, duration=0.2)
+    observer.on_request(method="GET", endpoint="devices", status=None, duration=1)
+    observer.on_retry(method="GET", endpoint="devices", attempt=1, delay=1)
+    observer.on_response(endpoint="devices", size=2048, decode_duration=0.01)
+    observer.on_message(size=100)
+    observer.on_callback(duration=0.05, queue_size=None)
+    observer.on_callback(duration=0.05, queue_size=7)
+    observer.on_subscription_status(
+        previous=SubscriptionStatus.CONNECTING, status=SubscriptionStatus.CONNECTED
+    )
+
+
+def test_prometheus_observer() -> None:
+    """Test recording Prometheus metrics."""
+    prometheus_client = pytest.importorskip("prometheus_client")
+    registry = prometheus_client.CollectorRegistry()
+    metrics = PrometheusObserver(registry=registry)
+    _observe_all(metrics.labels(server="eu"))
+
+    def _value(name: str, **labels: str) -> float | None:
+        return registry.get_sample_value(
+            f"pytraccar_{name}", {"server": "eu", **labels}
+        )
+
+    request = {"method": "GET", "endpoint": "devices"}
+    assert _value("request_duration_seconds_count", **request, status="200") == 1
+    assert _value("request_duration_seconds_count", **request, status="error") == 1
+    assert _value("request_retries_total", **request) == 1
+    assert _value("response_size_bytes_sum", endpoint="devices") == 2048
+    assert _value("response_decode_seconds_count", endpoint="devices") == 1
+    assert _value("websocket_message_size_bytes_sum") == 100
+    assert _value("callback_duration_seconds_count") == 2
+    assert _value("dispatcher_queue_size") == 7
+    assert _value("subscription_transitions_total", status="connected") == 1
+
+
+def test_opentelemetry_observer() -> None:
+    """Test recording OpenTelemetry metrics."""
+    meter = MagicMock()
+    _observe_all(OpenTelemetryObserver(meter=meter).labels(server="eu"))
+    assert meter.create_histogram.call_count == 6
+    assert meter.create_counter.call_count == 2
+    histogram = meter.create_histogram.return_value
+    counter = meter.create_counter.return_value
+    assert histogram.record.call_count == 8
+    histogram.record.assert_any_call(
+        0.2,
+        {
+            "server": "eu",
+            "http.request.method": "GET",
+            "endpoint": "devices",
+            "http.response.status_code": 200,
+        },
+    )
+    histogram.record.assert_any_call(7, {"server": "eu"})
+    counter.add.assert_any_call(1, {"server": "eu", "status": "connected"})
+
+    pytest.importorskip("opentelemetry")
+    _observe_all(OpenTelemetryObserver())
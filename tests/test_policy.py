@@ -0,0 +1,272 @@
+"""Test the request policy."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+from email.utils import format_datetime
+from typing import TYPE_CHECKING, Any
+from unittest.mock import AsyncMock, patch
+
+import aiohttp
+import pytest
+
+from pytraccar import (
+    ApiClient,
+    CircuitBreaker,
+    ExponentialBackoff,
+    RequestPolicy,
+    TokenBucket,
+    TraccarConnectionException,
+    TraccarResponseException,
+)
+from tests.common import MockResponse
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+RETRY = ExponentialBackoff(initial=1, jitter=0, max_attempts=2)
+
+
+class FakeClock:
+    """A clock advanced by hand."""
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """Return the time."""
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_token_bucket() -> None:
+    """Test pacing requests."""
+    clock = FakeClock()
+    bucket = TokenBucket(2, burst=2, clock=clock)
+
+    async def _sleep(delay: float) -> None:
+        clock.now += delay
+
+    with patch("pytraccar.policy.asyncio.sleep", side_effect=_sleep) as sleep:
+        await bucket.acquire()
+        await bucket.acquire()
+        sleep.assert_not_called()
+        await bucket.acquire()
+        sleep.assert_called_once_with(0.5)
+        clock.now += 10
+        await bucket.acquire()
+        await bucket.acquire()
+        assert sleep.call_count == 1
+    assert TokenBucket(2.5)._capacity == 3  # noqa: SLF001
+
+
+def test_circuit_breaker() -> None:
+    """Test opening, probing and closing the circuit."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, recovery_time=10, clock=clock)
+    breaker.before_request()
+    breaker.record_failure()
+    assert not breaker.is_open
+    breaker.record_failure()
+    assert breaker.is_open
+    with pytest.raises(TraccarConnectionException, match="Circuit open"):
+        breaker.before_request()
+
+    clock.now = 10
+    breaker.before_request()
+    # Only one trial request at a time
+    assert breaker.is_open
+    breaker.record_failure()
+    assert breaker.is_open
+    clock.now = 15
+    assert breaker.is_open
+
+    clock.now = 20
+    breaker.before_request()
+    breaker.record_success()
+    assert not breaker.is_open
+    breaker.record_failure()
+    assert not breaker.is_open
+
+
+def test_retry_delay() -> None:
+    """Test when and how long to wait before retries."""
+    policy = RequestPolicy(retry=RETRY, max_retry_after=30)
+    assert RequestPolicy().retry_delay("GET", 0) is None
+    assert policy.retry_delay("POST", 0) is None
+    assert policy.retry_delay("GET", 0) == 1
+    assert policy.retry_delay("GET", 1) == 2
+    assert policy.retry_delay("GET", 2) is None
+    assert policy.retry_delay("GET", 0, "5") == 5
+    assert policy.retry_delay("GET", 0, "-5") == 0
+    assert policy.retry_delay("GET", 0, "60") is None
+    assert policy.retry_delay("GET", 0, "soon") == 1
+    retry_at = datetime.now(tz=UTC) + timedelta(seconds=20)
+    assert 15 < policy.retry_delay("GET", 0, format_datetime(retry_at)) <= 20
+    assert policy.retry_delay(
+        "GET", 0, format_datetime(retry_at.replace(tzinfo=None))
+    ) == pytest.approx(20, abs=5)
+
+
+def _script(
+    client_session: aiohttp.ClientSession, *outcomes: int | BaseException
+) -> list[str]:
+    """Answer requests with the given statuses or errors, in order."""
+    calls: list[str] = []
+    remaining = list(outcomes)
+
+    async def _request(method: str, *_: Any, **__: Any) -> MockResponse:
+        calls.append(method)
+        outcome = remaining.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return MockResponse(
+            mock_status=outcome,
+            mock_data={},
+            mock_headers={"Retry-After": "3"} if outcome == 429 else None,
+        )
+
+    client_session._request = _request  # noqa: SLF001
+    return calls
+
+
+def _client(client_session: aiohttp.ClientSession, **policy: Any) -> ApiClient:
+    return ApiClient(
+        host="127.0.0.1",
+        token="test",  # noqa: S106
+        client_session=client_session,
+        request_policy=RequestPolicy(**policy),
+    )
+
+
+@pytest.mark.parametrize(
+    ("outcomes", "delays"),
+    [
+        ((503, 200), [1]),
+        ((429, 504, 200), [3, 2]),
+        ((aiohttp.ClientConnectionError(), 200), [1]),
+        ((TimeoutError(), 502, 200), [1, 2]),
+    ],
+)
+@pytest.mark.asyncio
+async def test_retries(
+    client_session: aiohttp.ClientSession,
+    outcomes: tuple[int | BaseException, ...],
+    delays: list[float],
+) -> None:
+    """Test retrying failed GET requests."""
+    calls = _script(client_session, *outcomes)
+    with patch("pytraccar.client.asyncio.sleep", new_callable=AsyncMock) as sleep:
+        assert await _client(client_session, retry=RETRY)._call_api("server") == {}  # noqa: SLF001
+    assert len(calls) == len(outcomes)
+    assert [call.args[0] for call in sleep.call_args_list] == delays
+
+
+@pytest.mark.parametrize(
+    ("outcomes", "method", "exception"),
+    [
+        ((503, 503, 503), "GET", TraccarResponseException),
+        ((aiohttp.ClientConnectionError(),) * 3, "GET", TraccarConnectionException),
+        ((503,), "POST", TraccarResponseException),
+        ((aiohttp.ClientConnectionError(),), "POST", TraccarConnectionException),
+        ((500,), "GET", TraccarResponseException),
+    ],
+)
+@pytest.mark.asyncio
+async def test_retries_exhausted(
+    client_session: aiohttp.ClientSession,
+    outcomes: tuple[int | BaseException, ...],
+    method: str,
+    exception: type[Exception],
+) -> None:
+    """Test giving up on failed requests."""
+    calls = _script(client_session, *outcomes)
+    client = _client(client_session, retry=RETRY)
+    with (
+        patch("pytraccar.client.asyncio.sleep", new_callable=AsyncMock),
+        pytest.raises(exception),
+    ):
+        await client._call_api("server", method)  # noqa: SLF001
+    assert len(calls) == len(outcomes)
+
+
+@pytest.mark.asyncio
+async def test_no_retry_while_handling(client_session: aiohttp.ClientSession) -> None:
+    """Test that errors reading a response are not retried."""
+    calls = _script(client_session, 200, 200)
+    client = _client(client_session, retry=RETRY)
+    with pytest.raises(TraccarConnectionException):
+        async with client._request("server"):  # noqa: SLF001
+            raise aiohttp.ClientPayloadError
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_in_client(
+    client_session: aiohttp.ClientSession,
+) -> None:
+    """Test failing fast once the circuit is open."""
+    calls = _script(client_session, 503, 503, 200)
+    clock = FakeClock()
+    client = _client(
+        client_session,
+        circuit_breaker=CircuitBreaker(
+            failure_threshold=2, recovery_time=10, clock=clock
+        ),
+    )
+    for _ in range(2):
+        with pytest.raises(TraccarResponseException):
+            await client.get_server()
+    with pytest.raises(TraccarConnectionException, match="Circuit open"):
+        await client.get_server()
+    assert len(calls) == 2
+    clock.now = 10
+    assert await client.get_server() == {}
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_in_client(client_session: aiohttp.ClientSession) -> None:
+    """Test that requests take a token."""
+    _script(client_session, 200)
+    bucket = TokenBucket(1)
+    acquire: Callable[[], Any] = AsyncMock()
+    with patch.object(bucket, "acquire", acquire):
+        await _client(client_session, rate_limiter=bucket).get_server()
+    acquire.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_cancelled_trial(
+    client_session: aiohttp.ClientSession,
+) -> None:
+    """Test that a cancelled trial request opens the circuit again."""
+    clock = FakeClock()
+    client = _client(
+        client_session,
+        circuit_breaker=CircuitBreaker(
+            failure_threshold=1, recovery_time=10, clock=clock
+        ),
+    )
+    _script(client_session, 503)
+    with pytest.raises(TraccarResponseException):
+        await client.get_server()
+    clock.now = 10
+    started = asyncio.Event()
+
+    async def _hang(*_: Any, **__: Any) -> Any:
+        started.set()
+        await asyncio.Event().wait()
+
+    client_session._request = _hang  # noqa: SLF001
+    trial = asyncio.create_task(client.get_server())
+    await started.wait()
+    trial.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await trial
+    with pytest.raises(TraccarConnectionException, match="Circuit open"):
+        await client.get_server()
+    clock.now = 20
+    _script(client_session, 200)
+    assert await client.get_server() == {}
@@ -0,0 +1,153 @@
+"""Test the client pool."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING, Any
+from unittest.mock import patch
+
+import pytest
+from aiohttp import WSMsgType
+
+from pytraccar import ApiClient, ApiClientPool, TraccarException
+from tests.common import WSMessage, load_response
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+    import aiohttp
+
+    from tests.common import WSMessageHandler
+
+SERVERS = {
+    "eu": {"host": "127.0.0.1", "port": 1337, "token": "eu"},
+    "us": {"host": "127.0.0.2", "port": 1337, "token": "us"},
+}
+
+
+@pytest.mark.asyncio
+async def test_pool_session() -> None:
+    """Test the session and connector managed by the pool."""
+    pool = ApiClientPool(SERVERS, limit=10, limit_per_host=2, dns_cache_ttl=60)
+    with pytest.raises(TraccarException, match="not open"):
+        pool.clients  # noqa: B018
+    async with pool:
+        assert set(pool.clients) == {"eu", "us"}
+        assert all(isinstance(client, ApiClient) for client in pool.clients.values())
+        session = pool._client_session  # noqa: SLF001
+        assert session is not None
+        connector = session.connector
+        assert connector is not None
+        assert connector.limit == 10
+        assert connector.limit_per_host == 2
+    assert session.closed
+    with pytest.raises(TraccarException):
+        pool.clients  # noqa: B018
+
+
+@pytest.mark.asyncio
+async def test_pool_external_session(client_session: aiohttp.ClientSession) -> None:
+    """Test that a session passed to the pool is not closed."""
+    async with ApiClientPool(SERVERS, client_session=client_session) as pool:
+        assert len(pool.clients) == 2
+    assert not client_session.closed
+
+
+@pytest.mark.asyncio
+async def test_pool_get_devices_and_positions(
+    client_session: aiohttp.ClientSession,
+) -> None:
+    """Test merging the results of all servers."""
+    async with ApiClientPool(SERVERS, client_session=client_session) as pool:
+        devices = await pool.get_devices()
+        positions = await pool.get_positions()
+    device = load_response("devices")[0]
+    position = load_response("positions")[0]
+    assert devices == [("eu", device), ("us", device)]
+    assert positions == [("eu", position), ("us", position)]
+
+
+@pytest.mark.asyncio
+async def test_pool_fan_out_errors(client_session: aiohttp.ClientSession) -> None:
+    """Test failing servers."""
+    error = TraccarException("down")
+
+    async def _call(client: ApiClient) -> Any:
+        if client is pool.clients["us"]:
+            raise error
+        return await client.get_server()
+
+    async with ApiClientPool(
+        SERVERS, client_session=client_session, max_concurrency=1
+    ) as pool:
+        results = await pool.fan_out(_call, return_exceptions=True)
+        assert results == {"eu": load_response("server"), "us": error}
+        with pytest.raises(TraccarException, match="down"):
+            await pool.fan_out(_call)
+
+
+@pytest.mark.asyncio
+async def test_pool_subscribe(
+    client_session: aiohttp.ClientSession,
+    mock_ws_messages: WSMessageHandler,
+) -> None:
+    """Test multiplexing the subscriptions of all servers."""
+    for index in range(3):
+        mock_ws_messages.add(
+            WSMessage(messagetype=WSMsgType.TEXT, json={"events": [{"id": index}]})
+        )
+    async with ApiClientPool(SERVERS, client_session=client_session) as pool:
+        received = [item async for item in pool.subscribe(max_queue_size=1)]
+    assert {name for name, _ in received} <= {"eu", "us"}
+    assert sorted(data["events"][0]["id"] for _, data in received) == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_pool_subscribe_error(client_session: aiohttp.ClientSession) -> None:
+    """Test that a failed subscription ends the iteration."""
+    async with ApiClientPool(SERVERS, client_session=client_session) as pool:
+        with (
+            patch.object(
+                pool.clients["us"], "subscribe", side_effect=TraccarException("lost")
+            ),
+            pytest.raises(TraccarException, match="lost"),
+        ):
+            async for _ in pool.subscribe():
+                pass
+
+
+@pytest.mark.asyncio
+async def test_pool_subscribe_close(client_session: aiohttp.ClientSession) -> None:
+    """Test that leaving the iteration closes the subscriptions."""
+    closed: list[str] = []
+
+    def _subscribe(name: str) -> Callable[..., Awaitable[None]]:
+        async def _run(callback: Callable[[Any], Awaitable[None]], **_: Any) -> None:
+            try:
+                while True:
+                    await callback({"devices": None, "events": None, "positions": []})
+                    await asyncio.sleep(0)
+            finally:
+                closed.append(name)
+
+        return _run
+
+    async with ApiClientPool(SERVERS, client_session=client_session) as pool:
+        with (
+            patch.object(pool.clients["eu"], "subscribe", _subscribe("eu")),
+            patch.object(pool.clients["us"], "subscribe", _subscribe("us")),
+        ):
+            messages = pool.subscribe()
+            async for _ in messages:
+                break
+            await messages.aclose()
+    assert sorted(closed) == ["eu", "us"]
+
+
+@pytest.mark.asyncio
+async def test_pool_subscribe_without_messages(
+    client_session: aiohttp.ClientSession,
+) -> None:
+    """Test that the iteration ends when all subscriptions end."""
+    async with ApiClientPool(SERVERS, client_session=client_session) as pool:
+        assert [item async for item in pool.subscribe()] == []
@@ -0,0 +1,127 @@
+"""Test the undecoded responses and messages."""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any
+
+import pytest
+from aiohttp import WSMsgType
+
+from pytraccar import ApiClient, RawResponse, TraccarResponseException
+from tests.common import WSMessage
+
+if TYPE_CHECKING:
+    from tests.common import MockedRequests, MockResponse, WSMessageHandler
+
+
+@pytest.mark.asyncio
+async def test_call_raw(
+    api_client: ApiClient,
+    mock_requests: MockedRequests,
+    mock_response: MockResponse,
+) -> None:
+    """Test returning the body without decoding it."""
+    mock_response.mock_data = [{"id": 1}]
+    mock_response.mock_headers = {"Content-Type": "application/json"}
+    response = await api_client.call_raw("positions", params=[("id", 1)], method="GET")
+    assert response == RawResponse(200, response.headers, b'[{"id": 1}]')
+    assert response.headers["content-type"] == "application/json"
+    assert mock_requests.last_request["params"] == [("id", 1)]
+
+    mock_response.mock_status = 500
+    with pytest.raises(TraccarResponseException):
+        await api_client.call_raw("positions")
+
+
+@pytest.mark.asyncio
+async def test_stream_raw(api_client: ApiClient, mock_response: MockResponse) -> None:
+    """Test reading the body in chunks and writing it to sinks."""
+    mock_response.mock_data = list(range(1000))
+    body = json.dumps(mock_response.mock_data).encode()
+
+    async with api_client.stream_raw("positions", chunk_size=1000) as stream:
+        assert stream.status == 200
+        assert stream.headers == {}
+        assert [len(chunk) async for chunk in stream] == [1000] * 4 + [len(body) - 4000]
+
+    written = bytearray()
+    async with api_client.stream_raw("positions") as stream:
+        assert await stream.write_to(written.extend) == len(body)
+    assert written == body
+
+    chunks: list[bytes] = []
+
+    async def _write(chunk: bytes) -> None:
+        chunks.append(chunk)
+
+    async with api_client.stream_raw("positions", chunk_size=4096) as stream:
+        assert await stream.write_to(_write) == len(body)
+    assert b"".join(chunks) == body
+
+
+@pytest.mark.asyncio
+async def test_subscribe_raw(
+    api_client: ApiClient, mock_ws_messages: WSMessageHandler
+) -> None:
+    """Test passing the messages on without decoding them."""
+    mock_ws_messages.add(WSMessage(WSMsgType.TEXT, {"positions": [{"id": 1}]}))
+    mock_ws_messages.add(WSMessage(WSMsgType.TEXT, {}))
+    frames: list[bytes] = []
+
+    async def _callback(frame: bytes) -> None:
+        frames.append(frame)
+
+    await api_client.subscribe(_callback, raw=True)
+    assert frames == [b'{"positions": [{"id": 1}]}', b"{}"]
+
+
+class _BytesMessage:
+    """A text frame left undecoded, as with ``decode_text=False``."""
+
+    type = WSMsgType.TEXT
+    data = b'{"positions": []}'
+
+
+@pytest.mark.parametrize("supported", [True, False])
+@pytest.mark.asyncio
+async def test_subscribe_raw_undecoded(
+    api_client: ApiClient,
+    mock_ws_messages: WSMessageHandler,
+    monkeypatch: pytest.MonkeyPatch,
+    supported: bool,  # noqa: FBT001
+) -> None:
+    """Test that frames are not decoded when aiohttp supports it."""
+    monkeypatch.setattr("pytraccar.client.WS_DECODE_TEXT_SUPPORTED", supported)
+    session = api_client._client_session  # noqa: SLF001
+    connect = session.ws_connect
+    options: list[dict[str, Any]] = []
+
+    def _ws_connect(**kwargs: Any) -> Any:
+        options.append(kwargs)
+        # The mocked session predates decode_text on older aiohttp versions
+        return connect(
+            **{key: value for key, value in kwargs.items() if key != "decode_text"}
+        )
+
+    monkeypatch.setattr(session, "ws_connect", _ws_connect)
+    mock_ws_messages.add(_BytesMessage())
+    frames: list[bytes] = []
+
+    async def _callback(frame: bytes) -> None:
+        frames.append(frame)
+
+    await api_client.subscribe(_callback, raw=True)
+    assert frames[0] is _BytesMessage.data
+    assert ("decode_text" in options[0]) is supported
+
+
+@pytest.mark.asyncio
+async def test_subscribe_raw_options(api_client: ApiClient) -> None:
+    """Test that raw messages cannot be gap filled or coalesced."""
+
+    async def _callback(_: bytes) -> None:
+        pass
+
+    with pytest.raises(ValueError, match="gap filled or coalesced"):
+        await api_client.subscribe(_callback, raw=True, gap_fill=True)
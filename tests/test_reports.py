@@ -0,0 +1,215 @@
+"""Test the historical report iterators."""
+
+from __future__ import annotations
+
+import asyncio
+import gc
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+import pytest
+
+from pytraccar import ApiClient, TraccarException, TraccarResponseException
+from tests.common import make_position
+
+if TYPE_CHECKING:
+    from tests.common import MockedRequests, MockResponse
+
+START = datetime(2024, 1, 1)  # noqa: DTZ001
+END = datetime(2024, 1, 2)  # noqa: DTZ001
+
+
+def _targets(mock_requests: MockedRequests) -> list[tuple[str, list[Any]]]:
+    """Return the slice start and the device or group of every request."""
+    return [
+        (
+            dict(call["params"])["from"],
+            [(k, v) for k, v in call["params"] if k in ("deviceId", "groupId")],
+        )
+        for call in mock_requests._calls  # noqa: SLF001
+    ]
+
+
+@pytest.mark.asyncio
+async def test_iter_reports_route(
+    api_client: ApiClient,
+    mock_requests: MockedRequests,
+    mock_response: MockResponse,
+) -> None:
+    """Test merging a route report split by slice, device and group."""
+    mock_response.mock_data_list = [
+        [
+            make_position(3, 1, "2024-01-01T10:00:00.000+00:00"),
+            make_position(1, 1, "2024-01-01T01:00:00.000+00:00"),
+        ],
+        [make_position(2, 2, "2024-01-01T05:00:00.000+00:00")],
+        [make_position(4, 9, "2024-01-01T12:00:00.000+00:00")],
+        [make_position(5, 1, "2024-01-01T13:00:00.000+00:00")],
+        [],
+        [
+            make_position(4, 9, "2024-01-01T12:00:00.000+00:00"),
+            make_position(6, 9, "2024-01-01T20:00:00.000+00:00"),
+        ],
+    ]
+    positions = [
+        position["id"]
+        async for position in api_client.iter_reports_route(
+            devices=[1, 2],
+            groups=[7],
+            start_time=END,
+            end_time=START,
+            time_slice=timedelta(hours=12),
+            max_concurrency=2,
+        )
+    ]
+    assert positions == [1, 2, 3, 4, 5, 6]
+    assert all(
+        str(call["url"]).endswith("/api/reports/route")
+        for call in mock_requests._calls  # noqa: SLF001
+    )
+    assert _targets(mock_requests) == [
+        ("2024-01-01T00:00:00Z", [("deviceId", 1)]),
+        ("2024-01-01T00:00:00Z", [("deviceId", 2)]),
+        ("2024-01-01T00:00:00Z", [("groupId", 7)]),
+        ("2024-01-01T12:00:00Z", [("deviceId", 1)]),
+        ("2024-01-01T12:00:00Z", [("deviceId", 2)]),
+        ("2024-01-01T12:00:00Z", [("groupId", 7)]),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_iter_report_overlapping_targets(
+    api_client: ApiClient, mock_response: MockResponse
+) -> None:
+    """Test that an item returned for a device and its group is yielded once."""
+    mock_response.mock_data_list = [
+        [make_position(5, 1, "2024-01-01T05:00:00.000+00:00")],
+        [
+            make_position(5, 1, "2024-01-01T05:00:00.000+00:00"),
+            make_position(6, 2, "2024-01-01T06:00:00.000+00:00"),
+        ],
+    ]
+    positions = [
+        position["id"]
+        async for position in api_client.iter_reports_route(
+            devices=[1], groups=[7], start_time=START, end_time=END, time_slice=None
+        )
+    ]
+    assert positions == [5, 6]
+
+
+@pytest.mark.asyncio
+async def test_iter_position_history(
+    api_client: ApiClient,
+    mock_requests: MockedRequests,
+    mock_response: MockResponse,
+) -> None:
+    """Test iterating over the positions endpoint without splitting."""
+    mock_response.mock_data = [make_position(1, 1, "2024-01-01T01:00:00.000+00:00")]
+    positions = [
+        position
+        async for position in api_client.iter_position_history(
+            devices=[1], start_time=START, end_time=END, time_slice=None
+        )
+    ]
+    assert positions == mock_response.mock_data
+    assert mock_requests.called == 1
+    assert str(mock_requests.last_request["url"]).endswith("/api/positions")
+    assert _targets(mock_requests) == [("2024-01-01T00:00:00Z", [("deviceId", 1)])]
+
+
+@pytest.mark.asyncio
+async def test_iter_reports_trips_and_stops(
+    api_client: ApiClient,
+    mock_requests: MockedRequests,
+    mock_response: MockResponse,
+) -> None:
+    """Test that trips and stops are de-duplicated by device and start time."""
+    first = {"deviceId": 1, "startTime": "2024-01-01T11:00:00.000+00:00"}
+    second = {"deviceId": 1, "startTime": "2024-01-01T12:30:00.000+00:00"}
+    for method, endpoint in (
+        (api_client.iter_reports_trips, "trips"),
+        (api_client.iter_reports_stops, "stops"),
+    ):
+        mock_requests.clear()
+        mock_response.mock_data_list = [[first], [first, second]]
+        mock_response._count = 0  # noqa: SLF001
+        items = [
+            item
+            async for item in method(
+                devices=[1],
+                start_time=START,
+                end_time=END,
+                time_slice=timedelta(hours=12),
+            )
+        ]
+        assert items == [first, second]
+        assert str(mock_requests.last_request["url"]).endswith(f"/reports/{endpoint}")
+        assert _targets(mock_requests) == [
+            ("2024-01-01T00:00:00Z", [("deviceId", 1)]),
+            ("2024-01-01T12:00:00Z", [("deviceId", 1)]),
+        ]
+
+
+@pytest.mark.asyncio
+async def test_iter_report_without_targets(
+    api_client: ApiClient, mock_requests: MockedRequests
+) -> None:
+    """Test that a report without devices or groups is not requested."""
+    with pytest.raises(TraccarException, match="at least one device or group"):
+        async for _ in api_client.iter_reports_trips(groups=[]):
+            pass
+    assert mock_requests.called == 0
+
+
+@pytest.mark.asyncio
+async def test_iter_report_closed_early(
+    api_client: ApiClient, mock_response: MockResponse
+) -> None:
+    """Test that leaving the iteration cancels the prefetched slice."""
+    mock_response.mock_data = [make_position(1, 1, "2024-01-01T01:00:00.000+00:00")]
+    positions = api_client.iter_reports_route(
+        devices=[1], start_time=START, end_time=END, time_slice=timedelta(hours=1)
+    )
+    async for _ in positions:
+        break
+    await positions.aclose()
+
+
+@pytest.mark.asyncio
+async def test_iter_report_closed_after_failed_prefetch(
+    api_client: ApiClient, mock_response: MockResponse
+) -> None:
+    """Test that the error of a failed prefetch is retrieved when closing."""
+    errors: list[dict[str, Any]] = []
+    loop = asyncio.get_running_loop()
+    loop.set_exception_handler(lambda _, context: errors.append(context))
+    mock_response.mock_data_list = [
+        [make_position(1, 1, "2024-01-01T00:30:00.000+00:00")]
+    ]
+    positions = api_client.iter_reports_route(
+        devices=[1], start_time=START, end_time=END, time_slice=timedelta(hours=1)
+    )
+    async for _ in positions:
+        # Let the prefetch of the next slice fail
+        await asyncio.sleep(0.01)
+        break
+    await positions.aclose()
+    del positions
+    gc.collect()
+    # The report generator is finalized by the event loop
+    await asyncio.sleep(0.01)
+    gc.collect()
+    loop.set_exception_handler(None)
+    assert errors == []
+
+
+@pytest.mark.asyncio
+async def test_iter_report_error(
+    api_client: ApiClient, mock_response: MockResponse
+) -> None:
+    """Test that a failing slice fails the iteration."""
+    mock_response.mock_status = 500
+    with pytest.raises(TraccarResponseException):
+        async for _ in api_client.iter_reports_stops(devices=[1]):
+            pass
@@ -0,0 +1,103 @@
+"""Test incremental JSON array decoding."""
+
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING, Any
+
+import aiohttp
+import pytest
+
+from pytraccar import ApiClient, TraccarException, TraccarResponseException
+from pytraccar.streaming import JsonArrayParser, iter_json_array
+from tests.common import MockedRequests, MockResponse, load_response
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+
+async def _chunks(body: bytes, size: int) -> AsyncIterator[bytes]:
+    for start in range(0, len(body), size):
+        yield body[start : start + size]
+
+
+async def _collect(body: bytes, size: int) -> list[Any]:
+    return [item async for item in iter_json_array(_chunks(body, size))]
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 1024])
+@pytest.mark.parametrize(
+    "document",
+    [
+        [],
+        [{"id": 1, "name": "Bïl 🚗", "attributes": {"a": [1, 2]}}, {"id": 2}],
+        [1, 22, 333, "four", None, True, 5.5],
+    ],
+)
+@pytest.mark.asyncio
+async def test_iter_json_array(document: list[Any], size: int) -> None:
+    """Test that arrays decode the same regardless of chunking."""
+    assert await _collect(json.dumps(document).encode(), size) == document
+    assert await _collect(json.dumps(document, indent=2).encode(), size) == document
+
+
+@pytest.mark.parametrize(
+    "body",
+    [b'{"id": 1}', b'[{"id": 1}', b'[{"id": 1} {"id": 2}]', b"[1] 2", b'[{"id": ]'],
+)
+@pytest.mark.asyncio
+async def test_iter_json_array_invalid(body: bytes) -> None:
+    """Test that invalid documents raise."""
+    with pytest.raises(ValueError):  # noqa: PT011
+        await _collect(body, 3)
+
+
+def test_parser_keeps_only_unfinished_data() -> None:
+    """Test that completed items are released from the parser buffer."""
+    parser = JsonArrayParser()
+    assert parser.feed('[{"id": 1}, {"id"') == [{"id": 1}]
+    assert parser._buffer == '{"id"'  # noqa: SLF001
+    assert parser.feed(": 2}]", final=True) == [{"id": 2}]
+
+
+@pytest.mark.asyncio
+async def test_iter_positions(api_client: ApiClient) -> None:
+    """Test streaming the /positions endpoint."""
+    positions = [position async for position in api_client.iter_positions()]
+    assert positions == load_response("positions")
+
+
+@pytest.mark.asyncio
+async def test_iter_positions_timeout(
+    api_client: ApiClient, mock_requests: MockedRequests
+) -> None:
+    """Test that streaming bounds the connection and each read."""
+    [position async for position in api_client.iter_positions()]
+    assert mock_requests.last_request["timeout"] == aiohttp.ClientTimeout(
+        sock_connect=10, sock_read=10
+    )
+
+
+@pytest.mark.asyncio
+async def test_iter_reports_events(
+    api_client: ApiClient, mock_response: MockResponse
+) -> None:
+    """Test streaming the /reports/events endpoint."""
+    mock_response.mock_data = [{"id": event_id} for event_id in range(10_000)]
+    events = [event async for event in api_client.iter_reports_events(devices=[1])]
+    assert [event["id"] for event in events] == list(range(10_000))
+
+
+@pytest.mark.asyncio
+async def test_iter_positions_errors(
+    api_client: ApiClient, mock_response: MockResponse
+) -> None:
+    """Test errors while streaming."""
+    mock_response.mock_status = 500
+    with pytest.raises(TraccarResponseException):
+        [position async for position in api_client.iter_positions()]
+
+    mock_response.mock_status = 200
+    mock_response.mock_data = {"id": 1}
+    with pytest.raises(TraccarException, match="Expected a JSON array"):
+        [position async for position in api_client.iter_positions()]
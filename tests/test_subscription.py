@@ -3,8 +3,8 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Any, NoReturn
-from unittest.mock import patch
+from typing import Any, NoReturn, Self
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import aiohttp
 import pytest
@@ -12,11 +12,12 @@ from aiohttp import WSMsgType
 
 from pytraccar import (
     ApiClient,
+    ExponentialBackoff,
     SubscriptionStatus,
     TraccarConnectionException,
     TraccarException,
 )
-from tests.common import WSMessage, WSMessageHandler
+from tests.common import MockedRequests, MockResponse, WSMessage, WSMessageHandler
 
 
 @pytest.mark.parametrize(
@@ -206,3 +207,215 @@ async def test_subscription_cancelation(api_client: ApiClient) -> None:
         await api_client.subscribe(None)
 
     assert api_client.subscription_status == SubscriptionStatus.DISCONNECTED
+
+
+@pytest.mark.parametrize("mapped", [False, True])
+@pytest.mark.asyncio
+async def test_subscription_cancelled_during_session_setup(
+    api_client: ApiClient,
+    client_session: aiohttp.ClientSession,
+    mapped: bool,  # noqa: FBT001
+) -> None:
+    """Test cancelling a reconnecting subscription while the session opens."""
+    started = asyncio.Event()
+    request = client_session._request  # noqa: SLF001
+
+    async def _request(method: str, url: Any, **kwargs: Any) -> Any:
+        if method == "GET" and "session" in str(url):
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError as exception:
+                if mapped:
+                    # A library that turns the cancellation into an error
+                    raise aiohttp.ClientError("cancelled") from exception
+                raise
+        return await request(method, url, **kwargs)
+
+    client_session._request = _request  # noqa: SLF001
+    task = asyncio.create_task(api_client.subscribe(AsyncMock(), reconnect=True))
+    await started.wait()
+    task.cancel()
+    await asyncio.wait_for(task, 1)
+
+    assert api_client.subscription_status == SubscriptionStatus.DISCONNECTED
+
+
+class ScriptedWSContext:
+    """WebSocket context replaying a list of messages."""
+
+    def __init__(self, messages: list[WSMessage]) -> None:
+        """Initialize."""
+        self._messages = messages
+
+    async def __aenter__(self) -> Self:
+        """Enter."""
+        return self
+
+    async def __aexit__(self, *args: object) -> None:
+        """Exit."""
+
+    def __aiter__(self) -> ScriptedWSContext:
+        """Iterate."""
+        return self
+
+    async def __anext__(self) -> WSMessage:
+        """Next message."""
+        if not self._messages:
+            raise StopAsyncIteration
+        return self._messages.pop(0)
+
+
+def _script_connections(
+    client_session: aiohttp.ClientSession,
+    connections: list[list[WSMessage] | BaseException],
+    statuses: list[SubscriptionStatus],
+    api_client: ApiClient,
+) -> None:
+    """Make each ws_connect use the next scripted connection."""
+
+    async def _ws_connect(*_: Any, **__: Any) -> ScriptedWSContext:
+        statuses.append(api_client.subscription_status)
+        connection = connections.pop(0)
+        if isinstance(connection, BaseException):
+            raise connection
+        return ScriptedWSContext(connection)
+
+    client_session._ws_connect = _ws_connect  # noqa: SLF001
+
+
+def _handshake_error(status: int) -> aiohttp.WSServerHandshakeError:
+    return aiohttp.WSServerHandshakeError(
+        request_info=MagicMock(), history=(), status=status
+    )
+
+
+@pytest.mark.asyncio
+async def test_subscription_reconnect_with_gap_fill(
+    api_client: ApiClient,
+    client_session: aiohttp.ClientSession,
+    mock_requests: MockedRequests,
+    mock_response: MockResponse,
+) -> None:
+    """Test reconnecting, reusing the session and filling the gap."""
+    statuses: list[SubscriptionStatus] = []
+    _script_connections(
+        client_session,
+        [
+            [
+                WSMessage(
+                    messagetype=WSMsgType.TEXT,
+                    json={"positions": [{"id": 5, "deviceId": 1}]},
+                ),
+                WSMessage(messagetype=WSMsgType.CLOSED),
+            ],
+            _handshake_error(401),
+            [],
+            aiohttp.ClientError("boom"),
+            aiohttp.ClientError("boom"),
+        ],
+        statuses,
+        api_client,
+    )
+    mock_response.mock_data_list = [
+        {},
+        [{"id": 4, "deviceId": 1}, {"id": 2, "deviceId": 3}],
+        {},
+        [{"id": 6, "deviceId": 1}, {"id": 3, "deviceId": 2}, {"id": 2, "deviceId": 3}],
+        None,
+    ]
+    handled = []
+
+    async def _handler(data: Any) -> None:
+        handled.append(data["positions"])
+
+    sleep_statuses = []
+
+    async def _sleep(_: float) -> None:
+        sleep_statuses.append(api_client.subscription_status)
+
+    with (
+        patch("pytraccar.client.asyncio.sleep", _sleep),
+        pytest.raises(TraccarConnectionException, match="Could not communicate"),
+    ):
+        await api_client.subscribe(
+            _handler,
+            reconnect=True,
+            backoff=ExponentialBackoff(max_attempts=2),
+            gap_fill=True,
+        )
+
+    assert handled == [
+        [{"id": 5, "deviceId": 1}],
+        [{"id": 6, "deviceId": 1}, {"id": 3, "deviceId": 2}],
+    ]
+    assert statuses == [SubscriptionStatus.CONNECTING] * 5
+    assert sleep_statuses == [SubscriptionStatus.RECONNECTING] * 4
+    assert api_client.subscription_status == SubscriptionStatus.ERROR
+    assert [
+        call["url"].split("/api/")[-1]
+        for call in mock_requests._calls  # noqa: SLF001
+        if call["method"] == "GET"
+    ] == ["session?token=test", "positions", "session?token=test", "positions"]
+
+
+@pytest.mark.asyncio
+async def test_subscription_reconnect_after_close(
+    api_client: ApiClient,
+    client_session: aiohttp.ClientSession,
+) -> None:
+    """Test reconnecting after the server ends the connection."""
+    statuses: list[SubscriptionStatus] = []
+    _script_connections(
+        client_session,
+        [[], [], _handshake_error(500)],
+        statuses,
+        api_client,
+    )
+
+    with (
+        patch("pytraccar.client.asyncio.sleep"),
+        pytest.raises(TraccarConnectionException),
+    ):
+        await api_client.subscribe(
+            AsyncMock(), reconnect=True, backoff=ExponentialBackoff(max_attempts=0)
+        )
+    assert len(statuses) == 3
+
+
+@pytest.mark.asyncio
+async def test_subscription_reconnect_unrecoverable(
+    api_client: ApiClient,
+    client_session: aiohttp.ClientSession,
+) -> None:
+    """Test that unexpected errors are not retried."""
+    statuses: list[SubscriptionStatus] = []
+    _script_connections(client_session, [KeyError("boom")], statuses, api_client)
+
+    with pytest.raises(TraccarException, match="Unexpected error"):
+        await api_client.subscribe(AsyncMock(), reconnect=True)
+    assert api_client.subscription_status == SubscriptionStatus.ERROR
+
+
+@pytest.mark.asyncio
+async def test_subscription_reconnect_cancelled(
+    api_client: ApiClient,
+    client_session: aiohttp.ClientSession,
+) -> None:
+    """Test cancelling a subscription while it waits to reconnect."""
+    statuses: list[SubscriptionStatus] = []
+    _script_connections(
+        client_session, [aiohttp.ClientError("boom")], statuses, api_client
+    )
+
+    task = asyncio.create_task(
+        api_client.subscribe(
+            AsyncMock(), reconnect=True, backoff=ExponentialBackoff(initial=10)
+        )
+    )
+    for _ in range(10):
+        await asyncio.sleep(0)
+    assert api_client.subscription_status == SubscriptionStatus.RECONNECTING
+    task.cancel()
+    await task
+    assert api_client.subscription_status == SubscriptionStatus.DISCONNECTED
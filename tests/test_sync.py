@@ -0,0 +1,130 @@
+"""Test the incremental synchronisation."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+from unittest.mock import patch
+
+import pytest
+
+from pytraccar import ApiClient, Delta, DeltaSync
+from tests.common import make_position
+
+if TYPE_CHECKING:
+    from tests.common import MockedRequests, MockResponse
+
+
+def _device(device_id: int, position_id: int, **fields: Any) -> dict[str, Any]:
+    return {
+        "id": device_id,
+        "name": f"device {device_id}",
+        "status": "online",
+        "disabled": False,
+        "lastUpdate": "2024-01-01T00:00:00Z",
+        "positionId": position_id,
+        "groupId": 0,
+        **fields,
+    }
+
+
+@pytest.mark.asyncio
+async def test_sync_devices_and_positions(
+    api_client: ApiClient,
+    mock_response: MockResponse,
+    mock_requests: MockedRequests,
+) -> None:
+    """Test reporting only the changed devices and moved positions."""
+    sync = DeltaSync(api_client)
+    mock_response.mock_data_list = [
+        [_device(1, 10), _device(2, 20), _device(3, 0)],
+        [make_position(10, 1), make_position(20, 2)],
+        [
+            _device(1, 11, lastUpdate="2024-01-01T00:01:00Z"),
+            _device(2, 20, attributes={"ignored": True}),
+            _device(4, 40),
+        ],
+        [make_position(11, 1), make_position(40, 4)],
+        [_device(1, 11), _device(4, 40)],
+    ]
+
+    devices, positions = await sync.sync()
+    assert devices == Delta([_device(1, 10), _device(2, 20), _device(3, 0)], [], [])
+    assert positions == Delta([make_position(10, 1), make_position(20, 2)], [], [])
+    assert mock_requests.last_request["params"] is None
+
+    devices, positions = await sync.sync()
+    assert devices.added == [_device(4, 40)]
+    assert devices.changed == [_device(1, 11, lastUpdate="2024-01-01T00:01:00Z")]
+    assert devices.removed == [3]
+    assert positions == Delta([make_position(40, 4)], [make_position(11, 1)], [])
+    assert mock_requests.last_request["params"] == [("id", 11), ("id", 40)]
+    assert set(sync.devices) == {1, 2, 4}
+
+    requests = mock_requests.called
+    devices, positions = await sync.sync()
+    assert devices == Delta([], [_device(1, 11)], [2])
+    assert positions == Delta([], [], [2])
+    assert mock_requests.called == requests + 1
+    assert dict(sync.positions) == {1: make_position(11, 1), 4: make_position(40, 4)}
+
+
+@pytest.mark.asyncio
+async def test_sync_positions_without_devices(
+    api_client: ApiClient, mock_response: MockResponse
+) -> None:
+    """Test diffing all positions when the devices are not synchronised."""
+    sync = DeltaSync(api_client, position_fingerprint=("serverTime",))
+    mock_response.mock_data_list = [
+        [make_position(10, 1), make_position(20, 2)],
+        [make_position(11, 1, serverTime="2024-01-01T00:01:00Z"), make_position(20, 2)],
+    ]
+    assert await sync.sync_positions() == Delta(
+        [make_position(10, 1), make_position(20, 2)], [], []
+    )
+    assert await sync.sync_positions() == Delta(
+        [], [make_position(11, 1, serverTime="2024-01-01T00:01:00Z")], []
+    )
+
+    mock_response.mock_data_list = None
+    mock_response.mock_data = [make_position(30, 3)]
+    sync.reset()
+    assert await sync.sync_positions() == Delta([make_position(30, 3)], [], [])
+
+
+@pytest.mark.asyncio
+async def test_sync_positions_in_batches(
+    api_client: ApiClient,
+    mock_response: MockResponse,
+    mock_requests: MockedRequests,
+) -> None:
+    """Test fetching many moved positions in batches."""
+    sync = DeltaSync(api_client)
+    mock_response.mock_data = [_device(device_id, device_id) for device_id in (1, 2, 3)]
+    await sync.sync_devices()
+    mock_response.mock_data = [make_position(9, 1)]
+    await sync.sync_positions()
+    mock_response.mock_data = []
+    with patch("pytraccar.client.MAX_QUERY_LENGTH", len("id=1&id=2")):
+        assert await sync.sync_positions() == Delta([], [], [])
+    assert [request["params"] for request in mock_requests._calls[2:]] == [  # noqa: SLF001
+        [("id", 1), ("id", 2)],
+        [("id", 3)],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_sync_moved_positions_by_fingerprint(
+    api_client: ApiClient, mock_response: MockResponse
+) -> None:
+    """Test that a moved position is compared by the position fingerprint."""
+    sync = DeltaSync(api_client, position_fingerprint=("latitude",))
+    mock_response.mock_data_list = [
+        [_device(1, 10), _device(2, 20)],
+        [make_position(10, 1, latitude=1.0), make_position(20, 2, latitude=2.0)],
+        [_device(1, 11), _device(2, 21)],
+        [make_position(11, 1, latitude=1.0), make_position(21, 2, latitude=3.0)],
+    ]
+    await sync.sync()
+    _, positions = await sync.sync()
+    assert positions == Delta([], [make_position(21, 2, latitude=3.0)], [])
+    assert sync.positions[1] == make_position(11, 1, latitude=1.0)
@@ -0,0 +1,60 @@
+"""Test the timestamp helpers."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta, timezone
+
+import pytest
+
+from pytraccar.timestamps import (
+    format_timestamp,
+    parse_datetime,
+    parse_epoch_ms,
+    parse_epoch_ms_many,
+    to_naive_utc,
+)
+
+NOON = 1704110400000  # 2024-01-01T12:00:00Z
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("2024-01-01T12:00:00.000+00:00", NOON),
+        ("2024-01-01T12:00:01.25Z", NOON + 1250),
+        ("2024-01-01T14:30:00.123456+02:30", NOON + 123),
+        ("2024-01-01T06:30:00-0530", NOON),
+        ("2024-01-01T12:00", NOON),
+        ("2024-01-01T12:00:00", NOON),
+        ("2024-01-01", NOON - 12 * 3600 * 1000),
+        ("2024-01-01T13:00:00+01", NOON),
+    ],
+)
+def test_parse_epoch_ms(value: str, expected: int) -> None:
+    """Test parsing the timestamp formats of Traccar."""
+    assert parse_epoch_ms(value) == expected
+
+
+def test_parse_epoch_ms_invalid() -> None:
+    """Test that invalid timestamps are rejected."""
+    with pytest.raises(ValueError, match="Invalid isoformat"):
+        parse_epoch_ms("yesterday")
+
+
+def test_parse_many() -> None:
+    """Test parsing timestamps in bulk and to datetimes."""
+    assert parse_epoch_ms_many(
+        ["2024-01-01T12:00:00.000+00:00", None, "2024-01-01T12:00:59.999+00:00"]
+    ) == [NOON, None, NOON + 59999]
+    assert parse_datetime("2024-01-01T13:00:00.500+01:00") == datetime(
+        2024, 1, 1, 12, 0, 0, 500000, tzinfo=UTC
+    )
+
+
+def test_format_timestamp() -> None:
+    """Test encoding naive and aware datetimes in UTC."""
+    naive = datetime(2024, 1, 1, 12)  # noqa: DTZ001
+    aware = datetime(2024, 1, 1, 14, tzinfo=timezone(timedelta(hours=2)))
+    assert format_timestamp(naive) == "2024-01-01T12:00:00Z"
+    assert format_timestamp(aware) == "2024-01-01T12:00:00Z"
+    assert to_naive_utc(aware) == naive
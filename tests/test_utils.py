@@ -0,0 +1,143 @@
+"""Test helpers."""
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from pytraccar.utils import (
+    batched,
+    batched_params,
+    gather_limited,
+    merge_subscription_data,
+    newest_positions,
+    route_template,
+    split_time_range,
+    update_latest_position_ids,
+)
+
+
+def test_batched() -> None:
+    """Test batched."""
+    assert batched([1, 2, 3, 4, 5], 2) == [[1, 2], [3, 4], [5]]
+    assert batched([], 2) == []
+    with pytest.raises(ValueError, match="Batch size must be at least 1"):
+        batched([1], 0)
+
+
+def test_batched_params() -> None:
+    """Test batched_params."""
+    assert batched_params("id", [1, 2, 3], len("id=1&id=2")) == [
+        [("id", 1), ("id", 2)],
+        [("id", 3)],
+    ]
+    assert batched_params("uniqueId", ["a b", "c"], 5) == [
+        [("uniqueId", "a b")],
+        [("uniqueId", "c")],
+    ]
+    assert batched_params("id", [], 10) == []
+
+
+def test_route_template() -> None:
+    """Test labelling endpoints by route."""
+    assert route_template("devices/12") == "devices/{id}"
+    assert route_template("reports/events?from=1") == "reports/events"
+    assert route_template("permissions") == "permissions"
+
+
+def test_split_time_range() -> None:
+    """Test split_time_range."""
+    start = datetime(2024, 1, 1, tzinfo=UTC)
+    assert split_time_range(start, start + timedelta(hours=5), timedelta(hours=2)) == [
+        (start, start + timedelta(hours=2)),
+        (start + timedelta(hours=2), start + timedelta(hours=4)),
+        (start + timedelta(hours=4), start + timedelta(hours=5)),
+    ]
+    assert split_time_range(start, start, timedelta(hours=1)) == [(start, start)]
+    with pytest.raises(ValueError, match="Time slice must be positive"):
+        split_time_range(start, start, timedelta(0))
+
+
+@pytest.mark.asyncio
+async def test_gather_limited() -> None:
+    """Test gather_limited."""
+    running = 0
+    peak = 0
+
+    async def _work(value: int) -> int:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0)
+        running -= 1
+        return value
+
+    assert await gather_limited(2, *(_work(value) for value in range(6))) == list(
+        range(6)
+    )
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_gather_limited_cancels_on_error() -> None:
+    """Test that gather_limited cancels the remaining work on error."""
+    finished = []
+
+    async def _fail() -> None:
+        raise ValueError("boom")
+
+    async def _slow() -> None:
+        await asyncio.sleep(0.1)
+        finished.append(True)
+
+    with pytest.raises(ValueError, match="boom"):
+        await gather_limited(2, _slow(), _fail())
+    await asyncio.sleep(0.2)
+    assert finished == []
+
+
+def test_newest_positions() -> None:
+    """Test newest_positions."""
+    positions = [
+        {"id": 3, "deviceId": 1, "fixTime": "2024-01-01T00:00:02Z"},
+        {"id": 1, "deviceId": 2, "fixTime": "2024-01-01T00:00:00Z"},
+        {"id": 2, "deviceId": 1, "fixTime": "2024-01-01T00:00:01Z"},
+        {"id": 4, "deviceId": 1, "fixTime": "2024-01-01T00:00:02Z"},
+    ]
+    assert newest_positions(positions) == [positions[3], positions[1]]
+
+
+def test_update_latest_position_ids() -> None:
+    """Test update_latest_position_ids."""
+    latest = {1: 5}
+    update_latest_position_ids(
+        latest,
+        [{"id": 3, "deviceId": 1}, {"id": 7, "deviceId": 2}, {"id": 6, "deviceId": 1}],
+    )
+    assert latest == {1: 6, 2: 7}
+
+
+def test_merge_subscription_data() -> None:
+    """Test merge_subscription_data."""
+    messages = [
+        {"devices": [{"id": 1, "name": "a"}], "events": None, "positions": None},
+        {
+            "devices": [{"id": 1, "name": "b"}],
+            "events": [{"id": 1}],
+            "positions": [{"id": 1, "deviceId": 1, "fixTime": "1"}],
+        },
+        {"devices": None, "events": [{"id": 2}], "positions": None},
+    ]
+    assert merge_subscription_data([]) == {
+        "devices": None,
+        "events": None,
+        "positions": None,
+    }
+    assert merge_subscription_data(messages) == {
+        "devices": [{"id": 1, "name": "a"}, {"id": 1, "name": "b"}],
+        "events": [{"id": 1}, {"id": 2}],
+        "positions": [{"id": 1, "deviceId": 1, "fixTime": "1"}],
+    }
+    assert merge_subscription_data(messages, coalesce=True)["devices"] == [
+        {"id": 1, "name": "b"}
+    ]